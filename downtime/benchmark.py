@@ -0,0 +1,215 @@
+"""Benchmark the bot's command handlers and panel refreshes against a fake Discord API.
+
+Usage:
+    python benchmark.py
+    python benchmark.py --panels 1,100,10000 --latency-ms 20 --rate-limit 0.01
+
+Each scenario seeds N status panels and N event panels spread over
+--guilds guilds, then times the handlers and reports throughput and
+latency percentiles. Nothing here talks to Discord.
+"""
+import argparse
+import asyncio
+import contextlib
+import os
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+from typing import Awaitable, Callable
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from updatebot import commands, config, core, event_commands, scheduling, storage, views, warmstart  # noqa: E402
+from fake_discord import FakeClient, FakeDiscordAPI, FakeInteraction  # noqa: E402
+
+EVENT_TYPES = ["resonance", "quest", "task", "checkin", "doublerewards", "store", "recurring"]
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def format_row(name: str, samples: list[float], units: int) -> str:
+    total = sum(samples)
+    rate = units / total if total else float("inf")
+    return (
+        f"  {name:<22} n={len(samples):<5} "
+        f"p50={percentile(samples, 50) * 1000:9.2f}ms "
+        f"p95={percentile(samples, 95) * 1000:9.2f}ms "
+        f"p99={percentile(samples, 99) * 1000:9.2f}ms "
+        f"throughput={rate:10.1f}/s"
+    )
+
+
+async def timed(samples: list[float], func: Callable[[], Awaitable[None]]) -> None:
+    started = time.perf_counter()
+    await func()
+    samples.append(time.perf_counter() - started)
+
+
+async def full_refresh(refresh: Callable[[], Awaitable[None]]) -> None:
+    """Edit every panel, including those warmstart would skip as unchanged."""
+    warmstart.panel_hashes.clear()
+    await refresh()
+
+
+def seed_panels(api: FakeDiscordAPI, count: int, guilds: int, channels_per_guild: int) -> list:
+    """Create count status panels and count event panels without paying for requests."""
+    storage.panel_messages.clear()
+    storage.event_panel_messages.clear()
+    storage.downtime_schedules.clear()
+    channels = []
+    for g in range(guilds):
+        guild_id = 200000000000000000 + g
+        for _ in range(channels_per_guild):
+            channels.append(api.create_channel(guild_id))
+    for i in range(count):
+        channel = channels[i % len(channels)]
+        message = channel.seed_message()
+        storage.panel_messages.append(
+            {"channel_id": channel.id, "message_id": message.id, "guild_id": channel.guild.id}
+        )
+        message = channel.seed_message()
+        storage.event_panel_messages.append({
+            "channel_id": channel.id,
+            "message_id": message.id,
+            "guild_id": channel.guild.id,
+            "event_type": EVENT_TYPES[i % len(EVENT_TYPES)],
+        })
+    storage.rebuild_panel_index()
+    return channels
+
+
+async def run_scenario(args: argparse.Namespace, count: int) -> None:
+    api = FakeDiscordAPI(
+        latency=args.latency_ms / 1000,
+        jitter=args.jitter_ms / 1000,
+        rate_limit_chance=args.rate_limit,
+        retry_after=args.retry_after_ms / 1000,
+        seed=args.seed,
+    )
+    core.client = FakeClient(api, cache_channels=args.cache_channels)
+    guilds = max(1, min(args.guilds, count))
+    channels = seed_panels(api, count, guilds, args.channels_per_guild)
+    channel = channels[0]
+    repeat = args.repeat if count < 10000 else max(1, args.repeat // 10)
+
+    results: list[tuple[str, list[float], int]] = []
+
+    samples: list[float] = []
+    for i in range(repeat):
+        interaction = FakeInteraction(api, channel)
+        await timed(samples, lambda: commands.apply_downtime(
+            interaction, "1/1/2099 4pm", f"1/1/2099 {5 + i % 6}pm", "UTC", "Benchmark", channel.guild.id
+        ))
+    results.append(("apply_downtime", samples, repeat))
+
+    samples = []
+    for _ in range(repeat):
+        interaction = FakeInteraction(api, channel)
+        await timed(samples, lambda: commands.extenddowntime.callback(interaction, "+30m", "UTC"))
+    results.append(("extenddowntime", samples, repeat))
+
+    # The same window set in every guild: one /downtime per guild, then one broadcast
+    guild_ids = sorted({c.guild.id for c in channels})
+    guild_channels = {c.guild.id: c for c in channels}
+    started = time.perf_counter()
+    for guild_id in guild_ids:
+        interaction = FakeInteraction(api, guild_channels[guild_id])
+        await commands.apply_downtime(interaction, "1/2/2099 4pm", "1/2/2099 6pm", "UTC", "Benchmark", guild_id)
+    per_guild_time = time.perf_counter() - started
+    interaction = FakeInteraction(api, channel)
+    config.OPERATOR_USER_IDS = {interaction.user.id}
+    targets = ",".join(str(guild_id) for guild_id in guild_ids)
+    samples = []
+    await timed(samples, lambda: commands.broadcast_downtime.callback(
+        interaction, targets, "1/3/2099 4pm", "1/3/2099 6pm", "UTC", "Benchmark"
+    ))
+    broadcast_line = (f"  broadcast to {len(guild_ids)} guilds: /downtime per guild {per_guild_time * 1000:.1f}ms, "
+                      f"/broadcastdowntime {samples[0] * 1000:.1f}ms")
+
+    samples = []
+    panel = views.StatusPanel()
+    clicks = repeat * 10
+    for _ in range(clicks):
+        interaction = FakeInteraction(api, channel)
+        await timed(samples, lambda: panel.check_status.callback(interaction))
+    results.append(("check_status", samples, clicks))
+
+    samples = []
+    for _ in range(repeat):
+        await timed(samples, lambda: full_refresh(scheduling.update_panels))
+    results.append(("update_panels", samples, repeat * len(storage.panel_messages)))
+
+    samples = []
+    for _ in range(repeat):
+        await timed(samples, lambda: full_refresh(scheduling.update_event_panels))
+    results.append(("update_event_panels", samples, repeat * len(storage.event_panel_messages)))
+
+    samples = []
+    for _ in range(repeat):
+        interaction = FakeInteraction(api, channel)
+        await timed(samples, lambda: event_commands.post_all_events_cmd.callback(interaction))
+    results.append(("post_all_events_cmd", samples, repeat))
+
+    # Delete every tenth status panel and deliver the gateway delete events
+    dead = storage.panel_messages[::10]
+    for item in dead:
+        api.channels[item["channel_id"]].messages.pop(item["message_id"], None)
+        await core.on_raw_message_delete(SimpleNamespace(message_id=item["message_id"]))
+    calls_before = api.total_calls()
+    await full_refresh(scheduling.update_panels)
+    refresh_calls = api.total_calls() - calls_before
+
+    report = [f"\n{count} panels ({guilds} guilds, {len(channels)} channels, repeat={repeat})"]
+    for name, op_samples, units in results:
+        report.append(format_row(name, op_samples, units))
+    report.append(broadcast_line)
+    report.append(f"  REST calls: {api.total_calls()}  injected 429s: {api.rate_limited}")
+    report.append(f"  deleted panels: {len(dead)} evicted by gateway events; next refresh made "
+                  f"{refresh_calls} REST calls for {len(storage.panel_messages)} live panels")
+    print("\n".join(report), file=sys.__stdout__)
+
+
+async def run(args: argparse.Namespace) -> None:
+    for count in args.panels:
+        await run_scenario(args, count)
+
+
+def quiet_handlers(args: argparse.Namespace) -> contextlib.AbstractContextManager:
+    """Silence the bot's own print logging unless --verbose is passed."""
+    if args.verbose:
+        return contextlib.nullcontext()
+    return contextlib.redirect_stdout(open(os.devnull, "w"))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--panels", default="1,100,10000", help="comma-separated panel counts")
+    parser.add_argument("--guilds", type=int, default=10)
+    parser.add_argument("--channels-per-guild", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="chance of a 429 per request")
+    parser.add_argument("--retry-after-ms", type=float, default=50.0)
+    parser.add_argument("--cache-channels", action="store_true", help="serve channels from the fake gateway cache")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--verbose", action="store_true", help="show the bot's own log output")
+    args = parser.parse_args()
+    args.panels = [int(x) for x in args.panels.split(",") if x.strip()]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config.DATA_FILE = os.path.join(tmp, "bot_data.json")
+        with quiet_handlers(args):
+            asyncio.run(run(args))
+        storage.flush_data()
+
+
+if __name__ == "__main__":
+    main()
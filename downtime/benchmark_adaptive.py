@@ -0,0 +1,128 @@
+"""Benchmark adaptive panel edit concurrency against a rate limited fake API.
+
+Usage:
+    python benchmark_adaptive.py
+    python benchmark_adaptive.py --panels 1000 --global-rate 50
+
+Seeds --panels status panels and as many event panels (two per channel,
+so per-channel buckets never bind) and refreshes all of them, as at
+startup, with REFRESH's fixed budget of 8 and with the adaptive limit
+(REFRESH_MAX_CONCURRENCY=32). The fake API answers with a global 429 past
+--global-rate requests per second, and feeds every response to
+outbound.record_response like httpclient's trace does. Three APIs:
+- fast: little latency, so 8 in flight is far over the global limit;
+- slow: high latency, so 8 in flight is far under it;
+- pooled: a small connection pool, under the global limit even when
+  full, so more than the pool size in flight only adds queueing latency.
+For the adaptive runs the limit is sampled every 0.1s and compared with
+the ideal (global rate x latency, or the pool size). Nothing here talks
+to Discord.
+"""
+import argparse
+import asyncio
+import contextlib
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from updatebot import config, core, outbound, scheduling, warmstart  # noqa: E402
+from updatebot.outbound import OutboundScheduler, Priority  # noqa: E402
+from benchmark import percentile, seed_panels  # noqa: E402
+from fake_discord import FakeClient, FakeDiscordAPI  # noqa: E402
+
+EDIT_ROUTE = "PATCH /channels/{channel_id}/messages/{message_id}"
+SAMPLE_INTERVAL = 0.1
+
+
+def scenarios(args: argparse.Namespace) -> list[tuple[str, float, int, float]]:
+    """(name, latency, pool connections, ideal concurrency)."""
+    rate = args.global_rate
+    return [
+        ("fast", 0.03, 0, rate * 0.03),
+        ("slow", 0.4, 0, rate * 0.4),
+        ("pooled", 0.2, 4, 4.0),
+    ]
+
+
+async def run_case(args: argparse.Namespace, latency: float, pool: int, ideal: float, adaptive: bool) -> str:
+    api = FakeDiscordAPI(latency=latency, jitter=latency / 5, connections=pool, seed=args.seed,
+                         global_limit=(args.global_rate, 1.0))
+    latencies: list[float] = []
+
+    def on_response(elapsed: float, status: int, headers: dict) -> None:
+        latencies.append(elapsed)
+        outbound.record_response(elapsed, status, headers)
+
+    api.on_response = on_response
+    core.client = FakeClient(api, cache_channels=True)
+    config.REFRESH_MAX_CONCURRENCY = 32 if adaptive else 0
+    scheduler = OutboundScheduler()
+    outbound.scheduler = scheduling.scheduler = scheduler
+    warmstart.panel_hashes.clear()
+    seed_panels(api, args.panels, args.panels // 2, 2)
+
+    samples: list[tuple[float, int]] = []
+    started = time.perf_counter()
+
+    async def sample() -> None:
+        while True:
+            limit = scheduler.adaptive_limit(Priority.REFRESH)
+            samples.append((time.perf_counter() - started, limit.current() if limit else 8))
+            await asyncio.sleep(SAMPLE_INTERVAL)
+
+    sampler = asyncio.get_running_loop().create_task(sample())
+    try:
+        await scheduling.update_panels()
+        await scheduling.update_event_panels()
+    finally:
+        sampler.cancel()
+    elapsed = time.perf_counter() - started
+
+    edits = api.calls[EDIT_ROUTE]
+    line = (f"    {'adaptive' if adaptive else 'fixed 8':<9} {edits / elapsed:6.1f} edits/s  {elapsed:6.1f}s  "
+            f"429s={api.rate_limited:<5} request p50={percentile(latencies, 50) * 1000:4.0f}ms  ")
+    if not adaptive:
+        return line
+    limits = [limit for _, limit in samples]
+    settled = next(
+        (t for i, (t, _) in enumerate(samples)
+         if all(ideal / 2 <= limit <= ideal * 2 for _, limit in samples[i:])),
+        None,
+    )
+    second_half = limits[len(limits) // 2:]
+    adaptive_limit = scheduler.adaptive_limit(Priority.REFRESH)
+    line += (f"limit p50={percentile(second_half, 50)} range {min(second_half)}-{max(second_half)} "
+             f"in the second half (ideal {ideal:.1f}), cuts={adaptive_limit.cuts}")
+    line += f", within 0.5-2x of ideal from {settled:.1f}s" if settled is not None else ", never settled"
+    return line
+
+
+async def run(args: argparse.Namespace) -> None:
+    out = sys.__stdout__
+    print(f"{args.panels * 2} panel edits, global limit {args.global_rate}/s", file=out)
+    for name, latency, pool, ideal in scenarios(args):
+        pool_text = f", pool of {pool}" if pool else ""
+        print(f"  {name}: {latency * 1000:.0f}ms latency{pool_text}", file=out)
+        for adaptive in (False, True):
+            print(await run_case(args, latency, pool, ideal, adaptive), file=out)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--panels", type=int, default=500, help="status panels (and as many event panels)")
+    parser.add_argument("--global-rate", type=int, default=50, help="requests per second before a global 429")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--verbose", action="store_true", help="show the bot's own log output")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config.DATA_FILE = os.path.join(tmp, "bot_data.json")
+        with contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(open(os.devnull, "w")):
+            asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""Failover test for the HA lease: takeover time and no double editing.
+
+Usage:
+    python benchmark_failover.py
+    python benchmark_failover.py --ttl 3 --rounds 3
+
+Starts two instances of this script as separate processes sharing one
+SQLite lease file. Each runs under core.run_instance, as core.run_client
+does: it waits for the lease, refreshes a set of fake panels through
+scheduling.refresh_panels every --interval seconds, logging every edit to
+a shared file, and stops on the bot's own signal handling and shutdown.
+The active instance is then:
+
+  killed       SIGKILL; the standby takes over once the lease expires
+  paused       SIGSTOP for 1.5 x TTL, then SIGCONT; the old instance must
+               not edit anything after the standby took over
+  stopped      SIGTERM, as a supervisor stops it; the lease is released at
+               shutdown, so takeover is quick
+  interrupted  SIGINT (Ctrl-C), the same way
+
+Takeover is measured from the signal to the standby's first panel edit.
+Each instance keeps its own warm-start snapshot, and the report says
+whether the old one left a clean snapshot (which only a clean shutdown
+writes). Nothing here talks to Discord.
+"""
+import argparse
+import asyncio
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from updatebot import config, core, lease, scheduling, storage, warmstart  # noqa: E402
+from fake_discord import FakeClient, FakeDiscordAPI  # noqa: E402
+
+EDIT_ROUTE = "PATCH /channels/{channel_id}/messages/{message_id}"
+
+
+def log(path: str, name: str, event: str) -> None:
+    # One short O_APPEND write per line, so lines from both processes never interleave
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(f"{time.time():.4f} {name} {event}\n")
+
+
+async def instance(args: argparse.Namespace) -> None:
+    """One bot instance: standby until it holds the lease, then refresh panels in a loop."""
+    api = FakeDiscordAPI(latency=0.005)
+    core.client = FakeClient(api, cache_channels=True)
+    channel = api.create_channel(500000000000000000)
+    for _ in range(args.panels):
+        storage.add_panel({"channel_id": channel.id, "message_id": channel.seed_message().id,
+                           "guild_id": channel.guild.id})
+
+    request = api.request
+
+    async def logged_request(route: str, bucket=None) -> None:
+        await request(route, bucket)
+        if route == EDIT_ROUTE:
+            log(args.log, args.instance, "edit")
+
+    api.request = logged_request
+    stop = asyncio.Event()
+
+    async def close() -> None:
+        # Stands in for client.close()
+        stop.set()
+
+    async def serve() -> None:
+        log(args.log, args.instance, "acquired")
+        # As on_ready does; shutdown() writes the clean snapshot
+        warmstart.start_snapshot_loop()
+        try:
+            while not stop.is_set():
+                warmstart.panel_hashes.clear()
+                await scheduling.refresh_panels(list(storage.panel_messages))
+                try:
+                    await asyncio.wait_for(stop.wait(), args.interval)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            # core.shutdown() releases the lease right after this
+            log(args.log, args.instance, "lost" if lease.lost else "released")
+
+    config.HA_LEASE_FILE = args.lease_file
+    config.HA_LEASE_TTL = args.ttl
+    await core.run_instance(serve, close)
+
+
+def read_log(path: str) -> list[tuple[float, str, str]]:
+    with open(path, "r", encoding="utf-8") as f:
+        return [(float(t), name, event) for t, name, event in (line.split() for line in f if line.strip())]
+
+
+def wait_for(path: str, predicate, timeout: float) -> bool:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if any(predicate(entry) for entry in read_log(path)):
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def snapshot_state(path: str) -> str:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return "clean" if json.load(f).get("clean") is True else "unclean"
+    except (OSError, ValueError):
+        return "no"
+
+
+def run_scenario(args: argparse.Namespace, tmp: str, scenario: str, round_no: int) -> str:
+    log_path = os.path.join(tmp, f"{scenario}-{round_no}.log")
+    lease_file = os.path.join(tmp, f"{scenario}-{round_no}.lease")
+    open(log_path, "w").close()
+
+    def spawn(name: str) -> subprocess.Popen:
+        return subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), "--instance", name, "--log", log_path,
+             "--lease-file", lease_file, "--ttl", str(args.ttl), "--interval", str(args.interval),
+             "--panels", str(args.panels), "--warm-start", f"{log_path}.{name}.warm"],
+            stdout=subprocess.DEVNULL,
+        )
+
+    active = spawn("a")
+    if not wait_for(log_path, lambda e: e[1:] == ("a", "edit"), 20):
+        active.kill()
+        return f"  {scenario:<11} instance a never started editing"
+    standby = spawn("b")
+    time.sleep(args.ttl)
+
+    signalled = time.time()
+    if scenario == "killed":
+        active.send_signal(signal.SIGKILL)
+    elif scenario == "paused":
+        active.send_signal(signal.SIGSTOP)
+    elif scenario == "interrupted":
+        active.send_signal(signal.SIGINT)
+    else:
+        active.send_signal(signal.SIGTERM)
+    took_over = wait_for(log_path, lambda e: e[1:] == ("b", "edit"), args.ttl * 4)
+    if scenario == "paused":
+        time.sleep(max(0.0, signalled + args.ttl * 1.5 - time.time()))
+        active.send_signal(signal.SIGCONT)
+        # Give the old instance time to resume, notice and stop
+        time.sleep(args.ttl)
+    for proc in (active, standby):
+        if proc.poll() is None:
+            proc.send_signal(signal.SIGTERM)
+    for proc in (active, standby):
+        try:
+            proc.wait(5)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+    entries = read_log(log_path)
+    if not took_over:
+        return f"  {scenario:<11} standby did not take over within {args.ttl * 4:.0f}s"
+    first_b = min(t for t, name, event in entries if name == "b" and event == "edit")
+    last_b = max(t for t, name, event in entries if name == "b")
+    # Edits by a after b's first edit, while b was still running, are double edits
+    overlap = sum(1 for t, name, event in entries if name == "a" and event == "edit" and first_b <= t <= last_b)
+    a_end = next((event for _, name, event in entries if name == "a" and event in ("lost", "released")), "killed")
+    return (f"  {scenario:<11} takeover {first_b - signalled:5.2f}s  "
+            f"edits by the old instance after takeover: {overlap}  "
+            f"(old instance: {a_end}, {snapshot_state(f'{log_path}.a.warm')} snapshot)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ttl", type=float, default=3.0, help="lease TTL in seconds")
+    parser.add_argument("--interval", type=float, default=0.2, help="seconds between refreshes")
+    parser.add_argument("--panels", type=int, default=5)
+    parser.add_argument("--rounds", type=int, default=1)
+    parser.add_argument("--scenarios", default="killed,paused,stopped,interrupted")
+    parser.add_argument("--instance", help=argparse.SUPPRESS)
+    parser.add_argument("--log", help=argparse.SUPPRESS)
+    parser.add_argument("--lease-file", help=argparse.SUPPRESS)
+    parser.add_argument("--warm-start", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config.DATA_FILE = os.path.join(tmp, f"bot_data-{args.instance or 'main'}.json")
+        config.WARM_START_FILE = args.warm_start or os.path.join(tmp, "warm_start.json")
+        if args.instance:
+            asyncio.run(instance(args))
+            storage.flush_data()
+            return
+        print(f"Lease TTL {args.ttl:.1f}s, renewed every {args.ttl / 3:.1f}s")
+        for scenario in args.scenarios.split(","):
+            for round_no in range(args.rounds):
+                print(run_scenario(args, tmp, scenario, round_no))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""Load test for the iCalendar feed endpoint.
+
+Usage:
+    python benchmark_ics.py
+    python benchmark_ics.py --guilds 2000 --clients 200 --requests 20000
+
+Starts icsfeed's server on a free local port with --guilds guilds of
+--windows downtime windows each, then has --clients concurrent calendar
+clients fetch random guild feeds until --requests have been answered.
+The clients share the server's process, so req/s is a floor; "feed" is
+the server's own time to produce the response body. Compared: every
+request rebuilding its feed (the caches cleared first), cached feeds sent
+in full, and conditional requests answered with 304 (what a polling
+calendar app sends once it has the feed). Nothing here talks to Discord.
+"""
+import argparse
+import asyncio
+import contextlib
+import os
+import random
+import socket
+import sys
+import tempfile
+import time
+
+import aiohttp
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from updatebot import config, icsfeed, storage  # noqa: E402
+from benchmark import percentile  # noqa: E402
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def seed(guilds: int, windows: int, rng: random.Random) -> list[int]:
+    storage.clear_state()
+    start = 1770000000
+    guild_ids = [600000000000000000 + g for g in range(guilds)]
+    for guild_id in guild_ids:
+        schedule = storage.get_schedule(guild_id)
+        for _ in range(windows):
+            window_start = start + rng.randrange(60 * 86400) // 60 * 60
+            schedule.add(window_start, window_start + rng.choice((1, 2, 3)) * 3600, "Benchmark maintenance")
+    return guild_ids
+
+
+def clear_caches() -> None:
+    icsfeed._events_block = None
+    icsfeed._window_blocks.clear()
+    icsfeed._feeds.clear()
+
+
+async def run_case(args: argparse.Namespace, guild_ids: list[int], mode: str) -> str:
+    base = f"http://{config.ICS_HOST}:{config.ICS_PORT}/calendar"
+    get_feed = icsfeed.get_feed
+    feed_times: list[float] = []
+
+    def timed_feed(guild_id):
+        started = time.perf_counter()
+        if mode == "rebuild":
+            clear_caches()
+        result = get_feed(guild_id)
+        feed_times.append(time.perf_counter() - started)
+        return result
+
+    etags: dict[int, str] = {}
+    latencies: list[float] = []
+    statuses: dict[int, int] = {}
+    received = 0
+    remaining = args.requests
+    rng = random.Random(args.seed)
+
+    async def client(session: aiohttp.ClientSession) -> None:
+        nonlocal remaining, received
+        while remaining > 0:
+            remaining -= 1
+            guild_id = rng.choice(guild_ids)
+            headers = {"If-None-Match": etags[guild_id]} if mode == "etag" and guild_id in etags else {}
+            started = time.perf_counter()
+            async with session.get(f"{base}/{guild_id}.ics", headers=headers) as response:
+                body = await response.read()
+            latencies.append(time.perf_counter() - started)
+            statuses[response.status] = statuses.get(response.status, 0) + 1
+            received += len(body)
+            etags[guild_id] = response.headers["ETag"]
+
+    connector = aiohttp.TCPConnector(limit=args.clients)
+    try:
+        async with aiohttp.ClientSession(connector=connector) as session:
+            if mode == "etag":
+                # Calendar apps that already hold every feed
+                for guild_id in guild_ids:
+                    async with session.get(f"{base}/{guild_id}.ics") as response:
+                        etags[guild_id] = response.headers["ETag"]
+            icsfeed.get_feed = timed_feed
+            started = time.perf_counter()
+            await asyncio.gather(*(client(session) for _ in range(args.clients)))
+            elapsed = time.perf_counter() - started
+    finally:
+        icsfeed.get_feed = get_feed
+    codes = ", ".join(f"{status}={count}" for status, count in sorted(statuses.items()))
+    return (f"  {mode:<8} {len(latencies) / elapsed:8.0f} req/s  p50={percentile(latencies, 50) * 1000:6.2f}ms "
+            f"p99={percentile(latencies, 99) * 1000:6.2f}ms  feed {sum(feed_times) / len(feed_times) * 1e6:7.1f}us  "
+            f"{received / len(latencies) / 1024:6.1f} KiB/resp  ({codes})")
+
+
+async def run(args: argparse.Namespace) -> None:
+    guild_ids = seed(args.guilds, args.windows, random.Random(args.seed))
+    config.ICS_PORT = free_port()
+    await icsfeed.start_server()
+    try:
+        print(f"{args.requests} requests from {args.clients} clients over {args.guilds} guild feeds "
+              f"({args.windows} windows each)", file=sys.__stdout__)
+        for mode in ("rebuild", "cached", "etag"):
+            clear_caches()
+            print(await run_case(args, guild_ids, mode), file=sys.__stdout__)
+    finally:
+        await icsfeed.stop_server()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--guilds", type=int, default=1000)
+    parser.add_argument("--windows", type=int, default=10, help="downtime windows per guild")
+    parser.add_argument("--clients", type=int, default=100, help="concurrent calendar clients")
+    parser.add_argument("--requests", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--verbose", action="store_true", help="show the bot's own log output")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config.DATA_FILE = os.path.join(tmp, "bot_data.json")
+        with contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(open(os.devnull, "w")):
+            asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
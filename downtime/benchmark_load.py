@@ -0,0 +1,135 @@
+"""Benchmark load_data time and peak RSS against the number of stored records.
+
+Usage:
+    python benchmark_load.py
+    python benchmark_load.py --records 1000,10000,100000 --guilds 50
+
+For each record count a state file with that many status panels and event
+panels is written in every format, then loaded in a fresh subprocess so
+peak RSS belongs to that load alone. "json.load" is the previous loader:
+parse the whole document, then validate it.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from updatebot import config, datafile, storage  # noqa: E402
+
+MODES = ("json.load", "json", "jsonl")
+
+
+def peak_rss_kib() -> int:
+    # VmHWM starts fresh at exec; ru_maxrss on Linux carries over the parent's peak
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        # Not available on Windows
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, everything else KiB
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def build_state(records: int, guilds: int) -> dict:
+    guild_ids = [300000000000000000 + g for g in range(guilds)]
+    now = int(time.time())
+    return {
+        "downtime": {
+            str(guild_id): [
+                {"start": now + i * 7200, "end": now + i * 7200 + 3600, "title": f"Maintenance {i}"}
+                for i in range(10)
+            ]
+            for guild_id in guild_ids
+        },
+        "panels": [
+            {"channel_id": 400000000000000000 + i, "message_id": 500000000000000000 + i,
+             "guild_id": guild_ids[i % guilds]}
+            for i in range(records)
+        ],
+        "event_panels": [
+            {"channel_id": 400000000000000000 + i, "message_id": 600000000000000000 + i,
+             "guild_id": guild_ids[i % guilds], "event_type": "quest"}
+            for i in range(records)
+        ],
+        "downtime_roles": {str(guild_id): [guild_id + 1, guild_id + 2] for guild_id in guild_ids},
+    }
+
+
+def load_whole_document() -> None:
+    """The loader before streaming: json.load everything, then validate."""
+    with open(config.DATA_FILE, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    storage.panel_messages.clear()
+    storage.event_panel_messages.clear()
+    for key, windows in data["downtime"].items():
+        for window in windows:
+            storage.add_record("downtime", int(key), window)
+    for item in data["panels"]:
+        storage.add_record("panel", None, item)
+    for item in data["event_panels"]:
+        storage.add_record("event_panel", None, item)
+    for key, role_ids in data["downtime_roles"].items():
+        storage.add_record("downtime_roles", int(key), role_ids)
+
+
+def run_child(mode: str, path: str) -> None:
+    config.DATA_FILE = path
+    baseline = peak_rss_kib()
+    started = time.perf_counter()
+    if mode == "json.load":
+        load_whole_document()
+    else:
+        storage.load_data()
+    elapsed = time.perf_counter() - started
+    loaded = len(storage.panel_messages) + len(storage.event_panel_messages)
+    print(json.dumps({"elapsed": elapsed, "rss_kib": peak_rss_kib() - baseline, "loaded": loaded}))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", default="1000,10000,100000", help="comma-separated panel counts")
+    parser.add_argument("--guilds", type=int, default=50)
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        run_child(*args.child)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for records in [int(x) for x in args.records.split(",") if x.strip()]:
+            state = build_state(records, args.guilds)
+            paths = {}
+            for fmt in datafile.FORMATS:
+                paths[fmt] = os.path.join(tmp, f"state.{fmt}")
+                with open(paths[fmt], "w", encoding="utf-8") as f:
+                    datafile.WRITERS[fmt](f, state)
+            paths["json.load"] = paths["json"]
+            del state
+
+            print(f"{records} panels + {records} event panels ({args.guilds} guilds)")
+            for mode in MODES:
+                out = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), "--child", mode, paths[mode]],
+                    capture_output=True, text=True, check=True,
+                ).stdout
+                result = json.loads(out.strip().splitlines()[-1])
+                size = os.path.getsize(paths[mode]) / 1024 / 1024
+                print(f"  {mode:<10} file={size:7.2f} MiB  load={result['elapsed'] * 1000:9.1f}ms  "
+                      f"peak RSS +{result['rss_kib'] / 1024:7.1f} MiB  records={result['loaded']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Measure client cache memory per 1k guilds for the old and current client options.
+
+Usage:
+    python benchmark_memory.py
+    python benchmark_memory.py --guilds 1000 --voice-members 25
+
+Synthetic GUILD_CREATE payloads (shaped by what each intent set makes the
+gateway send) are fed straight into the client's connection state, so
+nothing talks to Discord. Allocations are measured with tracemalloc.
+"""
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import discord  # noqa: E402
+
+from updatebot.core import get_client_options  # noqa: E402
+
+SELF_ID = 900000000000000000
+
+
+def make_user(user_id: int) -> dict:
+    return {"id": str(user_id), "username": f"user{user_id}", "discriminator": "0", "avatar": None}
+
+
+def make_guild(guild_id: int, args: argparse.Namespace, intents: discord.Intents) -> dict:
+    channels = [
+        {"id": str(guild_id + 1 + i), "type": 0, "name": f"channel-{i}", "position": i, "permission_overwrites": []}
+        for i in range(args.channels)
+    ]
+    roles = [
+        {"id": str(guild_id + 1000 + i), "name": f"role-{i}", "permissions": "0", "position": i, "color": 0,
+         "hoist": False, "managed": False, "mentionable": False}
+        for i in range(args.roles)
+    ]
+    roles.append({"id": str(guild_id), "name": "@everyone", "permissions": "0", "position": 0, "color": 0,
+                  "hoist": False, "managed": False, "mentionable": False})
+    member_ids = [SELF_ID]
+    voice_states = []
+    if intents.voice_states:
+        # Members in voice are always included alongside their voice state
+        for i in range(args.voice_members):
+            user_id = guild_id + 5000 + i
+            member_ids.append(user_id)
+            voice_states.append({"user_id": str(user_id), "channel_id": channels[0]["id"], "session_id": "x",
+                                 "deaf": False, "mute": False, "self_deaf": False, "self_mute": False,
+                                 "self_video": False, "suppress": False, "request_to_speak_timestamp": None})
+    members = [
+        {"user": make_user(user_id), "roles": [roles[0]["id"]], "joined_at": "2024-01-01T00:00:00+00:00",
+         "deaf": False, "mute": False, "flags": 0}
+        for user_id in member_ids
+    ]
+    return {
+        "id": str(guild_id),
+        "name": f"guild-{guild_id}",
+        "owner_id": str(SELF_ID),
+        "channels": channels,
+        "roles": roles,
+        "members": members,
+        "voice_states": voice_states,
+        "emojis": [],
+        "stickers": [],
+        "threads": [],
+        "member_count": 1000,
+        "large": False,
+    }
+
+
+def make_message(message_id: int, channel_id: int, guild_id: int) -> dict:
+    return {
+        "id": str(message_id), "channel_id": str(channel_id), "guild_id": str(guild_id),
+        "author": make_user(message_id), "content": "", "timestamp": "2024-01-01T00:00:00+00:00",
+        "edited_timestamp": None, "tts": False, "mention_everyone": False, "mentions": [],
+        "mention_roles": [], "attachments": [], "embeds": [], "pinned": False, "type": 0,
+    }
+
+
+def measure(options: dict, args: argparse.Namespace) -> int:
+    gc.collect()
+    tracemalloc.start()
+    client = discord.Client(**options)
+    state = client._connection
+    state.user = discord.ClientUser(state=state, data=make_user(SELF_ID))
+    baseline = tracemalloc.get_traced_memory()[0]
+
+    guild_ids = [100000000000000000 + i * 10000 for i in range(args.guilds)]
+    for guild_id in guild_ids:
+        state._add_guild_from_data(make_guild(guild_id, args, options["intents"]))
+    if options["intents"].guild_messages:
+        # Message traffic fills the message cache up to max_messages
+        for i in range(args.messages):
+            guild_id = guild_ids[i % len(guild_ids)]
+            state.parse_message_create(make_message(800000000000000000 + i, guild_id + 1, guild_id))
+
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    del client, state
+    return used
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--guilds", type=int, default=1000)
+    parser.add_argument("--channels", type=int, default=30)
+    parser.add_argument("--roles", type=int, default=40)
+    parser.add_argument("--voice-members", type=int, default=10, help="members in voice per guild")
+    parser.add_argument("--messages", type=int, default=5000, help="MESSAGE_CREATE events to replay")
+    args = parser.parse_args()
+
+    variants = [
+        ("before (Intents.default)", {"intents": discord.Intents.default()}),
+        ("after (get_client_options)", get_client_options()),
+    ]
+    per_k = 1000 / args.guilds
+    print(f"{args.guilds} guilds, {args.channels} channels, {args.roles} roles, "
+          f"{args.voice_members} voice members per guild, {args.messages} messages replayed")
+    for name, options in variants:
+        used = measure(options, args)
+        print(f"  {name:<28} {used / 1024 / 1024 * per_k:8.2f} MiB per 1k guilds")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Benchmark paged event embeds on catalogs too big for one embed.
+
+Usage:
+    python benchmark_pages.py
+    python benchmark_pages.py --copies 1,10,50,200 --iterations 5000
+
+Uses benchmark_render's shifted catalog, repeated --copies times. For the
+resonance panel and the all events embed it reports how long the text
+would be as a single embed (Discord rejects a description over 4096
+characters, and panel edits then fail), how many pages it is split into
+and the largest page, the cost of building the page set (once per catalog
+and event transition) and of a page button click, which is a lookup in
+the cached set plus two buttons. Nothing here talks to Discord.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from updatebot import catalog, rendering, views  # noqa: E402
+from benchmark_render import build_catalog  # noqa: E402
+
+
+def embed_length(embed) -> int:
+    return len(embed.title or "") + len(embed.description or "") + len(embed.footer.text or "")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--copies", default="1,10,50,200", help="comma-separated catalog sizes (copies of each event)")
+    parser.add_argument("--iterations", type=int, default=5000)
+    args = parser.parse_args()
+
+    for copies in [int(x) for x in args.copies.split(",") if x.strip()]:
+        catalog.EVENTS[:] = build_catalog(copies)
+        catalog.invalidate_caches()
+        print(f"{len(catalog.EVENTS)} catalog entries")
+        for key in ("resonance", rendering.ALL_EVENTS):
+            started = time.perf_counter()
+            for _ in range(max(1, args.iterations // 100)):
+                rendering._event_pages.clear()
+                pages = rendering.get_event_pages(key)
+            build = (time.perf_counter() - started) / max(1, args.iterations // 100)
+
+            started = time.perf_counter()
+            for i in range(args.iterations):
+                page = i % len(pages)
+                rendering.get_event_pages(key)[page]
+                views.get_event_page_view(key, page, len(pages))
+            click = (time.perf_counter() - started) / args.iterations
+
+            separator = "\n\n" if key == rendering.ALL_EVENTS else rendering.EVENT_SEPARATOR
+            total = len(separator.join(page.description for page in pages))
+            largest = max(embed_length(page) for page in pages)
+            longest = max(len(page.description) for page in pages)
+            over = " (over the limit)" if total > rendering.EMBED_DESCRIPTION_LIMIT else ""
+            print(f"  {key:<10} one embed {total:7d} chars{over:<17} -> {len(pages):3d} page(s), "
+                  f"largest {longest} desc / {largest} total   build {build * 1e3:7.2f} ms   click {click * 1e6:6.1f} us")
+            assert longest <= rendering.EMBED_DESCRIPTION_LIMIT and largest <= rendering.EMBED_TOTAL_LIMIT
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""Benchmark interaction latency while a large background refresh drains.
+
+Usage:
+    python benchmark_priority.py
+    python benchmark_priority.py --panels 5000 --pool 10 --latency-ms 20
+
+Seeds --panels status panels and as many event panels, then refreshes all
+of them at once (update_panels plus update_event_panels, as after a
+catalog reload at a window transition). While that drains, a "Check
+Status" click and a /downtime in a small guild arrive every --interval
+seconds. The fake API shares --pool connections between every request,
+like a capped HTTP_POOL_SIZE. Each case is run with the outbound scheduler
+disabled (no budgets, no hold) and enabled. Nothing here talks to Discord.
+"""
+import argparse
+import asyncio
+import contextlib
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from updatebot import commands, config, core, outbound, scheduling, storage, views, warmstart  # noqa: E402
+from updatebot.outbound import OutboundScheduler, Priority  # noqa: E402
+from benchmark import EVENT_TYPES, percentile  # noqa: E402
+from fake_discord import FakeClient, FakeDiscordAPI, FakeInteraction  # noqa: E402
+
+# Enough to never bind, i.e. no scheduling
+UNLIMITED = {priority: 10 ** 9 for priority in Priority}
+
+
+def seed(api: FakeDiscordAPI, count: int, guilds: int, channels_per_guild: int) -> list:
+    """count status and count event panels over the big guilds, plus one small guild to run /downtime in."""
+    storage.clear_state()
+    channels = [
+        api.create_channel(300000000000000000 + g)
+        for g in range(guilds)
+        for _ in range(channels_per_guild)
+    ]
+    for i in range(count):
+        channel = channels[i % len(channels)]
+        storage.add_panel({"channel_id": channel.id, "message_id": channel.seed_message().id,
+                           "guild_id": channel.guild.id})
+        storage.add_event_panel({"channel_id": channel.id, "message_id": channel.seed_message().id,
+                                 "guild_id": channel.guild.id, "event_type": EVENT_TYPES[i % len(EVENT_TYPES)]})
+    small = api.create_channel(399999999999999999)
+    for _ in range(3):
+        storage.add_panel({"channel_id": small.id, "message_id": small.seed_message().id, "guild_id": small.guild.id})
+    return [small]
+
+
+async def run_case(args: argparse.Namespace, scheduled: bool) -> str:
+    api = FakeDiscordAPI(latency=args.latency_ms / 1000, jitter=args.latency_ms / 4000, connections=args.pool)
+    core.client = FakeClient(api, cache_channels=True)
+    config.HTTP_POOL_SIZE = args.pool if scheduled else 0
+    scheduler = OutboundScheduler() if scheduled else OutboundScheduler(UNLIMITED, hold=0.0, adaptive=False)
+    outbound.scheduler = scheduling.scheduler = scheduler
+    # Panels the previous case edited would otherwise be skipped as unchanged
+    warmstart.panel_hashes.clear()
+    (small,) = seed(api, args.panels, args.guilds, args.channels_per_guild)
+    panel = views.StatusPanel()
+    clicks: list[float] = []
+    downtimes: list[float] = []
+
+    async def interact() -> None:
+        interaction = FakeInteraction(api, small)
+        await core.on_interaction(interaction)
+        started = time.perf_counter()
+        await panel.check_status.callback(interaction)
+        clicks.append(time.perf_counter() - started)
+
+        interaction = FakeInteraction(api, small)
+        await core.on_interaction(interaction)
+        started = time.perf_counter()
+        await commands.apply_downtime(interaction, "1/3/2099 4pm", "1/3/2099 6pm", "UTC", "Bench", small.guild.id)
+        downtimes.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    drain = asyncio.ensure_future(asyncio.gather(scheduling.update_panels(), scheduling.update_event_panels()))
+    while not drain.done():
+        await interact()
+        await asyncio.wait({drain}, timeout=args.interval)
+    drained = time.perf_counter() - started
+
+    name = "scheduled" if scheduled else "unscheduled"
+    return (
+        f"  {name:<12} drain {drained:6.2f}s  "
+        f"check status p50={percentile(clicks, 50) * 1000:7.1f}ms p99={percentile(clicks, 99) * 1000:7.1f}ms  "
+        f"/downtime p50={percentile(downtimes, 50) * 1000:7.1f}ms p99={percentile(downtimes, 99) * 1000:7.1f}ms  "
+        f"(n={len(clicks)})"
+    )
+
+
+async def run(args: argparse.Namespace) -> None:
+    print(f"{args.panels * 2} background edits, {args.pool} connections, {args.latency_ms:.0f}ms latency",
+          file=sys.__stdout__)
+    for scheduled in (False, True):
+        print(await run_case(args, scheduled), file=sys.__stdout__)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--panels", type=int, default=5000, help="status panels (and as many event panels)")
+    parser.add_argument("--guilds", type=int, default=100)
+    parser.add_argument("--channels-per-guild", type=int, default=5)
+    parser.add_argument("--pool", type=int, default=10, help="shared connections")
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--interval", type=float, default=0.2, help="seconds between interactions")
+    parser.add_argument("--verbose", action="store_true", help="show the bot's own log output")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config.DATA_FILE = os.path.join(tmp, "bot_data.json")
+        with contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(open(os.devnull, "w")):
+            asyncio.run(run(args))
+        storage.flush_data()
+
+
+if __name__ == "__main__":
+    main()
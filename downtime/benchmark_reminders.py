@@ -0,0 +1,255 @@
+"""Subscribe many users to reminders and fast-forward a week of them.
+
+Usage:
+    python benchmark_reminders.py
+    python benchmark_reminders.py --subscriptions 200000 --users 80000 --days 14
+
+Spreads --subscriptions reminders over --users users: every event type
+plus the start and end of each guild's downtime windows, at a handful of
+lead times, mostly by DM and the rest as channel mentions. Reported:
+- memory held by the subscriptions (tracemalloc), against keeping one
+  record and one sleeping asyncio task per reminder;
+- time to plan the wheel;
+- a --days fast-forward on a clock.VirtualClock from the season start,
+  with firings, DMs and mention messages sent, how late each firing was,
+  how long its DMs took to go out at REMINDER_DM_RATE and how long its
+  channel mentions waited.
+Before that it checks that a replan between wheel ticks keeps a reminder
+whose moment is not on a whole minute. Nothing here talks to Discord.
+"""
+import argparse
+import asyncio
+import contextlib
+import gc
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from updatebot import clock, config, core, reminders, storage  # noqa: E402
+from updatebot.catalog import EVENT_TYPE_ORDER  # noqa: E402
+from benchmark import percentile  # noqa: E402
+from benchmark_season import season_span  # noqa: E402
+from fake_discord import FakeClient, FakeDiscordAPI  # noqa: E402
+
+SEND_ROUTE = "POST /channels/{channel_id}/messages"
+LEAD_MINUTES = (0, 5, 15, 60, 1440)
+
+
+def seed(args: argparse.Namespace, api: FakeDiscordAPI, start: int, rng: random.Random) -> list[tuple]:
+    """Downtime windows and channels per guild; returns (target, minutes, channel, user) per subscription."""
+    storage.clear_state()
+    guild_channels = {}
+    for g in range(args.guilds):
+        guild_id = 600000000000000000 + g
+        guild_channels[guild_id] = [api.create_channel(guild_id).id for _ in range(3)]
+        schedule = storage.get_schedule(guild_id)
+        for _ in range(args.windows):
+            window_start = start + rng.randrange(args.days * 86400) // 60 * 60
+            schedule.add(window_start, window_start + rng.choice((1, 2, 3)) * 3600, "Benchmark maintenance")
+    guild_ids = list(guild_channels)
+    wanted = []
+    for _ in range(args.subscriptions):
+        guild_id = rng.choice(guild_ids)
+        if rng.random() < 0.5:
+            target = f"event:{rng.choice(EVENT_TYPE_ORDER)}"
+        else:
+            target = f"{rng.choice(('start', 'end'))}:{guild_id}"
+        channel_id = reminders.DM if rng.random() < args.dm_share else rng.choice(guild_channels[guild_id])
+        wanted.append((target, rng.choice(LEAD_MINUTES), channel_id, rng.randrange(1, args.users + 1) + 10**17))
+    return wanted
+
+
+def measure(build) -> tuple[int, object]:
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size, result
+
+
+async def per_task_baseline(wanted: list[tuple]) -> int:
+    """One record and one sleeping task per reminder (what the wheel avoids)."""
+    loop = asyncio.get_running_loop()
+
+    def build():
+        return [(entry, loop.create_task(asyncio.sleep(86400))) for entry in wanted]
+
+    size, timers = measure(build)
+    for _, task in timers:
+        task.cancel()
+    await asyncio.gather(*(task for _, task in timers), return_exceptions=True)
+    return size
+
+
+async def fast_forward(args: argparse.Namespace, start: int) -> list[str]:
+    virtual = clock.VirtualClock(start)
+    clock.install(virtual)
+    api = core.client.api
+    sends_before = api.calls[SEND_ROUTE]
+    fire = reminders.fire
+    send_dms = reminders.send_dms
+    send_mentions = reminders.send_mentions
+    sending_dms = sending_mentions = False
+    due_at: dict[int, float] = {}
+    firings = reached = 0
+    fire_lag: list[float] = []
+    dm_spans: list[float] = []
+    mention_waits: list[float] = []
+
+    def timed_fire(target: str, minutes: int, moment: int) -> int:
+        nonlocal firings, reached
+        queues = (reminders.mention_deliveries, reminders.dm_deliveries)
+        queued = [len(queue) for queue in queues]
+        count = fire(target, minutes, moment)
+        if count:
+            firings += 1
+            reached += count
+            due = moment - minutes * 60
+            fire_lag.append(clock.now() - due)
+            for queue, before in zip(queues, queued):
+                for index in range(before, len(queue)):
+                    due_at[id(queue[index])] = clock.now()
+        return count
+
+    async def timed_dms(delivery) -> None:
+        nonlocal sending_dms
+        sending_dms = True
+        await send_dms(delivery)
+        sending_dms = False
+        dm_spans.append(clock.now() - due_at.pop(id(delivery), clock.now()))
+
+    async def timed_mentions(delivery) -> None:
+        nonlocal sending_mentions
+        mention_waits.append(clock.now() - due_at.pop(id(delivery), clock.now()))
+        sending_mentions = True
+        await send_mentions(delivery)
+        sending_mentions = False
+
+    def idle() -> bool:
+        """Nothing left to do before time moves: mentions are drained, and DMs
+        are drained or their workers are waiting for their pace."""
+        if sending_mentions or reminders.mention_deliveries:
+            return False
+        if sending_dms:
+            return any(task not in (reminders.reminder_task, reminders.mention_task) for task in virtual.parked)
+        return not reminders.dm_deliveries
+
+    reminders.fire = timed_fire
+    reminders.send_dms = timed_dms
+    reminders.send_mentions = timed_mentions
+    try:
+        reminders.start_reminders()
+        started = time.perf_counter()
+        # A minute at a time, letting mentions (which never wait on the clock) go out in between
+        for step in range(start + 60, start + args.days * 86400 + 1, 60):
+            await virtual.run_until(step)
+            while not idle():
+                await asyncio.sleep(0)
+        elapsed = time.perf_counter() - started
+    finally:
+        reminders.fire = fire
+        reminders.send_dms = send_dms
+        reminders.send_mentions = send_mentions
+        for task in (reminders.reminder_task, reminders.mention_task, reminders.dm_task, reminders.save_task):
+            task.cancel()
+        clock.install(clock.SystemClock())
+
+    dms = api.calls["POST /users/@me/channels"]
+    messages = api.calls[SEND_ROUTE] - sends_before
+    queued = len(reminders.mention_deliveries) + len(reminders.dm_deliveries)
+    lines = [f"  {args.days}-day run: {firings} firings reached {reached} subscribers with {messages} messages "
+             f"({dms} DM channels opened, {queued} deliveries left queued) "
+             f"in {elapsed:.2f}s wall"]
+    if fire_lag:
+        lines.append(f"  firing lag (virtual): p50={percentile(fire_lag, 50):.0f}s max={max(fire_lag):.0f}s "
+                     f"(wheel resolution {reminders.wheel.resolution}s)")
+    if dm_spans:
+        lines.append(f"  DM fan-out per firing at {config.REMINDER_DM_RATE}/s: p50={percentile(dm_spans, 50):.0f}s "
+                     f"p99={percentile(dm_spans, 99):.0f}s max={max(dm_spans):.0f}s")
+    if mention_waits:
+        lines.append(f"  channel mentions queued behind others: p50={percentile(mention_waits, 50):.0f}s "
+                     f"p99={percentile(mention_waits, 99):.0f}s max={max(mention_waits):.0f}s")
+    return lines
+
+
+def check_replan(start: int) -> None:
+    """A replan between two wheel ticks must keep the timers not fired yet."""
+    guild_id = 690000000000000000
+    base = start // 60 * 60
+    # Ends 30 seconds past a minute, as an extended window can
+    storage.get_schedule(guild_id).add(base + 3600, base + 7290, "Replan check")
+    reminders.subscribe(f"end:{guild_id}", 0, reminders.DM, 1)
+    reminders.fired_through = base
+    for now in (base + 7260, base + 7289, base + 7319):
+        reminders.fire_due(now)
+        assert not reminders.dm_deliveries, "fired early"
+        # As a /remindme from anyone would
+        reminders.invalidate()
+    reminders.fire_due(base + 7320)
+    assert len(reminders.dm_deliveries) == 1, "reminder lost by a replan"
+    reminders.dm_deliveries.clear()
+    reminders.subscriptions.clear()
+    reminders.fired_through = 0.0
+    storage.clear_state()
+
+
+async def run(args: argparse.Namespace) -> None:
+    start = season_span()[0]
+    check_replan(start)
+    rng = random.Random(args.seed)
+    api = FakeDiscordAPI(latency=0.0)
+    core.client = FakeClient(api, cache_channels=True)
+    wanted = seed(args, api, start, rng)
+    # Users who turned DMs off; their DM reminders are dropped at the first refusal
+    api.closed_dms.update(user_id for *_, user_id in rng.sample(wanted, len(wanted) // 100))
+
+    def build():
+        for target, minutes, channel_id, user_id in wanted:
+            reminders.subscribe(target, minutes, channel_id, user_id)
+
+    size, _ = measure(build)
+    count = reminders.subscription_count()
+    baseline = await per_task_baseline(wanted)
+    started = time.perf_counter()
+    reminders.plan(start)
+    planned = time.perf_counter() - started
+    out = sys.__stdout__
+    print(f"{count} subscriptions ({args.subscriptions - count} duplicates dropped) from {args.users} users, "
+          f"{len(reminders.subscriptions)} (target, lead) groups, {args.guilds} guilds", file=out)
+    print(f"  memory: arrays {size / 1024:8.0f} KiB ({size / count:5.1f} B/sub)   "
+          f"task per reminder {baseline / 1024:8.0f} KiB ({baseline / count:5.1f} B/sub)", file=out)
+    print(f"  plan: {len(reminders.wheel)} timers for the next {reminders.PLAN_HORIZON // 86400} days "
+          f"in {planned * 1000:.1f}ms", file=out)
+    for line in await fast_forward(args, start):
+        print(line, file=out)
+    print(f"  {count - reminders.subscription_count()} DM subscriptions dropped for closed DMs", file=out)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--subscriptions", type=int, default=100000)
+    parser.add_argument("--users", type=int, default=50000)
+    parser.add_argument("--guilds", type=int, default=200)
+    parser.add_argument("--windows", type=int, default=3, help="downtime windows per guild")
+    parser.add_argument("--dm-share", type=float, default=0.7, help="share of reminders sent by DM")
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--verbose", action="store_true", help="show the bot's own log output")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config.DATA_FILE = os.path.join(tmp, "bot_data.json")
+        config.REMINDERS_FILE = os.path.join(tmp, "reminders.json")
+        with contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(open(os.devnull, "w")):
+            asyncio.run(run(args))
+        storage.flush_data()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Benchmark embed rendering cost per embed.
+
+Usage:
+    python benchmark_render.py
+    python benchmark_render.py --copies 1,10,50 --iterations 2000
+
+The catalog is shifted so its events are active now, and with --copies each
+non-recurring event is repeated to model a larger catalog. Nothing here
+talks to Discord.
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from updatebot import catalog, rendering  # noqa: E402
+
+ORIGINAL_EVENTS = list(catalog.EVENTS)
+
+
+def build_catalog(copies: int) -> list[dict]:
+    """ORIGINAL_EVENTS moved so fixed-date events started three days ago, repeated copies times."""
+    now_ts = int(datetime.now(timezone.utc).timestamp())
+    dated = [e for e in ORIGINAL_EVENTS if not e.get("recurrence")]
+    shift = now_ts - 3 * 86400 - min(e["start"] for e in dated)
+    events = []
+    for copy in range(copies):
+        suffix = f" #{copy + 1}" if copies > 1 else ""
+        for event in dated:
+            events.append({**event, "name": event["name"] + suffix,
+                           "start": event["start"] + shift, "end": event["end"] + shift})
+    for event in ORIGINAL_EVENTS:
+        if event.get("recurrence"):
+            events.append({**event, "end": now_ts + 365 * 86400})
+    return events
+
+
+def time_per_call(func, iterations: int) -> float:
+    func()  # warm lazy caches
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - started) / iterations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--copies", default="1,10,50", help="comma-separated catalog sizes (copies of each event)")
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    for copies in [int(x) for x in args.copies.split(",") if x.strip()]:
+        catalog.EVENTS[:] = build_catalog(copies)
+        catalog.invalidate_caches()
+        print(f"{len(catalog.EVENTS)} catalog entries")
+        cases = [(f"event panel ({t})", lambda t=t: rendering.get_event_embed(t, 1)) for t in ("resonance", "recurring")]
+        cases += [
+            ("all events", rendering.get_all_events_embed),
+            ("overview", rendering.get_overview_embed),
+        ]
+        for name, func in cases:
+            per_call = time_per_call(func, args.iterations)
+            print(f"  {name:<26} {per_call * 1e6:9.1f} us/embed")
+
+
+if __name__ == "__main__":
+    main()
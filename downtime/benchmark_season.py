@@ -0,0 +1,142 @@
+"""Fast-forward a whole event season on a virtual clock and count the work.
+
+Usage:
+    python benchmark_season.py
+    python benchmark_season.py --panels 1000 --windows 12 --poll-minutes 60
+
+Seeds --panels status panels and as many event panels, gives every guild
+--windows random downtime windows across the season (the span of the
+catalog's dated events), installs a clock.VirtualClock at the season start
+and runs scheduling.refresh_loop until the season ends. Compared with a
+poller that refreshes every panel each --poll-minutes (and so shows each
+change up to that late). Counted: refresh passes, panel renders, and
+edits actually sent (unchanged panels are skipped through warmstart's
+content hashes). Nothing here talks to Discord.
+"""
+import argparse
+import asyncio
+import contextlib
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from updatebot import catalog, clock, config, core, rendering, scheduling, storage, warmstart  # noqa: E402
+from benchmark import seed_panels  # noqa: E402
+from fake_discord import FakeClient, FakeDiscordAPI  # noqa: E402
+
+EDIT_ROUTE = "PATCH /channels/{channel_id}/messages/{message_id}"
+
+
+def season_span() -> tuple[int, int]:
+    dated = [event for event in catalog.EVENTS if not event.get("recurrence")]
+    return min(event["start"] for event in dated), max(event["end"] for event in dated)
+
+
+def seed_windows(guild_ids: list[int], start: int, end: int, windows: int, rng: random.Random) -> None:
+    for guild_id in guild_ids:
+        schedule = storage.get_schedule(guild_id)
+        for _ in range(windows):
+            window_start = rng.randrange(start, end - 4 * 3600) // 60 * 60
+            schedule.add(window_start, window_start + rng.choice((1, 2, 3, 4)) * 3600, "Benchmark")
+
+
+async def poll_loop(interval: float) -> None:
+    """The alternative to transition-driven refreshes: everything, every interval."""
+    while True:
+        await clock.sleep(interval)
+        await scheduling.update_panels()
+        await scheduling.update_event_panels()
+
+
+async def run_case(args: argparse.Namespace, mode: str) -> str:
+    start, end = season_span()
+    virtual = clock.VirtualClock(start - 86400)
+    clock.install(virtual)
+    api = FakeDiscordAPI(latency=0.0)
+    core.client = FakeClient(api, cache_channels=True)
+    warmstart.panel_hashes.clear()
+    # Both caches hold entries valid until a virtual time of the previous case
+    catalog.invalidate_caches()
+    rendering.invalidate_status_cache()
+    channels = seed_panels(api, args.panels, args.guilds, args.channels_per_guild)
+    seed_windows(sorted({channel.guild.id for channel in channels}), start, end, args.windows,
+                 random.Random(args.seed))
+
+    renders = 0
+    passes = 0
+    render_panel = scheduling.render_panel
+    refresh_panels = scheduling.refresh_panels
+
+    def counted_render(item: dict, panel_views: dict) -> dict:
+        nonlocal renders
+        renders += 1
+        return render_panel(item, panel_views)
+
+    async def counted_refresh(*args, **kwargs) -> int:
+        nonlocal passes
+        passes += 1
+        return await refresh_panels(*args, **kwargs)
+
+    scheduling.render_panel = counted_render
+    scheduling.refresh_panels = counted_refresh
+    try:
+        # What the extensions' startup() hooks do
+        await scheduling.update_panels()
+        await scheduling.update_event_panels()
+        renders = passes = 0
+        edits_before = api.calls[EDIT_ROUTE]
+        started = time.perf_counter()
+        if mode == "transitions":
+            scheduling.start_refresh_loop()
+            task = scheduling.refresh_task
+        else:
+            task = asyncio.get_running_loop().create_task(poll_loop(args.poll_minutes * 60))
+        await virtual.run_until(end + 86400)
+        elapsed = time.perf_counter() - started
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+        scheduling.refresh_task = None
+    finally:
+        scheduling.render_panel = render_panel
+        scheduling.refresh_panels = refresh_panels
+        clock.install(clock.SystemClock())
+
+    edits = api.calls[EDIT_ROUTE] - edits_before
+    return (f"  {mode:<12} passes={passes:<6} renders={renders:<9} edits={edits:<7} "
+            f"skipped unchanged={renders - edits:<9} ({elapsed:.2f}s wall)")
+
+
+async def run(args: argparse.Namespace) -> None:
+    start, end = season_span()
+    print(f"{(end - start) / 86400:.0f}-day season, {args.panels * 2} panels in {args.guilds} guilds, "
+          f"{args.windows} downtime windows per guild", file=sys.__stdout__)
+    print(await run_case(args, "transitions"), file=sys.__stdout__)
+    print(await run_case(args, "poll"), file=sys.__stdout__)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--panels", type=int, default=200, help="status panels (and as many event panels)")
+    parser.add_argument("--guilds", type=int, default=50)
+    parser.add_argument("--channels-per-guild", type=int, default=4)
+    parser.add_argument("--windows", type=int, default=8, help="downtime windows per guild")
+    parser.add_argument("--poll-minutes", type=float, default=15.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--verbose", action="store_true", help="show the bot's own log output")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config.DATA_FILE = os.path.join(tmp, "bot_data.json")
+        config.WARM_START_FILE = os.path.join(tmp, "warm_start.json")
+        with contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(open(os.devnull, "w")):
+            asyncio.run(run(args))
+        storage.flush_data()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Benchmark the startup refresh with and without a warm-start snapshot.
+
+Usage:
+    python benchmark_warmstart.py
+    python benchmark_warmstart.py --panels 1000,10000 --changed-guilds 2 --latency-ms 20
+
+Seeds --panels status panels and as many event panels in channels the
+gateway cache does not hold (like threads), runs the startup refresh once
+so every panel is current, then "restarts": the in-memory warm-start state
+is dropped and reloaded from the snapshot, --changed-guilds guilds get a
+new downtime window, and the startup refresh runs again. Compared: no
+snapshot, a snapshot from a crash (periodic, hashes not trusted) and one
+from a clean shutdown. Nothing here talks to Discord.
+"""
+import argparse
+import asyncio
+import contextlib
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from updatebot import config, core, scheduling, storage, warmstart  # noqa: E402
+from benchmark import EVENT_TYPES  # noqa: E402
+from fake_discord import FakeClient, FakeDiscordAPI  # noqa: E402
+
+
+def seed(api: FakeDiscordAPI, count: int, guilds: int, channels_per_guild: int) -> list[int]:
+    storage.clear_state()
+    channels = [
+        api.create_channel(400000000000000000 + g)
+        for g in range(guilds)
+        for _ in range(channels_per_guild)
+    ]
+    for i in range(count):
+        channel = channels[i % len(channels)]
+        storage.add_panel({"channel_id": channel.id, "message_id": channel.seed_message().id,
+                           "guild_id": channel.guild.id})
+        storage.add_event_panel({"channel_id": channel.id, "message_id": channel.seed_message().id,
+                                 "guild_id": channel.guild.id, "event_type": EVENT_TYPES[i % len(EVENT_TYPES)]})
+    return sorted({channel.guild.id for channel in channels})
+
+
+async def startup_refresh() -> None:
+    """What the extensions' startup() hooks refresh."""
+    await scheduling.update_panels()
+    await scheduling.update_event_panels()
+
+
+async def run_case(args: argparse.Namespace, count: int, snapshot: str) -> str:
+    api = FakeDiscordAPI(latency=args.latency_ms / 1000)
+    core.client = FakeClient(api, cache_channels=False)
+    warmstart.panel_hashes.clear()
+    warmstart.channel_types.clear()
+    guild_ids = seed(api, count, args.guilds, args.channels_per_guild)
+    await startup_refresh()
+
+    # Restart
+    if snapshot != "none":
+        warmstart.save_snapshot(clean=snapshot == "clean")
+    warmstart.panel_hashes.clear()
+    warmstart.channel_types.clear()
+    with contextlib.suppress(FileNotFoundError):
+        if snapshot == "none":
+            os.remove(config.WARM_START_FILE)
+    warmstart.load_snapshot()
+
+    now = int(datetime.now(timezone.utc).timestamp())
+    for guild_id in guild_ids[:args.changed_guilds]:
+        storage.get_schedule(guild_id).add(now - 60, now + 3600, "Benchmark")
+        scheduling.notify_schedule_changed(guild_id)
+
+    calls_before = api.total_calls()
+    fetches_before = api.calls["GET /channels/{channel_id}"]
+    started = time.perf_counter()
+    await startup_refresh()
+    elapsed = time.perf_counter() - started
+    calls = api.total_calls() - calls_before
+    fetches = api.calls["GET /channels/{channel_id}"] - fetches_before
+    return (f"  {snapshot:<6} {elapsed * 1000:10.1f}ms  REST calls={calls:<6} "
+            f"(channel fetches={fetches}, edits={calls - fetches})")
+
+
+async def run(args: argparse.Namespace) -> None:
+    for count in args.panels:
+        print(f"\n{count * 2} panels, {args.changed_guilds} of {args.guilds} guilds changed while down",
+              file=sys.__stdout__)
+        for snapshot in ("none", "crash", "clean"):
+            print(await run_case(args, count, snapshot), file=sys.__stdout__)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--panels", default="1000,10000", help="comma-separated status panel counts")
+    parser.add_argument("--guilds", type=int, default=50)
+    parser.add_argument("--channels-per-guild", type=int, default=4)
+    parser.add_argument("--changed-guilds", type=int, default=2)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--verbose", action="store_true", help="show the bot's own log output")
+    args = parser.parse_args()
+    args.panels = [int(x) for x in args.panels.split(",") if x.strip()]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config.DATA_FILE = os.path.join(tmp, "bot_data.json")
+        config.WARM_START_FILE = os.path.join(tmp, "warm_start.json")
+        with contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(open(os.devnull, "w")):
+            asyncio.run(run(args))
+        storage.flush_data()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Benchmark panel refresh throughput for bot-posted vs webhook-posted panels.
+
+Usage:
+    python benchmark_webhooks.py
+    python benchmark_webhooks.py --panels 10,50,200 --channels 1 --latency-ms 20
+
+Every panel sits in --channels channels. The fake API rate limits bot
+message edits per channel and webhook message edits per webhook
+(--channel-limit / --webhook-limit, as requests/seconds), and requests wait
+for their bucket to reset like discord.py does. --time-scale shrinks those
+windows so a run stays short; reported times are scaled back up. The
+limits are assumptions to shape the fake, not published Discord numbers.
+Nothing here talks to Discord.
+"""
+import argparse
+import asyncio
+import contextlib
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from updatebot import config, core, scheduling, storage, warmstart  # noqa: E402
+from fake_discord import FakeClient, FakeDiscordAPI  # noqa: E402
+
+EDIT_ROUTE = "PATCH /channels/{channel_id}/messages/{message_id}"
+WEBHOOK_EDIT_ROUTE = "PATCH /webhooks/{webhook_id}/{token}/messages/{message_id}"
+
+
+def parse_limit(text: str) -> tuple[int, float]:
+    count, _, per = text.partition("/")
+    return int(count), float(per)
+
+
+def seed(api: FakeDiscordAPI, count: int, channels: int, webhooks: bool) -> None:
+    """count status panels spread over channels, posted by the bot or by each channel's webhook."""
+    storage.clear_state()
+    scheduling.webhook_clients.clear()
+    # Each fake API numbers messages from the start, so earlier cases' hashes would skip these edits
+    warmstart.panel_hashes.clear()
+    guild_id = 200000000000000000
+    fake_channels = [api.create_channel(guild_id) for _ in range(channels)]
+    for channel in fake_channels:
+        if webhooks:
+            webhook = api.create_webhook(channel)
+            storage.add_webhook({"webhook_id": webhook.id, "channel_id": channel.id,
+                                 "guild_id": guild_id, "token": webhook.token})
+            scheduling.webhook_clients[webhook.id] = webhook
+    for i in range(count):
+        channel = fake_channels[i % channels]
+        item = {"channel_id": channel.id, "message_id": channel.seed_message().id, "guild_id": guild_id}
+        if webhooks:
+            item["webhook_id"] = storage.webhooks_by_channel[channel.id]
+        storage.add_panel(item)
+
+
+async def run_case(args: argparse.Namespace, count: int, webhooks: bool) -> str:
+    limits = {
+        EDIT_ROUTE: (args.channel_limit[0], args.channel_limit[1] * args.time_scale),
+        WEBHOOK_EDIT_ROUTE: (args.webhook_limit[0], args.webhook_limit[1] * args.time_scale),
+    }
+    api = FakeDiscordAPI(latency=args.latency_ms / 1000 * args.time_scale, bucket_limits=limits)
+    core.client = FakeClient(api, cache_channels=args.cache_channels)
+    seed(api, count, args.channels, webhooks)
+    started = time.perf_counter()
+    await scheduling.update_panels()
+    elapsed = (time.perf_counter() - started) / args.time_scale
+    calls = api.total_calls()
+    name = "webhook" if webhooks else "bot"
+    return (f"  {name:<8} {elapsed * 1000:10.1f}ms  {count / elapsed:8.1f} panels/s  "
+            f"REST calls={calls:<6} bucket waits={api.bucket_waits}")
+
+
+async def run(args: argparse.Namespace) -> None:
+    for count in args.panels:
+        print(f"\n{count} panels in {args.channels} channel(s)", file=sys.__stdout__)
+        for webhooks in (False, True):
+            print(await run_case(args, count, webhooks), file=sys.__stdout__)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--panels", default="10,50,200", help="comma-separated panel counts")
+    parser.add_argument("--channels", type=int, default=1)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--channel-limit", type=parse_limit, default="5/5", help="bot edits per channel, N/seconds")
+    parser.add_argument("--webhook-limit", type=parse_limit, default="5/2", help="webhook edits per webhook, N/seconds")
+    parser.add_argument("--time-scale", type=float, default=0.1, help="multiply latency and limit windows by this")
+    parser.add_argument("--cache-channels", action="store_true", help="serve channels from the fake gateway cache")
+    parser.add_argument("--verbose", action="store_true", help="show the bot's own log output")
+    args = parser.parse_args()
+    args.panels = [int(x) for x in args.panels.split(",") if x.strip()]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config.DATA_FILE = os.path.join(tmp, "bot_data.json")
+        with contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(open(os.devnull, "w")):
+            asyncio.run(run(args))
+        storage.flush_data()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+"""In-process fake of the Discord REST/gateway surface used by bot.py.
+
+Only the pieces the bot touches are modelled: channel lookup, sending,
+fetching and editing messages, panel webhooks, DM channels and interaction
+responses.
+Every REST call goes through FakeDiscordAPI.request, which adds the
+configured latency and can inject 429s (paid for as retry_after + a retry,
+like discord.py does). connections models a client connection pool: each
+round trip holds one, and requests queue for them in order. bucket_limits caps routes per bucket (channel or
+webhook); a request that finds its bucket empty waits for the reset, the
+way discord.py does when the rate limit headers say it is exhausted.
+global_limit caps all requests together; one past it is answered with a
+global 429 and retried after its Retry-After. on_response, when set, is
+called with each round trip's latency (pool wait included), status and
+headers, like httpclient's trace hooks are.
+"""
+import asyncio
+import random
+from collections import Counter
+from types import SimpleNamespace
+from typing import Callable, Mapping, Optional
+
+import discord
+
+
+class FakeDiscordAPI:
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        rate_limit_chance: float = 0.0,
+        retry_after: float = 0.05,
+        seed: int = 0,
+        bucket_limits: Optional[dict[str, tuple[int, float]]] = None,
+        connections: int = 0,
+        global_limit: Optional[tuple[int, float]] = None,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit_chance = rate_limit_chance
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.calls: Counter[str] = Counter()
+        self.rate_limited = 0
+        # route -> (requests, per seconds), counted separately per bucket
+        self.bucket_limits = bucket_limits or {}
+        self.bucket_waits = 0
+        self._buckets: dict[tuple[str, Optional[int]], list[float]] = {}
+        self.pool = asyncio.Semaphore(connections) if connections else None
+        # (requests, per seconds) across every route; [remaining, reset at]
+        self.global_limit = global_limit
+        self._global_window: Optional[list[float]] = None
+        self.global_limited = 0
+        self.on_response: Optional[Callable[[float, int, Mapping[str, str]], None]] = None
+        self.channels: dict[int, "FakeChannel"] = {}
+        self.webhooks: dict[int, "FakeWebhook"] = {}
+        # user ID -> DM channel; users in closed_dms refuse DMs with 403
+        self.dm_channels: dict[int, "FakeChannel"] = {}
+        self.closed_dms: set[int] = set()
+        self._next_id = 100000000000000000
+
+    def snowflake(self) -> int:
+        self._next_id += 1
+        return self._next_id
+
+    def _delay(self) -> float:
+        if not self.jitter:
+            return self.latency
+        return max(0.0, self.latency + self.random.uniform(-self.jitter, self.jitter))
+
+    async def _take(self, route: str, bucket: Optional[int]) -> None:
+        limit, per = self.bucket_limits[route]
+        loop = asyncio.get_running_loop()
+        while True:
+            now = loop.time()
+            state = self._buckets.get((route, bucket))
+            if state is None or now >= state[1]:
+                state = self._buckets[(route, bucket)] = [limit, now + per]
+            if state[0] > 0:
+                state[0] -= 1
+                return
+            self.bucket_waits += 1
+            await asyncio.sleep(state[1] - now)
+
+    def _global_retry_after(self, now: float) -> float:
+        """Count a request against global_limit; how long to back off if it is over."""
+        limit, per = self.global_limit
+        window = self._global_window
+        if window is None or now >= window[1]:
+            window = self._global_window = [limit, now + per]
+        if window[0] > 0:
+            window[0] -= 1
+            return 0.0
+        return window[1] - now
+
+    async def request(self, route: str, bucket: Optional[int] = None) -> None:
+        """Simulate one REST round trip for the given route, retrying 429s."""
+        self.calls[route] += 1
+        if route in self.bucket_limits:
+            await self._take(route, bucket)
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            if self.pool is None:
+                status, headers = await self._round_trip()
+            else:
+                async with self.pool:
+                    status, headers = await self._round_trip()
+            if self.on_response is not None:
+                self.on_response(loop.time() - started, status, headers)
+            if status != 429:
+                return
+            self.rate_limited += 1
+            await asyncio.sleep(float(headers["Retry-After"]))
+
+    async def _round_trip(self) -> tuple[int, dict[str, str]]:
+        await asyncio.sleep(self._delay())
+        if self.global_limit is not None:
+            retry_after = self._global_retry_after(asyncio.get_running_loop().time())
+            if retry_after:
+                self.global_limited += 1
+                return 429, {"Retry-After": f"{retry_after:.3f}", "X-RateLimit-Global": "true",
+                             "X-RateLimit-Scope": "global"}
+        if self.rate_limit_chance and self.random.random() < self.rate_limit_chance:
+            return 429, {"Retry-After": f"{self.retry_after:.3f}", "X-RateLimit-Scope": "user"}
+        return 200, {}
+
+    def create_channel(self, guild_id: int) -> "FakeChannel":
+        channel = FakeChannel(self, self.snowflake(), guild_id)
+        self.channels[channel.id] = channel
+        return channel
+
+    def create_webhook(self, channel: "FakeChannel") -> "FakeWebhook":
+        """Create a webhook without paying for a request (pre-existing webhooks)."""
+        webhook = FakeWebhook(self, self.snowflake(), channel)
+        self.webhooks[webhook.id] = webhook
+        return webhook
+
+    def total_calls(self) -> int:
+        return sum(self.calls.values())
+
+
+def not_found(message: str) -> discord.NotFound:
+    response = SimpleNamespace(status=404, reason="Not Found")
+    return discord.NotFound(response, message)
+
+
+def forbidden(message: str) -> discord.Forbidden:
+    response = SimpleNamespace(status=403, reason="Forbidden")
+    return discord.Forbidden(response, message)
+
+
+class FakeMessage:
+    def __init__(self, channel: "FakeChannel", message_id: int, embed: Optional[discord.Embed]):
+        self.channel = channel
+        self.id = message_id
+        self.embed = embed
+        self.edits = 0
+
+    async def edit(self, embed: Optional[discord.Embed] = None, view: Optional[discord.ui.View] = None, **kwargs) -> "FakeMessage":
+        await self.channel.api.request("PATCH /channels/{channel_id}/messages/{message_id}", self.channel.id)
+        if self.id not in self.channel.messages:
+            raise not_found("Unknown Message")
+        self.embed = embed
+        self.edits += 1
+        return self
+
+
+class FakeChannel:
+    def __init__(self, api: FakeDiscordAPI, channel_id: int, guild_id: int):
+        self.api = api
+        self.id = channel_id
+        self.type = discord.ChannelType.text
+        self.guild = SimpleNamespace(id=guild_id)
+        self.recipient_id: Optional[int] = None
+        self.messages: dict[int, FakeMessage] = {}
+
+    def seed_message(self, embed: Optional[discord.Embed] = None) -> FakeMessage:
+        """Create a message without paying for a request (pre-existing panels)."""
+        message = FakeMessage(self, self.api.snowflake(), embed)
+        self.messages[message.id] = message
+        return message
+
+    async def send(self, content: Optional[str] = None, embed: Optional[discord.Embed] = None, **kwargs) -> FakeMessage:
+        await self.api.request("POST /channels/{channel_id}/messages", self.id)
+        if self.guild is None and self.recipient_id in self.api.closed_dms:
+            raise forbidden("Cannot send messages to this user")
+        return self.seed_message(embed)
+
+    def get_partial_message(self, message_id: int) -> FakeMessage:
+        """No request; editing a message that does not exist raises NotFound."""
+        return self.messages.get(message_id) or FakeMessage(self, message_id, None)
+
+    async def fetch_message(self, message_id: int) -> FakeMessage:
+        await self.api.request("GET /channels/{channel_id}/messages/{message_id}", self.id)
+        message = self.messages.get(message_id)
+        if message is None:
+            raise not_found("Unknown Message")
+        return message
+
+
+    async def create_webhook(self, name: str, **kwargs) -> "FakeWebhook":
+        await self.api.request("POST /channels/{channel_id}/webhooks", self.id)
+        return self.api.create_webhook(self)
+
+
+class FakeWebhook:
+    def __init__(self, api: FakeDiscordAPI, webhook_id: int, channel: FakeChannel):
+        self.api = api
+        self.id = webhook_id
+        self.token = f"fake-token-{webhook_id}"
+        self.channel = channel
+
+    async def send(self, content: Optional[str] = None, embed: Optional[discord.Embed] = None, **kwargs) -> FakeMessage:
+        await self.api.request("POST /webhooks/{webhook_id}/{token}", self.id)
+        return self.channel.seed_message(embed)
+
+    async def edit_message(self, message_id: int, embed: Optional[discord.Embed] = None, **kwargs) -> FakeMessage:
+        await self.api.request("PATCH /webhooks/{webhook_id}/{token}/messages/{message_id}", self.id)
+        message = self.channel.messages.get(message_id)
+        if message is None:
+            raise not_found("Unknown Message")
+        message.embed = embed
+        message.edits += 1
+        return message
+
+
+class FakeClient:
+    """Stands in for discord.Client; channels are resolved through the fake API."""
+
+    def __init__(self, api: FakeDiscordAPI, cache_channels: bool = False):
+        self.api = api
+        self.cache_channels = cache_channels
+        self.user = SimpleNamespace(
+            id=api.snowflake(), name="FakeBot", display_avatar=SimpleNamespace(url="https://cdn.invalid/avatar.png")
+        )
+
+    def get_channel(self, channel_id: int) -> Optional[FakeChannel]:
+        if not self.cache_channels:
+            return None
+        return self.api.channels.get(channel_id)
+
+    def get_partial_messageable(self, channel_id: int, guild_id: Optional[int] = None, **kwargs) -> FakeChannel:
+        """No request; a channel that does not exist fails its message edits instead."""
+        return self.api.channels.get(channel_id) or FakeChannel(self.api, channel_id, guild_id)
+
+    async def fetch_channel(self, channel_id: int) -> FakeChannel:
+        await self.api.request("GET /channels/{channel_id}")
+        channel = self.api.channels.get(channel_id)
+        if channel is None:
+            raise not_found("Unknown Channel")
+        return channel
+
+    def get_guild(self, guild_id: int) -> None:
+        return None
+
+    async def create_dm(self, user) -> FakeChannel:
+        """DM channels are cached per user, as discord.py does."""
+        channel = self.api.dm_channels.get(user.id)
+        if channel is None:
+            await self.api.request("POST /users/@me/channels")
+            channel = self.api.dm_channels[user.id] = FakeChannel(self.api, self.api.snowflake(), None)
+            channel.type = discord.ChannelType.private
+            channel.guild = None
+            channel.recipient_id = user.id
+        return channel
+
+
+class FakeInteractionResponse:
+    def __init__(self, interaction: "FakeInteraction"):
+        self.interaction = interaction
+        self._done = False
+
+    def is_done(self) -> bool:
+        return self._done
+
+    async def send_message(self, content: Optional[str] = None, **kwargs) -> None:
+        await self.interaction.api.request("POST /interactions/{interaction_id}/{token}/callback")
+        self._done = True
+        self.interaction.messages.append(content)
+
+    async def defer(self, **kwargs) -> None:
+        await self.interaction.api.request("POST /interactions/{interaction_id}/{token}/callback")
+        self._done = True
+
+
+class FakeFollowup:
+    def __init__(self, interaction: "FakeInteraction"):
+        self.interaction = interaction
+
+    async def send(self, content: Optional[str] = None, **kwargs) -> None:
+        await self.interaction.api.request("POST /webhooks/{application_id}/{token}")
+        self.interaction.messages.append(content)
+
+
+class FakeInteraction:
+    def __init__(self, api: FakeDiscordAPI, channel: FakeChannel, user_id: int = 1):
+        self.api = api
+        self.channel = channel
+        self.guild_id = channel.guild.id
+        self.guild = channel.guild
+        self.user = SimpleNamespace(id=user_id, name="Benchmark User")
+        self.response = FakeInteractionResponse(self)
+        self.followup = FakeFollowup(self)
+        self.messages: list[Optional[str]] = []
+
+    async def edit_original_response(self, content: Optional[str] = None, **kwargs) -> None:
+        await self.api.request("PATCH /webhooks/{application_id}/{token}/messages/@original")
+        self.messages.append(content)
@@ -0,0 +1,6 @@
+"""Infinity Nikki status and event panel bot.
+
+Modules are split so the pure-Python pieces (config, catalog, timeutil,
+storage) can be imported without discord.py or a running client; core.main()
+builds the client and starts the bot.
+"""
@@ -0,0 +1,177 @@
+"""Server admin commands mounted regardless of which extensions are enabled."""
+from typing import Optional
+
+import discord
+from discord import app_commands
+
+from .checks import DOWNTIME_ROLE_NAME, invalidate_role_cache, require_allowed_guild
+from .icsfeed import feed_url
+from .locales import LOCALE_NAMES
+from .outbound import Priority
+from .rendering import HEART_EMOJI, MAINT_COLOR, MAINT_EMOJI, ONLINE_COLOR, ONLINE_EMOJI
+from .scheduling import notify_schedule_changed, update_panels
+from .settings import DEFAULT_SETTINGS, GuildSettings, format_hex_color, parse_hex_color
+from .storage import downtime_roles, get_guild_settings, guild_settings, save_data
+from .timeutil import get_tzinfo, resolve_timezone, search_timezones
+
+
+async def tz_autocomplete(
+    interaction: discord.Interaction, current: str
+) -> list[app_commands.Choice[str]]:
+    return [app_commands.Choice(name=name, value=value) for name, value in search_timezones(current)]
+
+
+@app_commands.command(name="downtimerole", description="[ADMIN] Let a role use mod commands, or list allowed roles")
+@app_commands.describe(role="Role to allow (leave empty to list)", remove="Remove the role instead of adding it")
+@app_commands.default_permissions(manage_guild=True)
+@app_commands.check(require_allowed_guild)
+@app_commands.checks.has_permissions(manage_guild=True)
+async def downtime_role(
+    interaction: discord.Interaction,
+    role: Optional[discord.Role] = None,
+    remove: bool = False
+):
+    """Configure extra roles (by ID) that count as the @downtime role."""
+    if not interaction.guild_id:
+        await interaction.response.send_message("This command can only be used in a server.", ephemeral=True)
+        return
+
+    role_ids = downtime_roles.get(interaction.guild_id, [])
+    if role is None:
+        configured = ", ".join(f"<@&{role_id}>" for role_id in role_ids) or "none"
+        await interaction.response.send_message(
+            f"{HEART_EMOJI} **Mod command access**\n\n"
+            f"Roles named `@{DOWNTIME_ROLE_NAME}`, plus: {configured}",
+            ephemeral=True,
+        )
+        return
+
+    if remove:
+        role_ids = [role_id for role_id in role_ids if role_id != role.id]
+        message = f"{HEART_EMOJI} {role.mention} can no longer use mod commands."
+    else:
+        if role.id not in role_ids:
+            role_ids = role_ids + [role.id]
+        message = f"{HEART_EMOJI} {role.mention} can now use mod commands."
+
+    if role_ids:
+        downtime_roles[interaction.guild_id] = role_ids
+    else:
+        downtime_roles.pop(interaction.guild_id, None)
+    save_data()
+    invalidate_role_cache(interaction.guild_id)
+    await interaction.response.send_message(message, ephemeral=True)
+
+
+def describe_settings(settings: GuildSettings) -> str:
+    online_color = format_hex_color(settings.online_color) if settings.online_color else str(ONLINE_COLOR)
+    maint_color = format_hex_color(settings.maint_color) if settings.maint_color else str(MAINT_COLOR)
+    return (
+        f"Timezone: `{settings.timezone}`\n"
+        f"Language: {LOCALE_NAMES.get(settings.locale, settings.locale)}\n"
+        f"Online: {settings.online_emoji or ONLINE_EMOJI} `{online_color}`\n"
+        f"Maintenance: {settings.maint_emoji or MAINT_EMOJI} `{maint_color}`"
+    )
+
+
+@app_commands.command(name="serversettings", description="[ADMIN] Default timezone, language and status panel theme")
+@app_commands.describe(
+    tz="Default timezone for /downtime and /extenddowntime (autocomplete)",
+    language="Language of the status panel",
+    online_color="Panel color while online, as hex (e.g., #ffadd8)",
+    maintenance_color="Panel color during maintenance, as hex",
+    online_emoji="Emoji shown while online",
+    maintenance_emoji="Emoji shown during maintenance",
+    reset="Restore every setting to its default first",
+)
+@app_commands.choices(language=[app_commands.Choice(name=name, value=code) for code, name in LOCALE_NAMES.items()])
+@app_commands.autocomplete(tz=tz_autocomplete)
+@app_commands.default_permissions(manage_guild=True)
+@app_commands.check(require_allowed_guild)
+@app_commands.checks.has_permissions(manage_guild=True)
+async def server_settings(
+    interaction: discord.Interaction,
+    tz: Optional[str] = None,
+    language: Optional[app_commands.Choice[str]] = None,
+    online_color: Optional[str] = None,
+    maintenance_color: Optional[str] = None,
+    online_emoji: Optional[str] = None,
+    maintenance_emoji: Optional[str] = None,
+    reset: bool = False,
+):
+    """Show or change per-server preferences; run without options to show them."""
+    guild_id = interaction.guild_id
+    if not guild_id:
+        await interaction.response.send_message("This command can only be used in a server.", ephemeral=True)
+        return
+
+    changes = {}
+    if tz:
+        tz = tz.strip()
+        if not get_tzinfo(resolve_timezone(tz), tz_fallback=tz):
+            await interaction.response.send_message(
+                f"{HEART_EMOJI} **Invalid timezone**\n\n**Your input:** `{tz}`", ephemeral=True
+            )
+            return
+        changes["timezone"] = tz
+    if language:
+        changes["locale"] = language.value
+    for field, value in (("online_color", online_color), ("maint_color", maintenance_color)):
+        if value:
+            color = parse_hex_color(value)
+            if not color:
+                await interaction.response.send_message(
+                    f"{HEART_EMOJI} **Invalid color**\n\nUse a hex color like `#ffadd8`.\n\n**Your input:** `{value}`",
+                    ephemeral=True,
+                )
+                return
+            changes[field] = color
+    for field, value in (("online_emoji", online_emoji), ("maint_emoji", maintenance_emoji)):
+        if value and value.strip():
+            changes[field] = value.strip()
+
+    if not changes and not reset:
+        await interaction.response.send_message(
+            f"{HEART_EMOJI} **Server settings**\n\n{describe_settings(get_guild_settings(guild_id))}",
+            ephemeral=True,
+        )
+        return
+
+    settings = (DEFAULT_SETTINGS if reset else get_guild_settings(guild_id))._replace(**changes)
+    if settings == DEFAULT_SETTINGS:
+        guild_settings.pop(guild_id, None)
+    else:
+        guild_settings[guild_id] = settings
+    save_data()
+    notify_schedule_changed(guild_id)
+    await update_panels(guild_id, priority=Priority.USER)
+    await interaction.response.send_message(
+        f"{HEART_EMOJI} **Server settings updated**\n\n{describe_settings(settings)}",
+        ephemeral=True,
+    )
+
+
+@app_commands.command(name="calendar", description="Subscribe to events and this server's downtime in a calendar app")
+@app_commands.check(require_allowed_guild)
+async def calendar_feed(interaction: discord.Interaction):
+    url = feed_url(interaction.guild_id) if interaction.guild_id else None
+    if url is None:
+        await interaction.response.send_message("Calendar feeds are not enabled for this bot.", ephemeral=True)
+        return
+    await interaction.response.send_message(
+        f"{HEART_EMOJI} **Calendar feed**\n\nAdd this URL to your calendar app as a subscription "
+        f"(\"From URL\" / \"Subscribe to calendar\"):\n{url}",
+        ephemeral=True,
+    )
+
+
+COMMANDS = [
+    downtime_role,
+    server_settings,
+    calendar_feed,
+]
+
+
+def setup(tree: app_commands.CommandTree) -> None:
+    for command in COMMANDS:
+        tree.add_command(command)
@@ -0,0 +1,440 @@
+"""Event catalog: the EVENTS list, per-type styling and lookups over them.
+
+EVENTS below is the built-in catalog; when CATALOG_FILE is set, load_catalog
+replaces it with the entries of that JSON file.
+"""
+import json
+import re
+from datetime import datetime, timezone, timedelta
+from operator import attrgetter
+from typing import Iterable, Iterator, NamedTuple, Optional
+
+from . import clock, config, datafile
+
+# Event data - update monthly with current Infinity Nikki events
+EVENTS = [
+    # Version 2.2 Resonance Events
+    {
+        "type": "resonance",
+        "name": "Echoes of Wanxiang",
+        "start": 1769716800,  # Jan 29, 2026 20:00 UTC
+        "end": 1772480940,    # Mar 2, 2026 19:49 UTC
+        "description": "5★ outfit Where Wanxiang Weaves Life, 4★ Song Beyond",
+        "rewards": "5★ Miracle Outfit, 4★ Outfit, Decorations, Heartshine Items",
+        "url": "https://infinity-nikki.fandom.com/wiki/Version/2.2"
+    },
+    {
+        "type": "resonance",
+        "name": "Traces of Chroma",
+        "start": 1769716800,  # Jan 29, 2026 20:00 UTC
+        "end": 1772480940,    # Mar 2, 2026 19:49 UTC
+        "description": "5★ outfit Chroma's Mortal Heart, 4★ Moonlit Immortal",
+        "rewards": "5★ Miracle Outfit, 4★ Outfit, Dance Moves, Items",
+        "url": "https://infinity-nikki.fandom.com/wiki/Version/2.2"
+    },
+    # Version 2.2 Collection & Task Events
+    {
+        "type": "task",
+        "name": "Flavors of Life",
+        "start": 1769716800,  # Jan 29, 2026 20:00 UTC
+        "end": 1772480940,    # Mar 2, 2026 19:49 UTC
+        "description": "Complete tasks to earn 4★ outfit Tasting the World",
+        "rewards": "4★ Outfit, Outfit Sketch, Diamonds",
+        "url": "https://infinity-nikki.fandom.com/wiki/Version/2.2"
+    },
+    {
+        "type": "quest",
+        "name": "Transient Wonders",
+        "start": 1769716800,  # Jan 29, 2026 20:00 UTC
+        "end": 1772480940,    # Mar 2, 2026 19:49 UTC
+        "description": "Collection event with special rewards",
+        "rewards": "Diamonds, Card: Endless Revelry, Materials",
+        "url": "https://infinity-nikki.fandom.com/wiki/Version/2.2"
+    },
+    {
+        "type": "checkin",
+        "name": "Chroma's Blessings",
+        "start": 1769716800,  # Jan 29, 2026 20:00 UTC
+        "end": 1771034340,    # Feb 14, 2026 01:59 UTC
+        "description": "7-day login event for Revelation Crystals",
+        "rewards": "10 Revelation Crystals",
+        "url": "https://infinity-nikki.fandom.com/wiki/Version/2.2"
+    },
+    {
+        "type": "doublerewards",
+        "name": "Deep Breakthrough",
+        "start": 1770004800,  # Feb 2, 2026 04:00 UTC
+        "end": 1771819140,    # Feb 23, 2026 03:59 UTC
+        "description": "Weekly doubled realm challenge rewards",
+        "rewards": "Double Realm Challenge Rewards (once per week per realm)",
+        "url": "https://infinity-nikki.fandom.com/wiki/Version/2.2"
+    },
+    # Battle Pass
+    {
+        "type": "store",
+        "name": "Mira Journey (Battle Pass)",
+        "start": 1769716800,  # Jan 29, 2026 20:00 UTC
+        "end": 1772480940,    # Mar 2, 2026 19:49 UTC
+        "description": "Complete Journey Tasks for rewards, max level 90",
+        "rewards": "Resonite Crystals, Energy Crystals, Premium Items",
+        "url": "https://infinity-nikki.fandom.com/wiki/Mira_Journey"
+    },
+    # Daily & Weekly Resets - start/end bound the rule; occurrences are expanded on demand
+    {
+        "type": "recurring",
+        "name": "Daily Reset",
+        "start": 1769644800,  # Jan 29, 2026 00:00 UTC (start of v2.2)
+        "end": 1798761600,    # Dec 31, 2026 00:00 UTC (far future)
+        "description": "Daily reset at 04:00 server time (11:00 UTC for America)",
+        "rewards": "Daily Quests, Shop Refresh, Energy Refresh",
+        "url": "https://infinity-nikki.fandom.com/wiki/Reset",
+        "recurrence": {"freq": "daily", "time": "04:00"}
+    },
+    {
+        "type": "recurring",
+        "name": "Weekly Reset",
+        "start": 1769644800,  # Jan 29, 2026 00:00 UTC
+        "end": 1798761600,    # Dec 31, 2026 00:00 UTC
+        "description": "Weekly reset every Monday at 04:00 server time",
+        "rewards": "Weekly Quests, Weekly Shop Refresh, Realm Challenges",
+        "url": "https://infinity-nikki.fandom.com/wiki/Reset",
+        "recurrence": {"freq": "weekly", "weekday": 0, "time": "04:00"}  # 0 = Monday
+    }
+]
+
+# Event type configuration - styling for each event category (colors are RGB)
+EVENT_TYPE_CONFIG = {
+    "resonance": {
+        "emoji": "✨",
+        "color": (255, 200, 220),
+        "display_name": "Resonance Event"
+    },
+    "quest": {
+        "emoji": "📜",
+        "color": (200, 220, 255),
+        "display_name": "Quest Event"
+    },
+    "task": {
+        "emoji": "✅",
+        "color": (220, 255, 200),
+        "display_name": "Task Event"
+    },
+    "checkin": {
+        "emoji": "📅",
+        "color": (255, 220, 200),
+        "display_name": "Check-in Event"
+    },
+    "doublerewards": {
+        "emoji": "⭐",
+        "color": (255, 255, 150),
+        "display_name": "Double Rewards"
+    },
+    "web": {
+        "emoji": "🌐",
+        "color": (200, 255, 255),
+        "display_name": "Web Event"
+    },
+    "store": {
+        "emoji": "🛍️",
+        "color": (255, 200, 255),
+        "display_name": "Store Event"
+    },
+    "recurring": {
+        "emoji": "🔄",
+        "color": (220, 220, 220),
+        "display_name": "Recurring Event"
+    }
+}
+
+# Order panels are posted in by /postallevents
+EVENT_TYPE_ORDER = ["resonance", "quest", "task", "checkin", "doublerewards", "web", "store", "recurring"]
+
+# Server time is a fixed UTC offset per region (hours)
+SERVER_UTC_OFFSETS = {"america": -7, "europe": 1, "asia": 8}
+
+RECURRENCE_PERIODS = {"daily": 86400, "weekly": 7 * 86400}
+
+# Occurrences of each recurring entry to show at once
+RECURRING_PREVIEW = 1
+
+# How long before its start an event shows as starting soon, and before its end as ending soon (seconds)
+STARTING_SOON = 86400
+ENDING_SOON = 172800
+
+# Overview embed sections: (heading, event types shown under it)
+OVERVIEW_GROUPS = [
+    ("Resonance Events", ("resonance",)),
+    ("Limited Events", ("task", "quest", "checkin", "doublerewards")),
+    ("Store/Recurring", ("store", "recurring")),
+]
+
+
+class EventRecord(NamedTuple):
+    """A catalog entry compiled once, with the text that never changes prebuilt.
+
+    Renders only fill in status and timestamps. Recurring entries turn into
+    one record per occurrence via _replace(start=..., end=...).
+    """
+    type: str
+    name: str
+    start: int
+    end: int
+    description: str
+    rewards: str
+    url: str
+    recurrence: Optional[dict]
+    emoji: str
+    # Line shown for this event in the overview embed
+    compact_line: str
+    # Index into OVERVIEW_GROUPS, or -1 if the overview leaves it out
+    overview_group: int
+    # Rewards and wiki link lines that close a detailed entry
+    details: str
+
+
+# Built on first use: EVENTS compiled to EventRecords, in catalog order
+_compiled_events: Optional[list[EventRecord]] = None
+
+# (name, region, count) -> (valid until, occurrences); valid until the first occurrence passes
+_occurrence_cache: dict[tuple[str, str, int], tuple[int, list[EventRecord]]] = {}
+
+# (computed at, valid until, region, active events by start, same grouped by type)
+_active_cache: Optional[tuple[int, int, str, list[EventRecord], dict[str, list[EventRecord]]]] = None
+
+# file_stat of CATALOG_FILE when load_catalog last read it
+catalog_file_stat: Optional[tuple[int, int]] = None
+
+
+def get_compact_line(event: dict, emoji: str) -> str:
+    """The overview line for an event, pulling the key detail out of its description."""
+    event_type = event["type"]
+    name = event["name"]
+    desc = event.get("description", "")
+
+    if event_type == "resonance":
+        # Extract outfit name from description (e.g., "5★ outfit Where Wanxiang Weaves Life")
+        if "5★ outfit " in desc:
+            outfit = desc.split("5★ outfit ")[1].split(",")[0]
+            return f"{emoji} {name} - 5★ {outfit}"
+    elif event_type == "task":
+        if "4★ outfit " in desc:
+            outfit = desc.split("4★ outfit ")[1].split("\n")[0]
+            return f"{emoji} {name} (Task) - 4★ {outfit}"
+    elif event_type == "quest":
+        return f"{emoji} {name} (Collection) - Diamonds + Card"
+    elif event_type == "checkin":
+        return f"{emoji} {name} (Check-in) - {event.get('rewards', '')}"
+    elif event_type == "doublerewards":
+        return f"{emoji} {name} (Double Rewards) - Weekly double realm rewards"
+    elif event_type == "store":
+        return f"{emoji} {name.replace(' (Battle Pass)', '')} - Battle Pass (Level 90 rewards)"
+    elif event_type == "recurring":
+        if "Daily reset" in desc:
+            return f"{emoji} {name} - 04:00 server time"
+        elif "Weekly reset" in desc:
+            return f"{emoji} {name} - Monday 04:00 server time"
+
+    # Fallback
+    return f"{emoji} {name} - {desc[:50]}"
+
+
+def compile_event(event: dict) -> EventRecord:
+    emoji = EVENT_TYPE_CONFIG.get(event["type"], {"emoji": "📌"})["emoji"]
+    rewards = event.get("rewards", "N/A")
+    url = event.get("url", "")
+    details = f"**Rewards:** {rewards}"
+    if url:
+        details += f"\n🔗 [Wiki Guide]({url})"
+    overview_group = next(
+        (i for i, (_, types) in enumerate(OVERVIEW_GROUPS) if event["type"] in types), -1
+    )
+    return EventRecord(
+        type=event["type"],
+        name=event["name"],
+        start=event["start"],
+        end=event["end"],
+        description=event.get("description", ""),
+        rewards=rewards,
+        url=url,
+        recurrence=event.get("recurrence"),
+        emoji=emoji,
+        compact_line=get_compact_line(event, emoji),
+        overview_group=overview_group,
+        details=details,
+    )
+
+
+def get_compiled_events() -> list[EventRecord]:
+    global _compiled_events
+    if _compiled_events is None:
+        _compiled_events = [compile_event(event) for event in EVENTS]
+    return _compiled_events
+
+
+def invalidate_caches() -> None:
+    """Forget everything derived from EVENTS (call after editing it)."""
+    global _compiled_events, _active_cache
+    _compiled_events = None
+    _active_cache = None
+    _occurrence_cache.clear()
+
+
+def parse_catalog_event(value: object) -> Optional[dict]:
+    """An EVENTS entry read from a file, or None if it is malformed."""
+    if not isinstance(value, dict):
+        return None
+    if not isinstance(value.get("type"), str) or not isinstance(value.get("name"), str):
+        return None
+    start = value.get("start")
+    end = value.get("end")
+    if not isinstance(start, int) or not isinstance(end, int) or end <= start:
+        return None
+    if any(key in value and not isinstance(value[key], str) for key in ("description", "rewards", "url")):
+        return None
+    rule = value.get("recurrence")
+    if rule is not None:
+        if not isinstance(rule, dict) or rule.get("freq") not in RECURRENCE_PERIODS:
+            return None
+        if not isinstance(rule.get("time"), str) or not re.fullmatch(r"\d{1,2}:\d{2}", rule["time"]):
+            return None
+        if rule["freq"] == "weekly" and rule.get("weekday") not in range(7):
+            return None
+    keys = ("type", "name", "start", "end", "description", "rewards", "url", "recurrence")
+    return {key: value[key] for key in keys if value.get(key) is not None}
+
+
+def read_catalog(path: str) -> list[dict]:
+    """Entries of a catalog file. Raises ValueError naming the first bad entry."""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if not isinstance(data, list):
+        raise ValueError("A catalog file holds a JSON list of events")
+    events = []
+    for index, value in enumerate(data):
+        event = parse_catalog_event(value)
+        if event is None:
+            raise ValueError(f"Entry {index} is not a valid event: {value!r:.200}")
+        events.append(event)
+    return events
+
+
+def load_catalog() -> bool:
+    """Replace EVENTS with CATALOG_FILE if it changed since the last call."""
+    global catalog_file_stat
+    if not config.CATALOG_FILE:
+        return False
+    stat = datafile.file_stat(config.CATALOG_FILE)
+    if stat is None or stat == catalog_file_stat:
+        return False
+    catalog_file_stat = stat
+    try:
+        events = read_catalog(config.CATALOG_FILE)
+    except (OSError, ValueError) as exc:
+        print(f"Failed to load catalog {config.CATALOG_FILE}: {exc}")
+        return False
+    EVENTS[:] = events
+    invalidate_caches()
+    return True
+
+
+def get_server_offset() -> timedelta:
+    return timedelta(hours=SERVER_UTC_OFFSETS.get(config.SERVER_REGION, SERVER_UTC_OFFSETS["america"]))
+
+
+def get_recurrence_anchor(event: EventRecord) -> int:
+    """First occurrence of a recurring entry at or after its start."""
+    rule = event.recurrence
+    hour, minute = (int(x) for x in rule["time"].split(":"))
+    start_local = datetime.fromtimestamp(event.start, timezone(get_server_offset()))
+    first = start_local.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if rule["freq"] == "weekly":
+        first += timedelta(days=(rule["weekday"] - first.weekday()) % 7)
+    anchor = int(first.timestamp())
+    if anchor < event.start:
+        anchor += RECURRENCE_PERIODS[rule["freq"]]
+    return anchor
+
+
+def iter_occurrences(event: EventRecord, after_ts: int, until_ts: Optional[int] = None) -> Iterator[int]:
+    """Yield occurrence timestamps after after_ts, up to until_ts and the rule's end.
+
+    Jumps straight to the first occurrence after after_ts, so the cost is
+    proportional to the occurrences consumed, not the length of the rule.
+    """
+    period = RECURRENCE_PERIODS[event.recurrence["freq"]]
+    anchor = get_recurrence_anchor(event)
+    ts = anchor if after_ts < anchor else anchor + ((after_ts - anchor) // period + 1) * period
+    last = event.end if until_ts is None else min(event.end, until_ts)
+    while ts <= last:
+        yield ts
+        ts += period
+
+
+def get_next_occurrences(event: EventRecord, now_ts: int, count: int = RECURRING_PREVIEW) -> list[EventRecord]:
+    """Next occurrences of a recurring entry as concrete events (start == end == reset time)."""
+    key = (event.name, config.SERVER_REGION, count)
+    cached = _occurrence_cache.get(key)
+    if cached and now_ts < cached[0]:
+        return cached[1]
+    occurrences = []
+    for ts in iter_occurrences(event, now_ts):
+        occurrences.append(event._replace(start=ts, end=ts))
+        if len(occurrences) >= count:
+            break
+    valid_until = occurrences[0].start if occurrences else event.end
+    _occurrence_cache[key] = (valid_until, occurrences)
+    return occurrences
+
+
+def expand_events(events: Iterable[EventRecord], now_ts: int) -> list[EventRecord]:
+    """Replace recurring entries with their next occurrences and drop ended events."""
+    expanded = []
+    for event in events:
+        if event.recurrence:
+            expanded.extend(get_next_occurrences(event, now_ts))
+        elif event.end > now_ts:
+            expanded.append(event)
+    return expanded
+
+
+def get_active_events(now_ts: int) -> list[EventRecord]:
+    """All active or upcoming events (recurring ones expanded), sorted by start.
+
+    The set only changes when one of them ends, so the sorted list is
+    reused until then. Callers must not modify it.
+    """
+    return _get_active(now_ts)[3]
+
+
+def get_events_by_type(event_type: str, now_ts: Optional[int] = None) -> list[EventRecord]:
+    """Filter events by type and return only active/upcoming events."""
+    if now_ts is None:
+        now_ts = clock.now_ts()
+    return _get_active(now_ts)[4].get(event_type, [])
+
+
+def next_event_transition(now_ts: int) -> Optional[int]:
+    """When an event panel's text next changes on its own: an event starts or
+    ends, or becomes starting soon or ending soon. None with no events left."""
+    next_ts = None
+    for event in get_active_events(now_ts):
+        for ts in (event.start - STARTING_SOON, event.start, event.end - ENDING_SOON, event.end):
+            if ts > now_ts and (next_ts is None or ts < next_ts):
+                next_ts = ts
+    return next_ts
+
+
+def _get_active(now_ts: int) -> tuple[int, int, str, list[EventRecord], dict[str, list[EventRecord]]]:
+    global _active_cache
+    cached = _active_cache
+    if cached and cached[0] <= now_ts < cached[1] and cached[2] == config.SERVER_REGION:
+        return cached
+    # Stable sort: events starting together stay in catalog order
+    events = sorted(expand_events(get_compiled_events(), now_ts), key=attrgetter("start"))
+    by_type: dict[str, list[EventRecord]] = {}
+    for event in events:
+        by_type.setdefault(event.type, []).append(event)
+    # With nothing active nothing can start later, but recheck daily anyway
+    valid_until = min((event.end for event in events), default=now_ts + RECURRENCE_PERIODS["daily"])
+    _active_cache = (now_ts, valid_until, config.SERVER_REGION, events, by_type)
+    return _active_cache
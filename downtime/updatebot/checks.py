@@ -0,0 +1,80 @@
+"""Permission checks shared by every command extension."""
+from typing import Optional
+
+import discord
+from discord import app_commands
+
+from . import config, core
+from .storage import get_configured_role_ids
+
+
+def require_allowed_guild(interaction: discord.Interaction) -> bool:
+    if config.ALLOWED_GUILD_IDS and interaction.guild_id not in config.ALLOWED_GUILD_IDS:
+        raise app_commands.CheckFailure("This bot is restricted to approved servers.")
+    return True
+
+
+def get_bot_member(guild: discord.Guild) -> Optional[discord.Member]:
+    if not core.client or not core.client.user:
+        return None
+    return guild.get_member(core.client.user.id)
+
+
+def missing_channel_perms(
+    channel: discord.abc.GuildChannel, member: discord.Member
+) -> list[str]:
+    perms = channel.permissions_for(member)
+    missing = []
+    if not perms.view_channel:
+        missing.append("View Channel")
+    if not perms.send_messages:
+        missing.append("Send Messages")
+    if not perms.read_message_history:
+        missing.append("Read Message History")
+    if isinstance(channel, discord.Thread) and not perms.send_messages_in_threads:
+        missing.append("Send Messages in Threads")
+    return missing
+
+
+DOWNTIME_ROLE_NAME = "downtime"
+
+# guild_id -> role IDs that grant mod access (configured IDs + roles named DOWNTIME_ROLE_NAME).
+# Dropped by invalidate_role_cache() on role create/update/delete and config changes.
+_downtime_role_cache: dict[int, frozenset[int]] = {}
+
+
+def get_downtime_role_ids(guild: discord.Guild) -> frozenset[int]:
+    role_ids = _downtime_role_cache.get(guild.id)
+    if role_ids is None:
+        resolved = {role.id for role in guild.roles if role.name.lower() == DOWNTIME_ROLE_NAME}
+        resolved.update(get_configured_role_ids(guild.id))
+        role_ids = frozenset(resolved)
+        _downtime_role_cache[guild.id] = role_ids
+    return role_ids
+
+
+def invalidate_role_cache(guild_id: Optional[int] = None) -> None:
+    if guild_id is None:
+        _downtime_role_cache.clear()
+    else:
+        _downtime_role_cache.pop(guild_id, None)
+
+
+def has_downtime_role(member: discord.Member) -> bool:
+    return any(member.get_role(role_id) for role_id in get_downtime_role_ids(member.guild))
+
+
+def require_downtime_role(interaction: discord.Interaction) -> bool:
+    if not interaction.guild or not interaction.guild_id:
+        raise app_commands.CheckFailure("This command can only be used in a server.")
+    member = interaction.user
+    if isinstance(member, discord.Member):
+        if has_downtime_role(member):
+            return True
+    raise app_commands.CheckFailure("You need the @downtime role to use this command.")
+
+
+def require_operator(interaction: discord.Interaction) -> bool:
+    if interaction.user.id not in config.OPERATOR_USER_IDS:
+        raise app_commands.CheckFailure("Only bot operators (OPERATOR_USER_IDS) can use this command.")
+    return True
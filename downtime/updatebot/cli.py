@@ -0,0 +1,317 @@
+"""Offline admin CLI over the same state file as the bot (downtime/admin.py).
+
+Read-only commands stream DATA_FILE record by record; edits load it through
+storage, change it and write it back atomically with backups. A running
+bot notices the new file within scheduling.WATCH_INTERVAL and refreshes only
+the guilds whose schedule or settings changed. An edit is refused if the
+bot saved the file in the meantime; run the command again.
+"""
+import argparse
+import json
+import os
+import sys
+from collections import Counter
+from typing import Callable, Iterator, Optional
+
+from dotenv import load_dotenv
+
+from . import catalog, config, datafile, storage
+from .settings import parse_settings
+
+
+class EditConflict(Exception):
+    pass
+
+
+def iter_file_records(path: str) -> Iterator[datafile.Record]:
+    with open(path, "r", encoding="utf-8") as f:
+        yield from datafile.iter_records(f)
+
+
+def panel_matches(item: dict, kind: str, args: argparse.Namespace) -> bool:
+    if args.kind != "all" and args.kind != kind:
+        return False
+    if args.guild and item["guild_id"] not in args.guild:
+        return False
+    if args.channel and item["channel_id"] not in args.channel:
+        return False
+    if args.event_type and item.get("event_type") not in args.event_type:
+        return False
+    if getattr(args, "message", None) and item["message_id"] not in args.message:
+        return False
+    return True
+
+
+def edit_data_file(edit: Callable[[], Optional[str]]) -> str:
+    """Load DATA_FILE, run edit on the live state and write the result back.
+
+    edit returns a summary, or None to leave the file untouched.
+    """
+    path = config.DATA_FILE
+    stat = datafile.file_stat(path)
+    if stat is None:
+        storage.clear_state()
+    else:
+        storage.load_file(path)
+    storage.data_file_stat = stat
+    summary = edit()
+    if summary is None:
+        return "Nothing to change."
+    if datafile.file_stat(path) != stat:
+        raise EditConflict(f"{path} was saved by someone else while editing; run the command again.")
+    storage.write_file(path, config.DATA_FORMAT, storage.snapshot())
+    return summary
+
+
+def write_json_output(data: object, output: Optional[str]) -> None:
+    if not output or output == "-":
+        json.dump(data, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+        return
+    tmp_path = f"{output}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, output)
+
+
+# ============ COMMANDS ============
+def cmd_validate(args: argparse.Namespace) -> int:
+    """Check every record the bot would load; exit status 1 if any are dropped or clash."""
+    path = config.DATA_FILE
+    counts: Counter[str] = Counter()
+    problems: list[str] = []
+    message_ids: set[int] = set()
+    windows: dict[int, list[tuple[int, int]]] = {}
+    event_types = set(catalog.EVENT_TYPE_CONFIG)
+
+    def problem(text: str) -> None:
+        problems.append(text)
+        if args.verbose or len(problems) <= args.max_problems:
+            print(f"  {text}")
+
+    print(f"Validating {path}")
+    try:
+        for index, (kind, guild_id, value) in enumerate(iter_file_records(path)):
+            counts[kind] += 1
+            where = f"record {index} ({kind})"
+            if kind == "legacy":
+                problem(f"{where}: unknown top-level key {guild_id!r} is ignored")
+            elif kind == "downtime":
+                window = storage.parse_window(value)
+                if not isinstance(guild_id, int) or not window:
+                    problem(f"{where}: invalid window {value!r:.120}")
+                    continue
+                windows.setdefault(guild_id, []).append((window["start"], window["end"]))
+            elif kind == "guild_settings":
+                if not isinstance(guild_id, int) or parse_settings(value) is None:
+                    problem(f"{where}: invalid settings for guild {guild_id}")
+            elif kind == "downtime_roles":
+                if not isinstance(guild_id, int) or not isinstance(value, list) \
+                        or not all(isinstance(x, int) for x in value):
+                    problem(f"{where}: invalid role IDs for guild {guild_id}")
+            elif kind == "webhook":
+                if storage.parse_webhook(value) is None:
+                    problem(f"{where}: invalid webhook entry")
+            else:
+                item = storage.parse_panel(kind, value)
+                if item is None:
+                    problem(f"{where}: invalid panel {value!r:.120}")
+                    continue
+                if item["message_id"] in message_ids:
+                    problem(f"{where}: duplicate message ID {item['message_id']}")
+                message_ids.add(item["message_id"])
+                if kind == "event_panel" and item["event_type"] not in event_types:
+                    problem(f"{where}: unknown event type {item['event_type']!r}")
+    except FileNotFoundError:
+        print(f"{path} does not exist.")
+        return 1
+    except ValueError as exc:
+        print(f"  unreadable: {exc}")
+        return 1
+
+    for guild_id, spans in windows.items():
+        spans.sort()
+        for (_, prev_end), (start, _) in zip(spans, spans[1:]):
+            if start < prev_end:
+                problem(f"guild {guild_id}: windows overlap at <t:{start}>; loading keeps the later one")
+
+    print("  " + (", ".join(f"{kind}: {count}" for kind, count in sorted(counts.items())) or "empty"))
+    if len(problems) > args.max_problems and not args.verbose:
+        print(f"  ... {len(problems) - args.max_problems} more (--verbose shows all)")
+    print(f"{len(problems)} problem(s)")
+    return 1 if problems else 0
+
+
+def cmd_panels(args: argparse.Namespace) -> int:
+    counts: Counter[str] = Counter()
+    for kind, _, value in iter_file_records(config.DATA_FILE):
+        if kind not in ("panel", "event_panel"):
+            continue
+        item = storage.parse_panel(kind, value)
+        kind = "status" if kind == "panel" else "event"
+        if item is None or not panel_matches(item, kind, args):
+            continue
+        counts[kind] += 1
+        if not args.count:
+            print(f"{kind}\t{item['guild_id']}\t{item['channel_id']}\t{item['message_id']}\t{item.get('event_type', '')}")
+    if args.count:
+        print(f"status: {counts['status']}, event: {counts['event']}")
+    return 0
+
+
+def cmd_prune(args: argparse.Namespace) -> int:
+    if not (args.guild or args.channel or args.event_type or args.message or args.all):
+        print("Refusing to prune every panel; pass a filter or --all.")
+        return 2
+
+    def edit() -> Optional[str]:
+        doomed = [
+            item["message_id"]
+            for item in storage.panels_by_message.values()
+            if panel_matches(item, "event" if "event_type" in item else "status", args)
+        ]
+        if args.dry_run:
+            print(f"Would remove {len(doomed)} panel(s).")
+            return None
+        if not doomed:
+            return None
+        return f"Removed {storage.remove_panels(doomed)} panel(s)."
+
+    print(edit_data_file(edit))
+    return 0
+
+
+def cmd_schedules_export(args: argparse.Namespace) -> int:
+    schedules: dict[str, list[dict]] = {}
+    for kind, guild_id, value in iter_file_records(config.DATA_FILE):
+        if kind != "downtime" or (args.guild and guild_id not in args.guild):
+            continue
+        window = storage.parse_window(value)
+        if isinstance(guild_id, int) and window:
+            schedules.setdefault(str(guild_id), []).append(window)
+    write_json_output(schedules, args.output)
+    return 0
+
+
+def cmd_schedules_import(args: argparse.Namespace) -> int:
+    """Import {guild_id: window or [windows]}, the format schedules export writes."""
+    with open(args.source, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if not isinstance(data, dict):
+        print("Expected a JSON object of guild ID -> windows.")
+        return 1
+    imported: dict[int, list[dict]] = {}
+    for key, value in data.items():
+        guild_id = datafile.parse_guild_key(key)
+        entries = value if isinstance(value, list) else [value]
+        parsed = [storage.parse_window(entry) for entry in entries]
+        if guild_id is None or None in parsed:
+            print(f"Invalid entry for {key!r}; nothing imported.")
+            return 1
+        imported[guild_id] = parsed
+
+    def edit() -> Optional[str]:
+        replaced = 0
+        for guild_id, new_windows in imported.items():
+            schedule = storage.get_schedule(guild_id)
+            if args.replace:
+                schedule.clear()
+            for window in new_windows:
+                replaced += len(schedule.add(window["start"], window["end"], window["title"]))
+        count = sum(len(w) for w in imported.values())
+        note = f", replacing {replaced} overlapping window(s)" if replaced else ""
+        return f"Imported {count} window(s) into {len(imported)} guild(s){note}."
+
+    print(edit_data_file(edit))
+    return 0
+
+
+def cmd_catalog_export(args: argparse.Namespace) -> int:
+    if config.CATALOG_FILE and os.path.exists(config.CATALOG_FILE):
+        events = catalog.read_catalog(config.CATALOG_FILE)
+    else:
+        events = catalog.EVENTS
+    write_json_output(events, args.output)
+    return 0
+
+
+def cmd_catalog_import(args: argparse.Namespace) -> int:
+    if not config.CATALOG_FILE:
+        print("Set CATALOG_FILE (the file the bot reads its catalog from) first.")
+        return 1
+    try:
+        events = catalog.read_catalog(args.source)
+    except ValueError as exc:
+        print(f"Invalid catalog: {exc}")
+        return 1
+    write_json_output(events, config.CATALOG_FILE)
+    print(f"Wrote {len(events)} event(s) to {config.CATALOG_FILE}.")
+    return 0
+
+
+def add_panel_filters(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--guild", type=int, action="append", help="guild ID (repeatable)")
+    parser.add_argument("--channel", type=int, action="append", help="channel ID (repeatable)")
+    parser.add_argument("--event-type", action="append", help="event panel type (repeatable)")
+    parser.add_argument("--kind", choices=("status", "event", "all"), default="all")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="admin.py", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--file", help="state file (default: DATA_FILE)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    validate = commands.add_parser("validate", help="check the state file")
+    validate.add_argument("--max-problems", type=int, default=20)
+    validate.add_argument("--verbose", action="store_true", help="print every problem")
+    validate.set_defaults(func=cmd_validate)
+
+    panels = commands.add_parser("panels", help="list panels")
+    add_panel_filters(panels)
+    panels.add_argument("--count", action="store_true", help="only count matches")
+    panels.set_defaults(func=cmd_panels)
+
+    prune = commands.add_parser("prune", help="remove panels")
+    add_panel_filters(prune)
+    prune.add_argument("--message", type=int, action="append", help="message ID (repeatable)")
+    prune.add_argument("--all", action="store_true", help="allow pruning without filters")
+    prune.add_argument("--dry-run", action="store_true")
+    prune.set_defaults(func=cmd_prune)
+
+    schedules = commands.add_parser("schedules", help="export or import downtime windows")
+    schedule_commands = schedules.add_subparsers(dest="action", required=True)
+    export = schedule_commands.add_parser("export")
+    export.add_argument("--guild", type=int, action="append", help="guild ID (repeatable)")
+    export.add_argument("-o", "--output", help="file to write (default: stdout)")
+    export.set_defaults(func=cmd_schedules_export)
+    schedule_import = schedule_commands.add_parser("import")
+    schedule_import.add_argument("source", help="JSON file of guild ID -> windows")
+    schedule_import.add_argument("--replace", action="store_true", help="drop the guilds' existing windows first")
+    schedule_import.set_defaults(func=cmd_schedules_import)
+
+    catalog_parser = commands.add_parser("catalog", help="export or import the event catalog")
+    catalog_commands = catalog_parser.add_subparsers(dest="action", required=True)
+    export = catalog_commands.add_parser("export")
+    export.add_argument("-o", "--output", help="file to write (default: stdout)")
+    export.set_defaults(func=cmd_catalog_export)
+    catalog_import = catalog_commands.add_parser("import", help="validate a catalog and install it as CATALOG_FILE")
+    catalog_import.add_argument("source", help="JSON list of events")
+    catalog_import.set_defaults(func=cmd_catalog_import)
+    return parser
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    load_dotenv()
+    config.load()
+    args = build_parser().parse_args(argv)
+    if args.file:
+        config.DATA_FILE = args.file
+    try:
+        return args.func(args)
+    except EditConflict as exc:
+        print(exc)
+        return 1
+    except FileNotFoundError as exc:
+        print(f"{exc.filename} does not exist.")
+        return 1
@@ -0,0 +1,171 @@
+"""Where the bot reads the current time, and how its loops wait on it.
+
+Rendering and scheduling ask now() instead of the system clock, which
+gives two things:
+
+- One instant per refresh pass. refresh_panels runs under pinned(), so
+  every panel of the pass gets its status, countdown and event list from
+  the same timestamp, even when the pass straddles a minute or an event
+  boundary.
+- Simulated time. install() swaps in a VirtualClock, and the refresh loop
+  waits through sleep() and wait(), so a harness can fast-forward through
+  weeks of windows and events in seconds.
+
+Lease expiry, file stamps and perf reports measure real elapsed time and
+stay on the system clock.
+"""
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone, tzinfo
+from typing import Iterator, Optional, Union
+
+
+class SystemClock:
+    def time(self) -> float:
+        return time.time()
+
+    async def sleep(self, seconds: float) -> None:
+        await asyncio.sleep(seconds)
+
+    async def wait(self, event: asyncio.Event, timeout: float) -> bool:
+        """Wait for event for at most timeout seconds; whether it was set."""
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+
+class VirtualClock:
+    """Time that only moves through run_until(); sleepers wake in deadline order.
+
+    Each woken task runs until it sleeps again (or finishes) before the
+    clock moves on, so whatever a loop does at a deadline happens "at" that
+    instant, however long its awaits take in real time.
+    """
+
+    def __init__(self, start: float):
+        self.now = start
+        # (deadline, sequence, future); cancelled futures are skipped when popped
+        self.sleepers: list[tuple[float, int, asyncio.Future]] = []
+        self.sequence = itertools.count()
+        # Task -> its sleeper future while it waits on the clock
+        self.parked: dict[asyncio.Task, asyncio.Future] = {}
+        self.parked_changed: Optional[asyncio.Event] = None
+
+    def time(self) -> float:
+        return self.now
+
+    def park(self, seconds: float) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self.sleepers, (self.now + max(0.0, seconds), next(self.sequence), future))
+        self.parked[asyncio.current_task()] = future
+        if self.parked_changed is not None:
+            self.parked_changed.set()
+        return future
+
+    def unpark(self, future: asyncio.Future) -> None:
+        self.parked.pop(asyncio.current_task(), None)
+        future.cancel()
+
+    async def sleep(self, seconds: float) -> None:
+        future = self.park(seconds)
+        try:
+            await future
+        finally:
+            self.unpark(future)
+
+    async def wait(self, event: asyncio.Event, timeout: float) -> bool:
+        if event.is_set():
+            return True
+        future = self.park(timeout)
+        waiter = asyncio.ensure_future(event.wait())
+        try:
+            await asyncio.wait({future, waiter}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            self.unpark(future)
+            waiter.cancel()
+        return event.is_set()
+
+    def next_deadline(self) -> Optional[float]:
+        while self.sleepers and self.sleepers[0][2].done():
+            heapq.heappop(self.sleepers)
+        return self.sleepers[0][0] if self.sleepers else None
+
+    async def settle(self, task: asyncio.Task, woken: asyncio.Future) -> None:
+        """Let a task woken from woken run until it waits on the clock again or ends."""
+        if self.parked_changed is None:
+            self.parked_changed = asyncio.Event()
+        while not task.done() and self.parked.get(task, woken) is woken:
+            self.parked_changed.clear()
+            changed = asyncio.ensure_future(self.parked_changed.wait())
+            try:
+                await asyncio.wait({task, changed}, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                changed.cancel()
+
+    async def run_until(self, ts: float) -> None:
+        """Advance to ts, waking every sleeper due by then at its own deadline."""
+        # Let tasks started just before this call reach their first wait
+        await asyncio.sleep(0)
+        while True:
+            deadline = self.next_deadline()
+            if deadline is None or deadline > ts:
+                break
+            _, _, future = heapq.heappop(self.sleepers)
+            self.now = max(self.now, deadline)
+            task = next((task for task, parked in self.parked.items() if parked is future), None)
+            future.set_result(None)
+            if task is not None:
+                await self.settle(task, future)
+        self.now = max(self.now, ts)
+
+
+Clock = Union[SystemClock, VirtualClock]
+
+current: Clock = SystemClock()
+
+# Set by pinned() for the duration of a refresh pass; inherited by the tasks it starts
+_pinned_now: ContextVar[Optional[float]] = ContextVar("pinned_now", default=None)
+
+
+def install(clock: Clock) -> None:
+    global current
+    current = clock
+
+
+def now() -> float:
+    """Current UTC time in Unix seconds, or the pinned instant inside a pass."""
+    pinned_now = _pinned_now.get()
+    return current.time() if pinned_now is None else pinned_now
+
+
+def now_ts() -> int:
+    return int(now())
+
+
+def now_datetime(tz: tzinfo = timezone.utc) -> datetime:
+    return datetime.fromtimestamp(now(), tz)
+
+
+@contextmanager
+def pinned(ts: Optional[float] = None) -> Iterator[float]:
+    """Freeze now() at ts (default: now) for this block and the tasks it starts."""
+    value = now() if ts is None else ts
+    token = _pinned_now.set(value)
+    try:
+        yield value
+    finally:
+        _pinned_now.reset(token)
+
+
+async def sleep(seconds: float) -> None:
+    await current.sleep(seconds)
+
+
+async def wait(event: asyncio.Event, timeout: float) -> bool:
+    return await current.wait(event, timeout)
@@ -0,0 +1,425 @@
+"""Downtime extension: maintenance window commands and status panels."""
+import asyncio
+import re
+from datetime import datetime, timezone, timedelta
+from typing import Optional
+
+import discord
+from discord import app_commands
+
+from . import clock, config, core
+from .admin_commands import tz_autocomplete
+from .checks import require_allowed_guild, require_downtime_role, require_operator
+from .outbound import Priority
+from .rendering import HEART_EMOJI, get_status_embed
+from .scheduling import (
+    RefreshProgress,
+    notify_schedule_changed,
+    post_panel_message,
+    start_refresh_loop,
+    update_guilds_panels,
+    update_panels,
+)
+from .storage import get_guild_settings, get_schedule, save_data
+from .timeutil import (
+    get_tzinfo,
+    parse_duration_minutes,
+    parse_time_info,
+    resolve_timezone,
+)
+from .views import StatusPanel
+
+# Seconds between progress edits while /broadcastdowntime refreshes panels
+BROADCAST_PROGRESS_INTERVAL = 3.0
+
+
+def parse_window_times(start: str, end: str, tz: str) -> tuple[datetime, datetime, str]:
+    """UTC start and end of a window entered in tz, and the resolved timezone name.
+
+    Raises ValueError with the message to show the user.
+    """
+    tz_resolved = resolve_timezone(tz)
+    tzinfo = get_tzinfo(tz_resolved, tz_fallback=tz)
+    if not tzinfo:
+        raise ValueError(
+            f"{HEART_EMOJI} **Invalid timezone**\n\n"
+            "**Common timezones:**\n"
+            "• `EST`, `CST`, `MST`, `PST` (US)\n"
+            "• `UTC`, `GMT`\n"
+            "• `America/New_York`, `Europe/London`\n"
+            "• `GMT-05:00`, `UTC+05:30` (offset format)\n\n"
+            f"**Your input:** `{tz}`\n\n"
+            "💡 **Windows users:** Install `tzdata` for full timezone support:\n"
+            "`pip install tzdata`"
+        )
+
+    start_local, start_dt, start_time_only = parse_time_info(start, tzinfo)
+    end_local, end_dt, end_time_only = parse_time_info(end, tzinfo)
+
+    if not start_dt or not end_dt:
+        raise ValueError(
+            f"{HEART_EMOJI} **Invalid time format**\n\n"
+            "**Supported formats:**\n"
+            "• `2/1/2026 2:30 PM` (full date with 4-digit year)\n"
+            "• `2/1/26 2:30 PM` (2-digit year)\n"
+            "• `2/1 2:30 PM` (month/day, current year)\n"
+            "• `2:30 PM` (time only, today's date)\n"
+            "• `4pm` (casual time format)\n\n"
+            "**Your input:**\n"
+            f"Start: `{start}`\n"
+            f"End: `{end}`"
+        )
+
+    # If both inputs are time-only and end is earlier, assume it crosses midnight.
+    if start_time_only and end_time_only and start_local and end_local and end_local <= start_local:
+        end_local = end_local + timedelta(days=1)
+        end_dt = end_local.astimezone(timezone.utc)
+
+    if end_dt <= start_dt:
+        raise ValueError(
+            f"{HEART_EMOJI} **End time must be after start time**\n\n"
+            f"Start: <t:{int(start_dt.timestamp())}:f>\n"
+            f"End: <t:{int(end_dt.timestamp())}:f>\n\n"
+            "Please check your times and try again."
+        )
+    return start_dt, end_dt, tz_resolved
+
+
+async def apply_downtime(
+    interaction: discord.Interaction,
+    start: str,
+    end: str,
+    tz: str,
+    title: Optional[str],
+    guild_id: Optional[int],
+) -> None:
+    if not guild_id:
+        await interaction.response.send_message(
+            "This command can only be used in a server.",
+            ephemeral=True,
+        )
+        return
+    try:
+        start_dt, end_dt, tz_resolved = parse_window_times(start, end, tz)
+    except ValueError as exc:
+        await interaction.response.send_message(str(exc), ephemeral=True)
+        return
+
+    final_title = (title or "").strip() or "Scheduled Maintenance"
+
+    schedule = get_schedule(guild_id)
+    schedule.compact(clock.now())
+    replaced = schedule.add(int(start_dt.timestamp()), int(end_dt.timestamp()), final_title)
+    save_data()
+    notify_schedule_changed(guild_id)
+    await update_panels(guild_id, priority=Priority.USER)
+
+    note = f"\nReplaced {len(replaced)} overlapping window(s)." if replaced else ""
+    await interaction.response.send_message(
+        f"{HEART_EMOJI} Downtime set: {final_title}\n"
+        f"Start: <t:{int(start_dt.timestamp())}:f>\n"
+        f"End: <t:{int(end_dt.timestamp())}:f>\n"
+        f"(Entered in {tz_resolved}){note}",
+        ephemeral=True,
+    )
+
+
+# ============ MOD COMMANDS ============
+@app_commands.command(name="downtime", description="[MOD] Set a maintenance window")
+@app_commands.describe(
+    start="Start time (e.g., 2/1/26 2:30 PM or 4pm)",
+    end="End time (same formats)",
+    tz="Timezone (autocomplete; defaults to the /serversettings timezone)",
+    title="Optional custom title"
+)
+@app_commands.autocomplete(tz=tz_autocomplete)
+@app_commands.check(require_allowed_guild)
+@app_commands.check(require_downtime_role)
+async def downtime(
+    interaction: discord.Interaction,
+    start: str,
+    end: str,
+    tz: Optional[str] = None,
+    title: str = "Scheduled Maintenance",
+):
+    """Set downtime with inline parameters."""
+    tz = tz or get_guild_settings(interaction.guild_id).timezone
+    await apply_downtime(interaction, start, end, tz, title, interaction.guild_id)
+
+
+@app_commands.command(name="panel", description="[MOD] Post the status panel in this channel")
+@app_commands.check(require_allowed_guild)
+@app_commands.check(require_downtime_role)
+async def post_panel(interaction: discord.Interaction):
+    if not interaction.guild_id:
+        await interaction.response.send_message("This command can only be used in a server.", ephemeral=True)
+        return
+    await post_panel_message(interaction.channel, interaction.guild_id)
+    await interaction.response.send_message("Panel posted.", ephemeral=True)
+
+
+@app_commands.command(name="cleardowntime", description="[MOD] Clear scheduled downtime")
+@app_commands.describe(only_next="Only clear the current or next window instead of the whole schedule")
+@app_commands.check(require_allowed_guild)
+@app_commands.check(require_downtime_role)
+async def cleardowntime(interaction: discord.Interaction, only_next: bool = False):
+    if not interaction.guild_id:
+        await interaction.response.send_message("This command can only be used in a server.", ephemeral=True)
+        return
+    schedule = get_schedule(interaction.guild_id)
+    if only_next:
+        window = schedule.find(clock.now())
+        if not window:
+            await interaction.response.send_message("No upcoming downtime to clear.", ephemeral=True)
+            return
+        schedule.remove(window)
+        message = f"Downtime cleared: {window['title'] or 'Scheduled Maintenance'}."
+    else:
+        schedule.clear()
+        message = "Downtime cleared."
+    save_data()
+    notify_schedule_changed(interaction.guild_id)
+    await update_panels(interaction.guild_id, priority=Priority.USER)
+    await interaction.response.send_message(message, ephemeral=True)
+
+
+@app_commands.command(name="extenddowntime", description="[MOD] Extend the downtime end time")
+@app_commands.describe(
+    new_end="New end time (e.g., 2/1/26 6pm) OR +duration (e.g., +2h)",
+    tz="Timezone (autocomplete; defaults to the /serversettings timezone)"
+)
+@app_commands.autocomplete(tz=tz_autocomplete)
+@app_commands.check(require_allowed_guild)
+@app_commands.check(require_downtime_role)
+async def extenddowntime(
+    interaction: discord.Interaction,
+    new_end: str,
+    tz: Optional[str] = None
+):
+    """Extend the current downtime by changing the end time."""
+    if not interaction.guild_id:
+        await interaction.response.send_message("This command can only be used in a server.", ephemeral=True)
+        return
+
+    schedule = get_schedule(interaction.guild_id)
+    downtime = schedule.find(clock.now())
+    if not downtime:
+        await interaction.response.send_message(
+            f"{HEART_EMOJI} **No active downtime to extend**\n\n"
+            "Use `/downtime` to set a new downtime window.",
+            ephemeral=True,
+        )
+        return
+
+    tz = tz or get_guild_settings(interaction.guild_id).timezone
+    tz_resolved = resolve_timezone(tz)
+    tzinfo = get_tzinfo(tz_resolved, tz_fallback=tz)
+
+    if not tzinfo:
+        await interaction.response.send_message(
+            f"{HEART_EMOJI} **Invalid timezone**\n\n"
+            "**Common timezones:**\n"
+            "• `EST`, `CST`, `MST`, `PST`\n"
+            "• `UTC`, `America/New_York`\n"
+            "• `GMT-05:00` (offset format)\n\n"
+            f"**Your input:** `{tz}`",
+            ephemeral=True,
+        )
+        return
+
+    new_end_str = new_end.strip()
+
+    # Check if it's a relative duration (starts with +)
+    if new_end_str.startswith('+'):
+        duration_str = new_end_str[1:].strip()
+        duration_minutes = parse_duration_minutes(duration_str)
+
+        if duration_minutes is None:
+            await interaction.response.send_message(
+                f"{HEART_EMOJI} **Invalid duration format**\n\n"
+                "**Examples:** `+2h`, `+1h30m`, `+30m`\n\n"
+                f"**Your input:** `{new_end_str}`",
+                ephemeral=True,
+            )
+            return
+
+        current_end_dt = datetime.fromtimestamp(downtime["end"], tz=timezone.utc)
+        new_end_dt = current_end_dt + timedelta(minutes=duration_minutes)
+    else:
+        # Parse as absolute time
+        _, new_end_dt, _ = parse_time_info(new_end_str, tzinfo)
+
+        if not new_end_dt:
+            await interaction.response.send_message(
+                f"{HEART_EMOJI} **Invalid time format**\n\n"
+                "**Examples:** `2/1/2026 6pm`, `2/1/26 6:00 PM`, `+2h`\n\n"
+                f"**Your input:** `{new_end_str}`",
+                ephemeral=True,
+            )
+            return
+
+    # Validate new end time is after start time
+    start_dt = datetime.fromtimestamp(downtime["start"], tz=timezone.utc)
+    if new_end_dt <= start_dt:
+        await interaction.response.send_message(
+            f"{HEART_EMOJI} **New end time must be after start time**\n\n"
+            f"Start: <t:{downtime['start']}:f>\n"
+            f"New End: <t:{int(new_end_dt.timestamp())}:f>",
+            ephemeral=True
+        )
+        return
+
+    # Don't run into the next queued window
+    following = schedule.following(downtime)
+    if following and new_end_dt.timestamp() > following["start"]:
+        await interaction.response.send_message(
+            f"{HEART_EMOJI} **New end time overlaps the next scheduled window**\n\n"
+            f"Next window starts: <t:{following['start']}:f>\n"
+            f"New End: <t:{int(new_end_dt.timestamp())}:f>",
+            ephemeral=True
+        )
+        return
+
+    # Update downtime
+    old_end = downtime["end"]
+    schedule.set_end(downtime, int(new_end_dt.timestamp()))
+    save_data()
+    notify_schedule_changed(interaction.guild_id)
+    await update_panels(interaction.guild_id, priority=Priority.USER)
+
+    await interaction.response.send_message(
+        f"{HEART_EMOJI} **Downtime extended!**\n\n"
+        f"Previous End: <t:{old_end}:f>\n"
+        f"New End: <t:{downtime['end']}:f>",
+        ephemeral=True,
+    )
+
+    print(f"✓ Downtime extended by {interaction.user} in {interaction.guild}: "
+          f"New end: <t:{downtime['end']}:f> ({tz_resolved})")
+
+
+def resolve_broadcast_guilds(targets: str) -> list[int]:
+    """Guild IDs for a comma-separated mix of `all`, GUILD_GROUPS names and IDs.
+
+    Raises ValueError for an unknown group name.
+    """
+    guild_ids: set[int] = set()
+    for token in re.split(r"[\s,]+", targets.strip().lower()):
+        if not token:
+            continue
+        if token == "all":
+            guild_ids.update(guild.id for guild in core.client.guilds)
+        elif token in config.GUILD_GROUPS:
+            guild_ids.update(config.GUILD_GROUPS[token])
+        elif token.isdigit():
+            guild_ids.add(int(token))
+        else:
+            groups = ", ".join(f"`{name}`" for name in config.GUILD_GROUPS) or "none configured"
+            raise ValueError(f"{HEART_EMOJI} **Unknown server group** `{token}`\n\nGroups: {groups}")
+    if config.ALLOWED_GUILD_IDS:
+        guild_ids &= config.ALLOWED_GUILD_IDS
+    return sorted(guild_ids)
+
+
+@app_commands.command(name="broadcastdowntime", description="[OPERATOR] Set one maintenance window in many servers")
+@app_commands.describe(
+    guilds="all, server group names (GUILD_GROUPS) and/or server IDs, comma-separated",
+    start="Start time (e.g., 2/1/26 2:30 PM or 4pm)",
+    end="End time (same formats)",
+    tz="Timezone (autocomplete; defaults to this server's /serversettings timezone)",
+    title="Optional custom title"
+)
+@app_commands.autocomplete(tz=tz_autocomplete)
+@app_commands.default_permissions(administrator=True)
+@app_commands.check(require_operator)
+async def broadcast_downtime(
+    interaction: discord.Interaction,
+    guilds: str,
+    start: str,
+    end: str,
+    tz: Optional[str] = None,
+    title: str = "Scheduled Maintenance",
+):
+    """Add the window to every target guild, save once, then refresh all their panels together."""
+    try:
+        guild_ids = resolve_broadcast_guilds(guilds)
+        start_dt, end_dt, tz_resolved = parse_window_times(
+            start, end, tz or get_guild_settings(interaction.guild_id).timezone
+        )
+    except ValueError as exc:
+        await interaction.response.send_message(str(exc), ephemeral=True)
+        return
+    if not guild_ids:
+        await interaction.response.send_message(f"{HEART_EMOJI} No servers matched `{guilds}`.", ephemeral=True)
+        return
+    await interaction.response.defer(ephemeral=True, thinking=True)
+
+    final_title = (title or "").strip() or "Scheduled Maintenance"
+    now = clock.now()
+    replaced = 0
+    for guild_id in guild_ids:
+        schedule = get_schedule(guild_id)
+        schedule.compact(now)
+        replaced += len(schedule.add(int(start_dt.timestamp()), int(end_dt.timestamp()), final_title))
+    save_data()
+    for guild_id in guild_ids:
+        notify_schedule_changed(guild_id)
+
+    progress = RefreshProgress()
+    refresh = asyncio.ensure_future(update_guilds_panels(guild_ids, progress, Priority.USER))
+    while True:
+        done, _ = await asyncio.wait({refresh}, timeout=BROADCAST_PROGRESS_INTERVAL)
+        if done:
+            break
+        await interaction.edit_original_response(
+            content=f"{HEART_EMOJI} Downtime set in {len(guild_ids)} server(s). "
+                    f"Refreshing panels: {progress.done}/{progress.total}"
+        )
+    refresh.result()
+
+    note = f"\nReplaced {replaced} overlapping window(s)." if replaced else ""
+    removed = f", {progress.removed} stale panel(s) removed" if progress.removed else ""
+    if progress.failed:
+        removed += f", {progress.failed} failed and will be retried"
+    await interaction.edit_original_response(
+        content=f"{HEART_EMOJI} Downtime set in {len(guild_ids)} server(s): {final_title}\n"
+                f"Start: <t:{int(start_dt.timestamp())}:f>\n"
+                f"End: <t:{int(end_dt.timestamp())}:f>\n"
+                f"(Entered in {tz_resolved})\n"
+                f"Refreshed {progress.total - progress.removed} panel(s){removed}.{note}"
+    )
+    print(f"✓ Downtime broadcast by {interaction.user} to {len(guild_ids)} guild(s): "
+          f"{final_title} <t:{int(start_dt.timestamp())}:f> - <t:{int(end_dt.timestamp())}:f>")
+
+
+@app_commands.command(name="status", description="Check server status")
+@app_commands.check(require_allowed_guild)
+async def status(interaction: discord.Interaction):
+    """Check the current server status."""
+    if not interaction.guild_id:
+        await interaction.response.send_message("This command can only be used in a server.", ephemeral=True)
+        return
+    embed = get_status_embed(interaction.guild_id, full=True)
+    await interaction.response.send_message(embed=embed, ephemeral=True)
+
+
+COMMANDS = [
+    downtime,
+    post_panel,
+    cleardowntime,
+    extenddowntime,
+    broadcast_downtime,
+    status,
+]
+
+
+def setup(tree: app_commands.CommandTree) -> None:
+    for command in COMMANDS:
+        tree.add_command(command)
+
+
+async def startup() -> None:
+    """Re-attach the persistent button and refresh status panels after (re)connect."""
+    core.client.add_view(StatusPanel())
+    await update_panels()
+    start_refresh_loop()
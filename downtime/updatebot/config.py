@@ -0,0 +1,163 @@
+"""Environment configuration.
+
+Values are read from the process environment when this module is imported
+and again by load(), which main() calls after load_dotenv() so that values
+from a .env file win. Other modules read them as config.NAME at call time.
+"""
+import os
+import re
+from typing import Optional
+
+BOT_TOKEN: Optional[str] = None
+GUILD_ID: Optional[str] = None
+CLEAR_GLOBAL_COMMANDS = False
+SYNC_GUILD_IDS: list[int] = []
+ALLOWED_GUILD_IDS: set[int] = set()
+# Users who may run cross-guild commands like /broadcastdowntime
+OPERATOR_USER_IDS: set[int] = set()
+# Named guild sets for /broadcastdowntime: GUILD_GROUPS=live:123,456;test:789
+GUILD_GROUPS: dict[str, list[int]] = {}
+
+# Opt-in performance debugging (event loop lag + slow callback logging)
+DEBUG_PERF = False
+PERF_LAG_THRESHOLD_MS = 250
+PERF_REPORT_DIR = "perf_reports"
+
+# REST connection pool (0 = unlimited, like discord.py), idle keep-alive and
+# DNS cache lifetime in seconds, optional HTTP proxy for REST and the gateway
+HTTP_POOL_SIZE = 0
+HTTP_POOL_PER_HOST = 0
+HTTP_KEEPALIVE = 60
+HTTP_DNS_TTL = 300
+HTTP_PROXY = ""
+# Connections opened on ready, before panels are reconciled
+HTTP_WARMUP = 4
+# Most panel edits a scheduled refresh keeps in flight while it adapts to 429s
+# and latency (0 = a fixed budget, see outbound.BUDGETS)
+REFRESH_MAX_CONCURRENCY = 32
+
+DATA_FILE = "bot_data.json"
+# Panel content hashes and channel types that let a restart skip unchanged panels
+WARM_START_FILE = "warm_start.json"
+# Active/standby: SQLite file both instances share a lease in (empty = single instance)
+# and seconds the lease lasts without renewal
+HA_LEASE_FILE = ""
+HA_LEASE_TTL = 10
+# iCalendar feeds: port to serve them on (0 = off), address to bind and the
+# base URL users reach them at (for /calendar; empty = not shown)
+ICS_PORT = 0
+ICS_HOST = "127.0.0.1"
+ICS_PUBLIC_URL = ""
+# Reminder subscriptions, and DMs per second reminders are sent at
+REMINDERS_FILE = "reminders.json"
+REMINDER_DM_RATE = 10
+# Older copies of DATA_FILE kept as DATA_FILE.1 .. DATA_FILE.N
+DATA_BACKUPS = 3
+# Format save_data writes (see datafile.FORMATS); load_data detects either
+DATA_FORMAT = "json"
+
+# How new panels are posted: "bot" messages, or "webhook" through a bot-owned
+# webhook per channel, whose edits have their own rate limit buckets
+PANEL_DELIVERY = "bot"
+
+# JSON list of events that replaces the built-in catalog.EVENTS when set
+CATALOG_FILE = ""
+
+# Server region whose reset times recurring events follow (america, europe, asia)
+SERVER_REGION = "america"
+
+# Command extensions to mount on the shared client (see core.EXTENSIONS)
+BOT_EXTENSIONS: list[str] = []
+
+
+def parse_id_list(value: str) -> list[int]:
+    # Extract any numeric IDs from the string to tolerate quotes/spaces/newlines.
+    return [int(x) for x in re.findall(r"\d{5,}", value or "")]
+
+
+def parse_guild_groups(value: str) -> dict[str, list[int]]:
+    groups = {}
+    for part in (value or "").split(";"):
+        name, _, ids = part.partition(":")
+        if name.strip() and parse_id_list(ids):
+            groups[name.strip().lower()] = parse_id_list(ids)
+    return groups
+
+
+def parse_int_env(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, "").strip())
+    except ValueError:
+        return default
+
+
+def load() -> None:
+    """(Re)read every setting from the environment."""
+    global BOT_TOKEN, GUILD_ID, CLEAR_GLOBAL_COMMANDS, SYNC_GUILD_IDS, ALLOWED_GUILD_IDS
+    global DEBUG_PERF, PERF_LAG_THRESHOLD_MS, PERF_REPORT_DIR, DATA_FILE, BOT_EXTENSIONS
+    global SERVER_REGION, DATA_FORMAT, DATA_BACKUPS, OPERATOR_USER_IDS, GUILD_GROUPS, CATALOG_FILE
+    global PANEL_DELIVERY, HTTP_POOL_SIZE, HTTP_POOL_PER_HOST, HTTP_KEEPALIVE, HTTP_DNS_TTL, HTTP_PROXY
+    global HTTP_WARMUP, WARM_START_FILE, HA_LEASE_FILE, HA_LEASE_TTL, ICS_PORT, ICS_HOST, ICS_PUBLIC_URL
+    global REMINDERS_FILE, REMINDER_DM_RATE, REFRESH_MAX_CONCURRENCY
+
+    BOT_TOKEN = os.getenv("DISCORD_BOT_TOKEN")
+    GUILD_ID = os.getenv("DISCORD_GUILD_ID")
+    CLEAR_GLOBAL_COMMANDS = os.getenv("DISCORD_CLEAR_GLOBAL_COMMANDS", "").strip() == "1"
+
+    sync_ids = parse_id_list(os.getenv("DISCORD_GUILD_IDS", ""))
+    sync_ids += parse_id_list(os.getenv("DISCORD_GUILD_ID", ""))
+    SYNC_GUILD_IDS = sorted(set(sync_ids))
+
+    ALLOWED_GUILD_IDS = set(parse_id_list(os.getenv("ALLOWED_GUILD_IDS", "")))
+    OPERATOR_USER_IDS = set(parse_id_list(os.getenv("OPERATOR_USER_IDS", "")))
+    GUILD_GROUPS = parse_guild_groups(os.getenv("GUILD_GROUPS", ""))
+
+    DEBUG_PERF = os.getenv("DEBUG_PERF", "").strip() == "1"
+    PERF_LAG_THRESHOLD_MS = parse_int_env("PERF_LAG_THRESHOLD_MS", 250)
+    PERF_REPORT_DIR = os.getenv("PERF_REPORT_DIR", "").strip() or "perf_reports"
+
+    HTTP_POOL_SIZE = max(0, parse_int_env("HTTP_POOL_SIZE", 0))
+    HTTP_POOL_PER_HOST = max(0, parse_int_env("HTTP_POOL_PER_HOST", 0))
+    HTTP_KEEPALIVE = max(0, parse_int_env("HTTP_KEEPALIVE", 60))
+    HTTP_DNS_TTL = max(0, parse_int_env("HTTP_DNS_TTL", 300))
+    HTTP_PROXY = os.getenv("DISCORD_PROXY", "").strip()
+    HTTP_WARMUP = max(0, parse_int_env("HTTP_WARMUP", 4))
+    REFRESH_MAX_CONCURRENCY = max(0, parse_int_env("REFRESH_MAX_CONCURRENCY", 32))
+
+    DATA_FORMAT = os.getenv("DATA_FORMAT", "").strip().lower() or "json"
+    if DATA_FORMAT not in ("json", "jsonl"):
+        print(f"Unknown DATA_FORMAT {DATA_FORMAT!r}; using json.")
+        DATA_FORMAT = "json"
+    DATA_FILE = os.getenv("DATA_FILE", "").strip() or "bot_data.json"
+    DATA_BACKUPS = max(0, parse_int_env("DATA_BACKUPS", 3))
+    WARM_START_FILE = os.getenv("WARM_START_FILE", "").strip() or "warm_start.json"
+    HA_LEASE_FILE = os.getenv("HA_LEASE_FILE", "").strip()
+    HA_LEASE_TTL = max(3, parse_int_env("HA_LEASE_TTL", 10))
+    ICS_PORT = max(0, parse_int_env("ICS_PORT", 0))
+    ICS_HOST = os.getenv("ICS_HOST", "").strip() or "127.0.0.1"
+    ICS_PUBLIC_URL = os.getenv("ICS_PUBLIC_URL", "").strip().rstrip("/")
+    REMINDERS_FILE = os.getenv("REMINDERS_FILE", "").strip() or "reminders.json"
+    REMINDER_DM_RATE = max(1, parse_int_env("REMINDER_DM_RATE", 10))
+
+    CATALOG_FILE = os.getenv("CATALOG_FILE", "").strip()
+    PANEL_DELIVERY = os.getenv("PANEL_DELIVERY", "").strip().lower() or "bot"
+    if PANEL_DELIVERY not in ("bot", "webhook"):
+        print(f"Unknown PANEL_DELIVERY {PANEL_DELIVERY!r}; using bot.")
+        PANEL_DELIVERY = "bot"
+    SERVER_REGION = os.getenv("SERVER_REGION", "").strip().lower() or "america"
+
+    BOT_EXTENSIONS = [x.strip().lower() for x in os.getenv("BOT_EXTENSIONS", "").split(",") if x.strip()]
+
+
+def get_legacy_guild_target() -> Optional[int]:
+    """Guild that legacy (pre multi-guild) data belongs to, if unambiguous."""
+    if len(ALLOWED_GUILD_IDS) == 1:
+        return next(iter(ALLOWED_GUILD_IDS))
+    if len(SYNC_GUILD_IDS) == 1:
+        return SYNC_GUILD_IDS[0]
+    if GUILD_ID and GUILD_ID.isdigit():
+        return int(GUILD_ID)
+    return None
+
+
+load()
@@ -0,0 +1,307 @@
+"""Shared client core that command extensions are mounted on.
+
+One process, one gateway connection and one cache serve every enabled
+extension. BOT_EXTENSIONS picks which ones (default: all of them).
+"""
+import asyncio
+import importlib
+import platform
+import signal
+from types import ModuleType
+from typing import Awaitable, Callable, Optional, Sequence
+
+import discord
+from discord import app_commands
+from dotenv import load_dotenv
+
+from . import checks, config, lease, outbound, storage, warmstart
+
+# Extension name -> module providing setup(tree) and async startup()
+EXTENSIONS = {
+    "downtime": "updatebot.commands",
+    "events": "updatebot.event_commands",
+    "reminders": "updatebot.reminder_commands",
+}
+
+client: Optional[discord.Client] = None
+tree: Optional[app_commands.CommandTree] = None
+loaded_extensions: list[ModuleType] = []
+# Whether on_ready has loaded DATA_FILE; later readies (fresh IDENTIFYs) keep the live state
+state_loaded = False
+
+
+def get_client_options() -> dict:
+    """Minimal gateway footprint: guild events (channels, roles, our own member) and
+    message events, which carry the deletes that evict panels."""
+    intents = discord.Intents.none()
+    intents.guilds = True
+    # Raw message deletes only; message content stays off and nothing is cached
+    intents.guild_messages = True
+    from .httpclient import get_http_options
+
+    return {
+        **get_http_options(),
+        "intents": intents,
+        # Role checks read the member from the interaction payload, so no member cache
+        "member_cache_flags": discord.MemberCacheFlags.none(),
+        # Panels are fetched by ID; nothing reads the message cache
+        "max_messages": None,
+        "chunk_guilds_at_startup": False,
+    }
+
+
+def build_client(extensions: Sequence[str]) -> discord.Client:
+    """Create the client and command tree and mount the given extensions."""
+    global client, tree
+    from . import admin_commands
+    from .perf import debugperf
+
+    client = discord.Client(**get_client_options())
+    tree = app_commands.CommandTree(client)
+    tree.add_command(debugperf)
+    admin_commands.setup(tree)
+    tree.error(on_app_command_error)
+    loaded_extensions.clear()
+    for name in extensions:
+        if name not in EXTENSIONS:
+            raise RuntimeError(f"Unknown extension {name!r} in BOT_EXTENSIONS (choose from {', '.join(EXTENSIONS)}).")
+        module = importlib.import_module(EXTENSIONS[name])
+        module.setup(tree)
+        loaded_extensions.append(module)
+    client.event(on_guild_join)
+    client.event(on_guild_remove)
+    client.event(on_guild_role_create)
+    client.event(on_guild_role_update)
+    client.event(on_guild_role_delete)
+    client.event(on_guild_channel_delete)
+    client.event(on_raw_thread_delete)
+    client.event(on_raw_message_delete)
+    client.event(on_raw_bulk_message_delete)
+    client.event(on_interaction)
+    client.event(on_ready)
+    return client
+
+
+async def on_app_command_error(interaction: discord.Interaction, error: app_commands.AppCommandError):
+    if isinstance(error, app_commands.MissingPermissions):
+        message = "You need the Manage Server permission to use this command."
+    elif isinstance(error, app_commands.CheckFailure):
+        message = str(error) if str(error) else "You don't have permission to use this command."
+    elif isinstance(error, app_commands.CommandInvokeError):
+        # Unwrap the original exception for clearer logging.
+        message = "An internal error occurred while running that command."
+        print(f"Command error: {error.original!r}")
+    else:
+        message = "An unexpected error occurred."
+        print(f"App command error: {error!r}")
+
+    if interaction.response.is_done():
+        await interaction.followup.send(message, ephemeral=True)
+    else:
+        await interaction.response.send_message(message, ephemeral=True)
+
+
+# ============ EVENTS ============
+async def on_interaction(interaction: discord.Interaction):
+    # Background panel edits back off while the interaction is answered
+    outbound.scheduler.interaction_received()
+
+
+async def on_guild_join(guild: discord.Guild):
+    if config.ALLOWED_GUILD_IDS and guild.id not in config.ALLOWED_GUILD_IDS:
+        await guild.leave()
+
+
+def evicted(count: int) -> None:
+    if count:
+        storage.save_data()
+
+
+async def on_guild_remove(guild: discord.Guild):
+    checks.invalidate_role_cache(guild.id)
+    evicted(storage.remove_guild_panels(guild.id) + storage.remove_guild_webhooks(guild.id))
+
+
+async def on_guild_channel_delete(channel: discord.abc.GuildChannel):
+    # Deleting a channel deletes its webhooks too
+    evicted(storage.remove_channel_panels(channel.id) + storage.remove_channel_webhooks(channel.id))
+
+
+async def on_raw_thread_delete(payload: discord.RawThreadDeleteEvent):
+    evicted(storage.remove_channel_panels(payload.thread_id))
+
+
+async def on_raw_message_delete(payload: discord.RawMessageDeleteEvent):
+    evicted(storage.remove_panels([payload.message_id]))
+
+
+async def on_raw_bulk_message_delete(payload: discord.RawBulkMessageDeleteEvent):
+    evicted(storage.remove_panels(payload.message_ids))
+
+
+async def on_guild_role_create(role: discord.Role):
+    checks.invalidate_role_cache(role.guild.id)
+
+
+async def on_guild_role_update(before: discord.Role, after: discord.Role):
+    if before.name != after.name:
+        checks.invalidate_role_cache(after.guild.id)
+
+
+async def on_guild_role_delete(role: discord.Role):
+    checks.invalidate_role_cache(role.guild.id)
+
+
+async def load_state() -> None:
+    """Read the saved state on a worker thread and swap it in on the loop.
+
+    Only the first ready loads it: after that the live state is newer than
+    the file, and the watch loop picks up edits made by other processes.
+    """
+    global state_loaded
+    state_loaded = True
+    storage.install_state(*await asyncio.to_thread(storage.read_saved_state))
+
+
+async def on_ready():
+    from .catalog import load_catalog
+    from .httpclient import warm_up
+    from .icsfeed import start_server as start_ics_server
+    from .perf import start_perf_monitoring
+    from .rendering import invalidate_status_cache
+    from .scheduling import start_sweep_loop, start_watch_loop
+
+    if not state_loaded:
+        await load_state()
+    load_catalog()
+    warmstart.start_snapshot_loop()
+    invalidate_status_cache()
+    checks.invalidate_role_cache()
+    start_perf_monitoring()
+
+    # Check for tzdata on Windows
+    if platform.system() == "Windows":
+        try:
+            import tzdata
+            print("✓ tzdata is installed (full timezone support available)")
+        except ImportError:
+            print("\n" + "="*60)
+            print("⚠️  WARNING: tzdata is not installed!")
+            print("   Windows requires tzdata for full timezone support.")
+            print("   Install it with: pip install tzdata")
+            print("   Without it, only GMT offset timezones (e.g., GMT-05:00) will work.")
+            print("="*60 + "\n")
+
+    if config.SYNC_GUILD_IDS:
+        print(f"Sync guild IDs: {config.SYNC_GUILD_IDS}")
+    if config.ALLOWED_GUILD_IDS:
+        print(f"Allowed guild IDs: {sorted(config.ALLOWED_GUILD_IDS)}")
+    if config.SYNC_GUILD_IDS:
+        if config.CLEAR_GLOBAL_COMMANDS:
+            tree.clear_commands(guild=None)
+            await tree.sync()
+            print("Cleared global commands")
+        for guild_id in config.SYNC_GUILD_IDS:
+            guild_obj = discord.Object(id=guild_id)
+            tree.copy_global_to(guild=guild_obj)
+            synced = await tree.sync(guild=guild_obj)
+            print(f"Synced {len(synced)} commands to guild {guild_id}")
+    else:
+        synced = await tree.sync()
+        print(f"Synced {len(synced)} global commands")
+    await warm_up(client)
+    for module in loaded_extensions:
+        await module.startup()
+    start_sweep_loop()
+    start_watch_loop()
+    await start_ics_server()
+    print(f"Bot is online as {client.user}")
+
+
+def main(default_extensions: Sequence[str] = tuple(EXTENSIONS)) -> None:
+    load_dotenv()
+    config.load()
+    if not config.BOT_TOKEN:
+        raise RuntimeError("DISCORD_BOT_TOKEN environment variable is not set.")
+    extensions = config.BOT_EXTENSIONS or list(default_extensions)
+    print(f"Loading extensions: {', '.join(extensions)}")
+    build_client(extensions)
+    # What client.run() does, plus a tuned connector; it has to be made inside the loop
+    discord.utils.setup_logging(root=False)
+    try:
+        asyncio.run(run_client())
+    except KeyboardInterrupt:
+        return
+    if lease.lost:
+        # The client is closed for good; a supervisor restart brings this instance back as standby
+        raise SystemExit(1)
+
+
+def handle_stop_signals(close: Callable[[], Awaitable[None]]) -> None:
+    """Run close() on SIGTERM (and SIGINT), so a supervisor's stop shuts down cleanly.
+
+    Without this SIGTERM kills the process outright: no clean warm-start
+    snapshot, and the standby waits out the lease instead of taking over.
+    """
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        try:
+            loop.add_signal_handler(sig, lambda: loop.create_task(close()))
+        except NotImplementedError:
+            # Windows event loops have no signal handlers; Ctrl-C still raises KeyboardInterrupt
+            pass
+
+
+async def shutdown() -> None:
+    """Save what the next start relies on, then hand the lease to the standby."""
+    from .icsfeed import stop_server as stop_ics_server
+    from .reminders import save_on_shutdown as save_reminders
+
+    await stop_ics_server()
+    warmstart.save_on_shutdown()
+    save_reminders()
+    # While the lease is still ours: once released, the writer drops queued saves
+    await asyncio.to_thread(storage.flush_data)
+    lease.release()
+
+
+async def run_instance(serve: Callable[[], Awaitable[None]], close: Callable[[], Awaitable[None]]) -> None:
+    """Wait for the HA lease (when configured), run serve() until close() ends
+    it, from a stop signal or a lost lease, then shutdown()."""
+    standby = asyncio.current_task()
+
+    async def stop() -> None:
+        if standby is not None:
+            # Not serving yet: stop waiting for the lease
+            standby.cancel()
+        else:
+            await close()
+
+    handle_stop_signals(stop)
+    ha_lease = lease.build_lease()
+    if ha_lease is not None:
+        # As the standby, stay off the gateway until the active instance is gone
+        try:
+            await lease.wait_for_lease(ha_lease)
+        except asyncio.CancelledError:
+            print("Stopped while on standby")
+            # In case the lease was taken just as the signal came
+            lease.release()
+            return
+        lease.start_renew_loop(ha_lease, close)
+    standby = None
+    try:
+        await serve()
+    finally:
+        await shutdown()
+
+
+async def run_client() -> None:
+    from .httpclient import build_connector
+
+    async def serve() -> None:
+        client.http.connector = build_connector()
+        async with client:
+            await client.start(config.BOT_TOKEN)
+
+    await run_instance(serve, client.close)
@@ -0,0 +1,219 @@
+"""On-disk formats for the state file, read one record at a time.
+
+json   the original single object: {"downtime": {...}, "panels": [...], ...}
+jsonl  one record per line: {"kind": "panel", "channel_id": ..., ...}
+
+Readers yield (kind, guild_id, value) tuples as they parse, so load_data can
+validate and insert each record without the whole document in memory.
+Kinds are "downtime" (one window), "downtime_roles", "guild_settings",
+"panel", "event_panel", "webhook" and "legacy" (any other top-level key of
+a json file; guild_id is the key).
+"""
+import json
+import os
+from typing import IO, Iterator, Optional
+
+FORMATS = ("json", "jsonl")
+
+# Bytes read per refill of the json reader's buffer
+CHUNK_SIZE = 64 * 1024
+# Most characters detect_format reads; a minified json file is one line as long as the file
+SNIFF_LIMIT = 4096
+
+Record = tuple[str, Optional[int], object]
+
+# Top-level json lists and the kind of record each element is
+LIST_SECTIONS = {"panels": "panel", "event_panels": "event_panel", "webhooks": "webhook"}
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+
+
+class JsonStream:
+    """Pull JSON values off a text stream without reading it all at once."""
+
+    def __init__(self, f: IO[str]):
+        self.f = f
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self.f.read(CHUNK_SIZE)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character without consuming it ("" at end of input)."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                return ""
+
+    def expect(self, chars: str) -> str:
+        char = self.peek()
+        if not char or char not in chars:
+            raise ValueError(f"Expected one of {chars!r}, got {char or 'end of file'!r}")
+        self.pos += 1
+        return char
+
+    def value(self) -> object:
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                # The value may just be cut off at the end of the buffer
+                if self.fill():
+                    continue
+                raise
+            if end == len(self.buf) and self.fill():
+                # A number could carry on into the next chunk
+                continue
+            self.pos = end
+            return value
+
+    def keys(self) -> Iterator[str]:
+        """Yield each key of an object; the caller consumes its value before resuming."""
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            if not isinstance(key, str):
+                raise ValueError(f"Expected an object key, got {key!r}")
+            self.expect(":")
+            yield key
+            if self.expect(",}") == "}":
+                return
+
+    def items(self) -> Iterator[object]:
+        """Yield each element of an array."""
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            if self.expect(",]") == "]":
+                return
+
+
+def file_stat(path: str) -> Optional[tuple[int, int]]:
+    """(mtime_ns, size) of path, or None if it does not exist; cheap change detection."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def parse_guild_key(key: str) -> Optional[int]:
+    try:
+        return int(key)
+    except (TypeError, ValueError):
+        return None
+
+
+def iter_json_records(f: IO[str]) -> Iterator[Record]:
+    stream = JsonStream(f)
+    for key in stream.keys():
+        if key in LIST_SECTIONS and stream.peek() == "[":
+            kind = LIST_SECTIONS[key]
+            for item in stream.items():
+                yield kind, None, item
+        elif key in ("downtime", "downtime_roles", "guild_settings") and stream.peek() == "{":
+            for guild_key in stream.keys():
+                guild_id = parse_guild_key(guild_key)
+                value = stream.value()
+                if guild_id is None:
+                    continue
+                if key != "downtime":
+                    yield key, guild_id, value
+                    continue
+                # Older files hold a single {start, end, title} window per guild
+                for window in value if isinstance(value, list) else [value]:
+                    yield key, guild_id, window
+        else:
+            yield "legacy", key, stream.value()
+    if stream.peek():
+        raise ValueError("Unexpected data after the top-level object")
+
+
+def iter_jsonl_records(f: IO[str]) -> Iterator[Record]:
+    for line_no, line in enumerate(f, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as exc:
+            raise ValueError(f"Line {line_no}: {exc}") from None
+        if not isinstance(record, dict):
+            continue
+        kind = record.get("kind")
+        guild_id = record.get("guild_id")
+        if kind == "downtime_roles":
+            yield kind, guild_id, record.get("role_ids")
+        elif kind == "guild_settings":
+            yield kind, guild_id, record.get("settings")
+        elif kind in ("downtime", "panel", "event_panel", "webhook"):
+            yield kind, guild_id, record
+
+
+def detect_format(f: IO[str]) -> str:
+    """jsonl if the first line is a complete record with a kind, else json."""
+    first = f.readline(SNIFF_LIMIT)
+    f.seek(0)
+    if not first:
+        # jsonl writes nothing at all for an empty state
+        return "jsonl"
+    if len(first) == SNIFF_LIMIT and not first.endswith("\n"):
+        # Too long to be sure it is one record; write_jsonl puts kind first
+        return "jsonl" if first.lstrip(_WHITESPACE).startswith('{"kind"') else "json"
+    try:
+        record = json.loads(first)
+    except json.JSONDecodeError:
+        return "json"
+    return "jsonl" if isinstance(record, dict) and "kind" in record else "json"
+
+
+def iter_records(f: IO[str]) -> Iterator[Record]:
+    if detect_format(f) == "jsonl":
+        return iter_jsonl_records(f)
+    return iter_json_records(f)
+
+
+def write_json(f: IO[str], data: dict) -> None:
+    json.dump(data, f, indent=2)
+
+
+def write_jsonl(f: IO[str], data: dict) -> None:
+    """Write the same state save_data builds for json, one record per line."""
+    dumps = json.JSONEncoder(separators=(",", ":")).encode
+    for key, windows in data["downtime"].items():
+        guild_id = int(key)
+        for window in windows:
+            f.write(dumps({"kind": "downtime", "guild_id": guild_id, **window}) + "\n")
+    for panel in data["panels"]:
+        f.write(dumps({"kind": "panel", **panel}) + "\n")
+    for panel in data["event_panels"]:
+        f.write(dumps({"kind": "event_panel", **panel}) + "\n")
+    for webhook in data.get("webhooks", []):
+        f.write(dumps({"kind": "webhook", **webhook}) + "\n")
+    for key, role_ids in data["downtime_roles"].items():
+        f.write(dumps({"kind": "downtime_roles", "guild_id": int(key), "role_ids": role_ids}) + "\n")
+    for key, settings in data.get("guild_settings", {}).items():
+        f.write(dumps({"kind": "guild_settings", "guild_id": int(key), "settings": settings}) + "\n")
+
+
+WRITERS = {"json": write_json, "jsonl": write_jsonl}
@@ -0,0 +1,166 @@
+"""Events extension: event panels and the event calendar commands."""
+from typing import Optional
+
+import discord
+from discord import app_commands
+
+from . import clock, core
+from .catalog import EVENT_TYPE_CONFIG, EVENT_TYPE_ORDER, get_active_events
+from .checks import require_allowed_guild, require_downtime_role
+from .outbound import Priority
+from .rendering import ALL_EVENTS, HEART_EMOJI, get_event_pages, get_overview_embed
+from .scheduling import post_event_panel_message, start_refresh_loop, update_event_panels
+from .views import EventPageButton, get_event_page_view
+
+
+async def event_type_autocomplete(
+    interaction: discord.Interaction, current: str
+) -> list[app_commands.Choice[str]]:
+    """Autocomplete for event types."""
+    current_lower = (current or "").lower()
+    choices: list[app_commands.Choice[str]] = []
+    for event_type, type_config in EVENT_TYPE_CONFIG.items():
+        display = type_config["display_name"]
+        if not current_lower or current_lower in event_type.lower() or current_lower in display.lower():
+            choices.append(app_commands.Choice(name=f"{type_config['emoji']} {display}", value=event_type))
+        if len(choices) >= 25:
+            break
+    return choices
+
+
+@app_commands.command(name="eventpanel", description="[MOD] Post an event panel in this channel")
+@app_commands.describe(event_type="Event type to display (e.g., resonance, quest, task)")
+@app_commands.autocomplete(event_type=event_type_autocomplete)
+@app_commands.check(require_allowed_guild)
+@app_commands.check(require_downtime_role)
+async def post_event_panel_cmd(interaction: discord.Interaction, event_type: str):
+    """Post an event panel for a specific event type."""
+    if not interaction.guild_id:
+        await interaction.response.send_message("This command can only be used in a server.", ephemeral=True)
+        return
+
+    # Validate event type
+    if event_type not in EVENT_TYPE_CONFIG:
+        valid_types = ", ".join(EVENT_TYPE_CONFIG.keys())
+        await interaction.response.send_message(
+            f"{HEART_EMOJI} **Invalid event type**\n\n"
+            f"Valid types: {valid_types}",
+            ephemeral=True
+        )
+        return
+
+    await post_event_panel_message(interaction.channel, interaction.guild_id, event_type)
+    type_config = EVENT_TYPE_CONFIG[event_type]
+    await interaction.response.send_message(
+        f"{type_config['emoji']} Event panel posted for **{type_config['display_name']}s**!",
+        ephemeral=True
+    )
+
+
+@app_commands.command(name="postallevents", description="[MOD] Post all event panels in this channel")
+@app_commands.check(require_allowed_guild)
+@app_commands.check(require_downtime_role)
+async def post_all_events_cmd(interaction: discord.Interaction):
+    """Post panels for all event types that have active/upcoming events."""
+    if not interaction.guild_id:
+        await interaction.response.send_message("This command can only be used in a server.", ephemeral=True)
+        return
+
+    await interaction.response.defer(ephemeral=True)
+
+    # Get all event types that have active events
+    now_ts = clock.now_ts()
+    active_types = {event.type for event in get_active_events(now_ts)}
+
+    # Post panels in a logical order
+    posted_count = 0
+
+    for event_type in EVENT_TYPE_ORDER:
+        if event_type in active_types:
+            await post_event_panel_message(interaction.channel, interaction.guild_id, event_type)
+            posted_count += 1
+
+    await interaction.followup.send(
+        f"{HEART_EMOJI} Posted **{posted_count}** event panels!",
+        ephemeral=True
+    )
+
+
+@app_commands.command(name="updateevents", description="[MOD] Manually update all event panels")
+@app_commands.check(require_allowed_guild)
+@app_commands.check(require_downtime_role)
+async def update_events_cmd(interaction: discord.Interaction):
+    """Manually trigger event panel updates."""
+    if not interaction.guild_id:
+        await interaction.response.send_message("This command can only be used in a server.", ephemeral=True)
+        return
+
+    await interaction.response.defer(ephemeral=True)
+    await update_event_panels(interaction.guild_id, Priority.USER)
+    await interaction.followup.send(
+        f"{HEART_EMOJI} Event panels updated successfully!",
+        ephemeral=True
+    )
+
+
+@app_commands.command(name="overview", description="View compact overview of all active events")
+@app_commands.check(require_allowed_guild)
+async def view_overview(interaction: discord.Interaction):
+    """View compact overview of all events grouped by category."""
+    if not interaction.guild_id:
+        await interaction.response.send_message("This command can only be used in a server.", ephemeral=True)
+        return
+
+    embed = get_overview_embed()
+    await interaction.response.send_message(embed=embed, ephemeral=True)
+
+
+@app_commands.command(name="events", description="View all active and upcoming events")
+@app_commands.describe(event_type="Optional: Filter by event type")
+@app_commands.autocomplete(event_type=event_type_autocomplete)
+@app_commands.check(require_allowed_guild)
+async def view_events(interaction: discord.Interaction, event_type: Optional[str] = None):
+    """View all events or filter by type."""
+    if not interaction.guild_id:
+        await interaction.response.send_message("This command can only be used in a server.", ephemeral=True)
+        return
+
+    # Validate event type if provided
+    if event_type and event_type not in EVENT_TYPE_CONFIG:
+        valid_types = ", ".join(EVENT_TYPE_CONFIG.keys())
+        await interaction.response.send_message(
+            f"{HEART_EMOJI} **Invalid event type**\n\n"
+            f"Valid types: {valid_types}",
+            ephemeral=True
+        )
+        return
+
+    key = event_type or ALL_EVENTS
+    pages = get_event_pages(key)
+    view = get_event_page_view(key, 0, len(pages))
+    if view is None:
+        await interaction.response.send_message(embed=pages[0], ephemeral=True)
+    else:
+        await interaction.response.send_message(embed=pages[0], view=view, ephemeral=True)
+
+
+COMMANDS = [
+    post_event_panel_cmd,
+    post_all_events_cmd,
+    update_events_cmd,
+    view_overview,
+    view_events,
+]
+
+
+def setup(tree: app_commands.CommandTree) -> None:
+    for command in COMMANDS:
+        tree.add_command(command)
+
+
+async def startup() -> None:
+    """Route page buttons of earlier messages and refresh event panels after (re)connect."""
+    core.client.add_dynamic_items(EventPageButton)
+    await update_event_panels()
+    # Also started by the downtime extension; without it, nothing else refreshes event panels at transitions
+    start_refresh_loop()
@@ -0,0 +1,151 @@
+"""REST client connections: a tuned shared connector, connection warm-up and
+request tracing: connection reuse and latency for the perf instrumentation,
+and every response's outcome for outbound's adaptive concurrency."""
+import asyncio
+import time
+from collections import deque
+from contextlib import contextmanager
+from types import SimpleNamespace
+from typing import Iterator
+
+import aiohttp
+import discord
+from discord.http import Route
+
+from . import config, outbound
+
+# Unauthenticated, cheap endpoint the warm-up opens connections with
+WARMUP_URL = f"{Route.BASE}/gateway"
+
+# Latest request durations each RestStats keeps for percentiles
+LATENCY_SAMPLES = 5000
+
+
+class RestStats:
+    """REST requests seen while collecting: latency and how connections were obtained."""
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.opened = 0
+        self.reused = 0
+        self.latencies: deque[float] = deque(maxlen=LATENCY_SAMPLES)
+
+    def percentile(self, pct: float) -> float:
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+    def reuse_ratio(self) -> float:
+        total = self.opened + self.reused
+        return self.reused / total if total else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"REST: {self.requests} requests ({self.errors} failed), "
+            f"p50 {self.percentile(50) * 1000:.0f}ms, p99 {self.percentile(99) * 1000:.0f}ms, "
+            f"connection reuse {self.reuse_ratio():.0%} ({self.reused} reused, {self.opened} opened)"
+        )
+
+
+# Every RestStats collecting right now; the trace hooks update all of them
+active_stats: list[RestStats] = []
+
+
+@contextmanager
+def collect_rest_stats() -> Iterator[RestStats]:
+    stats = RestStats()
+    active_stats.append(stats)
+    try:
+        yield stats
+    finally:
+        active_stats.remove(stats)
+
+
+async def on_request_start(session, ctx: SimpleNamespace, params) -> None:
+    ctx.started = time.perf_counter()
+
+
+async def on_request_end(session, ctx: SimpleNamespace, params) -> None:
+    elapsed = time.perf_counter() - ctx.started
+    for stats in active_stats:
+        stats.requests += 1
+        stats.latencies.append(elapsed)
+    outbound.record_response(elapsed, params.response.status, params.response.headers)
+
+
+async def on_request_exception(session, ctx: SimpleNamespace, params) -> None:
+    for stats in active_stats:
+        stats.requests += 1
+        stats.errors += 1
+    outbound.record_response(time.perf_counter() - ctx.started, 0, {})
+
+
+async def on_connection_create_end(session, ctx: SimpleNamespace, params) -> None:
+    for stats in active_stats:
+        stats.opened += 1
+
+
+async def on_connection_reuseconn(session, ctx: SimpleNamespace, params) -> None:
+    for stats in active_stats:
+        stats.reused += 1
+
+
+def build_trace_config() -> aiohttp.TraceConfig:
+    trace = aiohttp.TraceConfig()
+    trace.on_request_start.append(on_request_start)
+    trace.on_request_end.append(on_request_end)
+    trace.on_request_exception.append(on_request_exception)
+    trace.on_connection_create_end.append(on_connection_create_end)
+    trace.on_connection_reuseconn.append(on_connection_reuseconn)
+    return trace
+
+
+def get_http_options() -> dict:
+    """discord.Client options for the REST client (the connector is attached later)."""
+    options = {}
+    if config.HTTP_PROXY:
+        # discord.py routes both REST requests and the gateway through it
+        options["proxy"] = config.HTTP_PROXY
+    if config.DEBUG_PERF or config.REFRESH_MAX_CONCURRENCY:
+        options["http_trace"] = build_trace_config()
+    return options
+
+
+def build_connector() -> aiohttp.TCPConnector:
+    """The shared connection pool; needs a running event loop."""
+    return aiohttp.TCPConnector(
+        limit=config.HTTP_POOL_SIZE,
+        limit_per_host=config.HTTP_POOL_PER_HOST,
+        keepalive_timeout=config.HTTP_KEEPALIVE,
+        ttl_dns_cache=config.HTTP_DNS_TTL,
+    )
+
+
+async def warm_up(client: discord.Client) -> None:
+    """Open HTTP_WARMUP connections in the client's pool at once so the startup
+    refresh burst reuses them instead of each opening its own.
+
+    Goes around discord.py's rate limiter, which would send concurrent
+    first requests to one route one at a time.
+    """
+    count = config.HTTP_WARMUP
+    connector = client.http.connector
+    if count <= 0 or not isinstance(connector, aiohttp.BaseConnector) or connector.closed:
+        return
+    trace = client.http.http_trace
+
+    async def fetch(session: aiohttp.ClientSession) -> None:
+        async with session.get(WARMUP_URL, proxy=config.HTTP_PROXY or None) as response:
+            await response.read()
+
+    started = time.perf_counter()
+    async with aiohttp.ClientSession(
+        connector=connector,
+        connector_owner=False,
+        trace_configs=[trace] if trace else None,
+    ) as session:
+        results = await asyncio.gather(*(fetch(session) for _ in range(count)), return_exceptions=True)
+    opened = sum(not isinstance(result, Exception) for result in results)
+    print(f"Warmed up {opened}/{count} REST connections in {(time.perf_counter() - started) * 1000:.0f}ms")
@@ -0,0 +1,215 @@
+"""iCalendar feeds of the event catalog and each guild's downtime.
+
+With ICS_PORT set the bot serves, on ICS_HOST:
+
+  /calendar/events.ics       the catalog
+  /calendar/<guild_id>.ics   the catalog plus that guild's downtime windows
+
+Calendar apps poll these every few minutes, so a feed is only rebuilt
+when its inputs change: the compiled catalog (a new list after every
+reload), the server region and the guild's windows. Each window's VEVENT
+is kept and reused while the window is unchanged. Responses carry an ETag
+and a matching If-None-Match gets a bodiless 304.
+
+The server runs on the instance connected to Discord (after the HA lease
+is taken), next to the state it serves.
+"""
+import hashlib
+import re
+from datetime import datetime, timezone
+from typing import Optional
+
+from aiohttp import web
+
+from . import catalog, config, core, storage
+from .catalog import EventRecord
+
+PRODID = "-//Infinity Nikki Update Bot//Calendar//EN"
+# Suffix making UIDs globally unique
+UID_DOMAIN = "updatebot.invalid"
+# Seconds calendar clients may reuse a feed before asking again
+ICS_MAX_AGE = 300
+# Longest content line in octets before folding (RFC 5545 3.1)
+FOLD_OCTETS = 75
+
+RRULE_FREQ = {"daily": "DAILY", "weekly": "WEEKLY"}
+
+# (compiled catalog, region, VEVENT lines) the catalog block was built from
+_events_block: Optional[tuple[list[EventRecord], str, str]] = None
+# Guild ID -> {(start, end, title): VEVENT lines} of its current windows
+_window_blocks: dict[int, dict[tuple[int, int, Optional[str]], str]] = {}
+# Feed (guild ID, None for the catalog) -> (inputs, ETag, body)
+_feeds: dict[Optional[int], tuple[tuple, str, bytes]] = {}
+
+runner: Optional[web.AppRunner] = None
+
+
+def escape_text(value: str) -> str:
+    return value.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+
+
+def fold(line: str) -> str:
+    """Split a content line into FOLD_OCTETS chunks, never inside a UTF-8 sequence."""
+    encoded = line.encode()
+    if len(encoded) <= FOLD_OCTETS:
+        return line
+    parts = []
+    start = 0
+    limit = FOLD_OCTETS
+    while start < len(encoded):
+        end = min(start + limit, len(encoded))
+        while end < len(encoded) and encoded[end] & 0xC0 == 0x80:
+            end -= 1
+        parts.append(encoded[start:end].decode())
+        start = end
+        # Continuation lines start with a space, which counts towards the limit
+        limit = FOLD_OCTETS - 1
+    return "\r\n ".join(parts)
+
+
+def format_utc(ts: int) -> str:
+    return datetime.fromtimestamp(ts, timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def format_vevent(properties: list[tuple[str, str]]) -> str:
+    lines = ["BEGIN:VEVENT"] + [fold(f"{name}:{value}") for name, value in properties] + ["END:VEVENT"]
+    return "\r\n".join(lines) + "\r\n"
+
+
+def slug(value: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", value.lower()).strip("-")
+
+
+def event_vevent(event: EventRecord) -> str:
+    description = "\n".join(part for part in (event.description, f"Rewards: {event.rewards}") if part)
+    # Stamped with the event's own start so an unchanged catalog gives an identical feed
+    properties = [("UID", f"event-{slug(event.name)}-{event.start}@{UID_DOMAIN}"), ("DTSTAMP", format_utc(event.start))]
+    if event.recurrence:
+        # A reset at a fixed time: one instant, repeating until the entry ends
+        anchor = catalog.get_recurrence_anchor(event)
+        properties += [
+            ("DTSTART", format_utc(anchor)),
+            ("RRULE", f"FREQ={RRULE_FREQ[event.recurrence['freq']]};UNTIL={format_utc(event.end)}"),
+        ]
+    else:
+        properties += [("DTSTART", format_utc(event.start)), ("DTEND", format_utc(event.end))]
+    properties += [
+        ("SUMMARY", escape_text(f"{event.emoji} {event.name}")),
+        ("DESCRIPTION", escape_text(description)),
+        ("CATEGORIES", escape_text(event.type)),
+    ]
+    if event.url:
+        properties.append(("URL", event.url))
+    return format_vevent(properties)
+
+
+def window_vevent(guild_id: int, start: int, end: int, title: Optional[str]) -> str:
+    return format_vevent([
+        ("UID", f"downtime-{guild_id}-{start}@{UID_DOMAIN}"),
+        ("DTSTAMP", format_utc(start)),
+        ("DTSTART", format_utc(start)),
+        ("DTEND", format_utc(end)),
+        ("SUMMARY", escape_text(title or "Scheduled Maintenance")),
+        ("CATEGORIES", "downtime"),
+    ])
+
+
+def get_events_block(events: list[EventRecord]) -> str:
+    global _events_block
+    cached = _events_block
+    if cached and cached[0] is events and cached[1] == config.SERVER_REGION:
+        return cached[2]
+    block = "".join(event_vevent(event) for event in events)
+    _events_block = (events, config.SERVER_REGION, block)
+    return block
+
+
+def get_windows_block(guild_id: int, windows: tuple[tuple[int, int, Optional[str]], ...]) -> str:
+    """VEVENTs of a guild's windows, building only those not seen on the last call."""
+    previous = _window_blocks.get(guild_id, {})
+    blocks = {key: previous.get(key) or window_vevent(guild_id, *key) for key in windows}
+    _window_blocks[guild_id] = blocks
+    return "".join(blocks.values())
+
+
+def get_feed(guild_id: Optional[int]) -> tuple[str, bytes]:
+    """(ETag, body) of a feed, rebuilt only if the catalog or the guild's windows changed."""
+    events = catalog.get_compiled_events()
+    schedule = storage.downtime_schedules.get(guild_id) if guild_id else None
+    windows = tuple((w["start"], w["end"], w["title"]) for w in schedule.windows) if schedule else ()
+    inputs = (events, config.SERVER_REGION, windows)
+    cached = _feeds.get(guild_id)
+    if cached and cached[0][0] is events and cached[0][1:] == inputs[1:]:
+        return cached[1], cached[2]
+
+    name = "Infinity Nikki events" if guild_id is None else "Infinity Nikki events and downtime"
+    text = (
+        f"BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:{PRODID}\r\nCALSCALE:GREGORIAN\r\n"
+        f"X-WR-CALNAME:{escape_text(name)}\r\n"
+        + get_events_block(events)
+        + (get_windows_block(guild_id, windows) if guild_id else "")
+        + "END:VCALENDAR\r\n"
+    )
+    body = text.encode()
+    etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+    _feeds[guild_id] = (inputs, etag, body)
+    return etag, body
+
+
+def is_known_guild(guild_id: int) -> bool:
+    if config.ALLOWED_GUILD_IDS and guild_id not in config.ALLOWED_GUILD_IDS:
+        return False
+    return guild_id in storage.downtime_schedules or (core.client is not None and core.client.get_guild(guild_id) is not None)
+
+
+def etag_matches(header: str, etag: str) -> bool:
+    return any(tag.strip() in (etag, f"W/{etag}", "*") for tag in header.split(","))
+
+
+async def handle_feed(request: web.Request) -> web.StreamResponse:
+    feed = request.match_info["feed"]
+    guild_id = None if feed == "events" else int(feed)
+    if guild_id is not None and not is_known_guild(guild_id):
+        raise web.HTTPNotFound()
+    etag, body = get_feed(guild_id)
+    headers = {"ETag": etag, "Cache-Control": f"max-age={ICS_MAX_AGE}"}
+    if etag_matches(request.headers.get("If-None-Match", ""), etag):
+        return web.Response(status=304, headers=headers)
+    return web.Response(body=body, content_type="text/calendar", charset="utf-8", headers=headers)
+
+
+def build_app() -> web.Application:
+    app = web.Application()
+    app.router.add_get(r"/calendar/{feed:events|\d+}.ics", handle_feed)
+    return app
+
+
+def feed_url(guild_id: int) -> Optional[str]:
+    """Where users subscribe to a guild's feed; None unless ICS_PUBLIC_URL is set."""
+    if not config.ICS_PORT or not config.ICS_PUBLIC_URL:
+        return None
+    return f"{config.ICS_PUBLIC_URL}/calendar/{guild_id}.ics"
+
+
+async def start_server() -> None:
+    """Serve the feeds on ICS_HOST:ICS_PORT; only the first call does anything."""
+    global runner
+    if runner is not None or not config.ICS_PORT:
+        return
+    runner = web.AppRunner(build_app(), access_log=None)
+    await runner.setup()
+    try:
+        await web.TCPSite(runner, config.ICS_HOST, config.ICS_PORT).start()
+    except OSError as exc:
+        print(f"Could not serve calendar feeds on {config.ICS_HOST}:{config.ICS_PORT}: {exc!r}")
+        await runner.cleanup()
+        runner = None
+        return
+    print(f"Serving calendar feeds on http://{config.ICS_HOST}:{config.ICS_PORT}/calendar/")
+
+
+async def stop_server() -> None:
+    global runner
+    if runner is not None:
+        await runner.cleanup()
+        runner = None
@@ -0,0 +1,189 @@
+"""Active/standby lease for running two instances against the same files.
+
+With HA_LEASE_FILE set, an instance only connects to Discord once it holds
+the lease, a row in that SQLite file renewed every HA_LEASE_TTL / 3
+seconds. The standby polls at the same rate and takes over once the row
+expires (or at once, when the active instance shuts down cleanly and
+releases it). Only one instance is ever connected, so interactions,
+refreshes and saves all belong to the lease holder.
+
+An instance that stalls past its lease (a long pause, a frozen VM) may
+resume after the standby took over. holds() is checked before panel edits
+and state file writes, using the instance's own clock and no I/O, so the
+old holder stops editing the moment its lease runs out, before its renew
+loop finds out and shuts the client down.
+
+MemoryLease is an in-process stand-in with the same behaviour, for
+benchmarks and local experiments.
+"""
+import asyncio
+import os
+import socket
+import sqlite3
+import time
+from contextlib import closing
+from typing import Awaitable, Callable, Optional, Union
+
+from . import config
+
+
+class SqliteLease:
+    def __init__(self, path: str, holder: str, ttl: float, name: str = "panel-updater"):
+        self.path = path
+        self.holder = holder
+        self.ttl = ttl
+        self.name = name
+        # Last holder seen when the lease could not be taken
+        self.owner: Optional[str] = None
+        # time.monotonic() until which this instance may act on the lease
+        self.valid_until = 0.0
+
+    def connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=self.ttl / 3, isolation_level=None)
+        conn.execute("CREATE TABLE IF NOT EXISTS lease (name TEXT PRIMARY KEY, holder TEXT NOT NULL, expires REAL NOT NULL)")
+        return conn
+
+    def try_acquire(self) -> bool:
+        """Take the lease if it is free or expired, or renew it; blocking."""
+        started = time.monotonic()
+        now = time.time()
+        with closing(self.connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute("SELECT holder, expires FROM lease WHERE name = ?", (self.name,)).fetchone()
+                if row is not None and row[0] != self.holder and row[1] > now:
+                    self.owner = row[0]
+                    return False
+                conn.execute(
+                    "INSERT INTO lease (name, holder, expires) VALUES (?, ?, ?) "
+                    "ON CONFLICT(name) DO UPDATE SET holder = excluded.holder, expires = excluded.expires",
+                    (self.name, self.holder, now + self.ttl),
+                )
+            finally:
+                conn.execute("COMMIT")
+        self.owner = self.holder
+        self.valid_until = started + self.ttl
+        return True
+
+    def release(self) -> None:
+        self.valid_until = 0.0
+        with closing(self.connect()) as conn:
+            conn.execute("DELETE FROM lease WHERE name = ? AND holder = ?", (self.name, self.holder))
+
+    def valid(self) -> bool:
+        return time.monotonic() < self.valid_until
+
+
+class MemoryLease:
+    """SqliteLease semantics over a dict shared by the instances of one process."""
+
+    def __init__(self, store: dict, holder: str, ttl: float, name: str = "panel-updater"):
+        self.store = store
+        self.holder = holder
+        self.ttl = ttl
+        self.name = name
+        self.owner: Optional[str] = None
+        self.valid_until = 0.0
+
+    def try_acquire(self) -> bool:
+        started = time.monotonic()
+        row = self.store.get(self.name)
+        if row is not None and row[0] != self.holder and row[1] > started:
+            self.owner = row[0]
+            return False
+        self.store[self.name] = (self.holder, started + self.ttl)
+        self.owner = self.holder
+        self.valid_until = started + self.ttl
+        return True
+
+    def release(self) -> None:
+        self.valid_until = 0.0
+        if self.store.get(self.name, (None,))[0] == self.holder:
+            del self.store[self.name]
+
+    def valid(self) -> bool:
+        return time.monotonic() < self.valid_until
+
+
+Lease = Union[SqliteLease, MemoryLease]
+
+# The lease this instance runs under; None when HA is off
+current: Optional[Lease] = None
+renew_task: Optional[asyncio.Task] = None
+# Set when the lease was lost while running (as opposed to released at shutdown)
+lost = False
+
+
+def holds() -> bool:
+    """Whether this instance may edit panels and write state right now."""
+    return current is None or current.valid()
+
+
+def default_holder() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def build_lease() -> Optional[Lease]:
+    if not config.HA_LEASE_FILE:
+        return None
+    return SqliteLease(config.HA_LEASE_FILE, default_holder(), config.HA_LEASE_TTL)
+
+
+async def try_acquire(lease: Lease) -> bool:
+    if isinstance(lease, SqliteLease):
+        return await asyncio.to_thread(lease.try_acquire)
+    return lease.try_acquire()
+
+
+async def wait_for_lease(lease: Lease) -> None:
+    """Block as the standby until the lease is ours; then it counts for holds()."""
+    global current
+    current = lease
+    announced = False
+    while True:
+        try:
+            if await try_acquire(lease):
+                break
+        except sqlite3.Error as exc:
+            print(f"HA lease check failed: {exc!r}")
+        if not announced:
+            print(f"Standby: {lease.owner or 'another instance'} holds the lease, waiting")
+            announced = True
+        await asyncio.sleep(lease.ttl / 3)
+    print(f"Acquired the HA lease as {lease.holder}")
+
+
+async def renew_loop(lease: Lease, on_lost: Callable[[], Awaitable[None]]) -> None:
+    """Renew every ttl/3; call on_lost once someone else holds it or it ran out."""
+    global lost
+    while True:
+        await asyncio.sleep(lease.ttl / 3)
+        try:
+            if not await try_acquire(lease):
+                print(f"Lost the HA lease to {lease.owner}")
+                break
+        except sqlite3.Error as exc:
+            # Keep trying while the lease we have still runs
+            print(f"HA lease renewal failed: {exc!r}")
+            if not lease.valid():
+                print("HA lease expired before it could be renewed")
+                break
+    lost = True
+    await on_lost()
+
+
+def start_renew_loop(lease: Lease, on_lost: Callable[[], Awaitable[None]]) -> None:
+    global renew_task
+    if renew_task is None:
+        renew_task = asyncio.get_running_loop().create_task(renew_loop(lease, on_lost))
+
+
+def release() -> None:
+    """Hand the lease to the standby right away on a clean shutdown."""
+    if renew_task is not None:
+        renew_task.cancel()
+    if current is not None and current.valid():
+        try:
+            current.release()
+        except sqlite3.Error as exc:
+            print(f"Could not release the HA lease: {exc!r}")
@@ -0,0 +1,117 @@
+"""Status panel text per locale. Missing keys fall back to English."""
+
+LOCALE_NAMES = {
+    "en": "English",
+    "es": "Español",
+    "fr": "Français",
+    "de": "Deutsch",
+}
+
+ENGLISH = {
+    "status_title": "Server Status",
+    "no_maintenance": "No maintenance scheduled.",
+    "default_title": "Scheduled Maintenance",
+    "online": "ONLINE",
+    "maintenance": "MAINTENANCE",
+    "upcoming_heading": "**Upcoming Maintenance:** {title}",
+    "back_online_in": "Game back online in: **{remaining}**",
+    "downtime_begins": "Downtime begins: {when}",
+    "start": "Start: {when}",
+    "end": "End: {when}",
+    "maintenance_ends": "Maintenance ends at: {when}",
+    "panel_scheduled": "Maintenance scheduled {when}",
+    "panel_back_online": "Back online {when}",
+    "complete": "Maintenance complete!",
+    "operational": "All systems operational",
+    "also_scheduled": "**Also scheduled:**",
+    "panel_footer": "Infinity Nikki - Status Panel",
+    "local_times_footer": "Times shown in your local timezone",
+    "button_label": "Check Status",
+    "hour": "hour",
+    "hours": "hours",
+    "minute": "minute",
+    "minutes": "minutes",
+}
+
+TRANSLATIONS = {
+    "es": {
+        "status_title": "Estado del servidor",
+        "no_maintenance": "No hay mantenimiento programado.",
+        "default_title": "Mantenimiento programado",
+        "online": "EN LÍNEA",
+        "maintenance": "MANTENIMIENTO",
+        "upcoming_heading": "**Próximo mantenimiento:** {title}",
+        "back_online_in": "El juego vuelve en: **{remaining}**",
+        "downtime_begins": "El mantenimiento comienza: {when}",
+        "start": "Inicio: {when}",
+        "end": "Fin: {when}",
+        "maintenance_ends": "El mantenimiento termina: {when}",
+        "panel_scheduled": "Mantenimiento programado {when}",
+        "panel_back_online": "De vuelta {when}",
+        "complete": "¡Mantenimiento completado!",
+        "operational": "Todos los sistemas operativos",
+        "also_scheduled": "**También programado:**",
+        "panel_footer": "Infinity Nikki - Panel de estado",
+        "local_times_footer": "Horas mostradas en tu zona horaria local",
+        "button_label": "Ver estado",
+        "hour": "hora",
+        "hours": "horas",
+        "minute": "minuto",
+        "minutes": "minutos",
+    },
+    "fr": {
+        "status_title": "État du serveur",
+        "no_maintenance": "Aucune maintenance prévue.",
+        "default_title": "Maintenance programmée",
+        "online": "EN LIGNE",
+        "maintenance": "MAINTENANCE",
+        "upcoming_heading": "**Maintenance à venir :** {title}",
+        "back_online_in": "Retour du jeu dans : **{remaining}**",
+        "downtime_begins": "Début de la maintenance : {when}",
+        "start": "Début : {when}",
+        "end": "Fin : {when}",
+        "maintenance_ends": "Fin de la maintenance : {when}",
+        "panel_scheduled": "Maintenance prévue {when}",
+        "panel_back_online": "De retour {when}",
+        "complete": "Maintenance terminée !",
+        "operational": "Tous les systèmes sont opérationnels",
+        "also_scheduled": "**Également prévu :**",
+        "panel_footer": "Infinity Nikki - Panneau d'état",
+        "local_times_footer": "Heures affichées dans votre fuseau horaire",
+        "button_label": "Voir l'état",
+        "hour": "heure",
+        "hours": "heures",
+    },
+    "de": {
+        "status_title": "Serverstatus",
+        "no_maintenance": "Keine Wartung geplant.",
+        "default_title": "Geplante Wartung",
+        "maintenance": "WARTUNG",
+        "upcoming_heading": "**Bevorstehende Wartung:** {title}",
+        "back_online_in": "Spiel wieder online in: **{remaining}**",
+        "downtime_begins": "Wartung beginnt: {when}",
+        "start": "Beginn: {when}",
+        "end": "Ende: {when}",
+        "maintenance_ends": "Wartung endet: {when}",
+        "panel_scheduled": "Wartung geplant {when}",
+        "panel_back_online": "Wieder online {when}",
+        "complete": "Wartung abgeschlossen!",
+        "operational": "Alle Systeme betriebsbereit",
+        "also_scheduled": "**Ebenfalls geplant:**",
+        "panel_footer": "Infinity Nikki - Statusanzeige",
+        "local_times_footer": "Zeiten in deiner lokalen Zeitzone",
+        "button_label": "Status prüfen",
+        "hour": "Stunde",
+        "hours": "Stunden",
+        "minute": "Minute",
+        "minutes": "Minuten",
+    },
+}
+
+# Locale -> complete string table, merged once at import
+STRINGS = {"en": ENGLISH}
+STRINGS.update({locale: {**ENGLISH, **strings} for locale, strings in TRANSLATIONS.items()})
+
+
+def get_strings(locale: str) -> dict[str, str]:
+    return STRINGS.get(locale) or ENGLISH
@@ -0,0 +1,294 @@
+"""Ordering for the REST requests the bot makes on its own behalf.
+
+Interaction responses never queue here. Everything else takes a slot
+first, by class:
+
+USER          panel edits a command just caused (e.g. /downtime refreshing
+              the guild's panels before it replies)
+REFRESH       scheduled refreshes: window transitions, startup, reloads
+HOUSEKEEPING  the stale panel sweep
+
+A class only starts a request while no higher class is waiting, and each
+class has its own concurrency budget. When an interaction arrives, REFRESH
+and HOUSEKEEPING drop to HELD_BUDGET (4) requests in flight for
+INTERACTION_HOLD seconds, leaving the connection pool and the event loop to
+the interaction and the edits it triggers; they never stop entirely, so a
+steady stream of interactions slows background work without starving it.
+
+REFRESH has no fixed budget while REFRESH_MAX_CONCURRENCY is set: an
+AdaptiveLimit grows it while responses come back fast and clean, and cuts
+it on 429s or rising latency (see record_response). A global 429 also
+pauses the class for its Retry-After.
+"""
+import asyncio
+import math
+from collections import Counter, deque
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import AsyncIterator, Mapping, Optional
+
+from . import config
+
+
+class Priority(IntEnum):
+    USER = 0
+    REFRESH = 1
+    HOUSEKEEPING = 2
+
+
+# Requests each class may have in flight at once
+BUDGETS = {Priority.USER: 8, Priority.REFRESH: 8, Priority.HOUSEKEEPING: 2}
+
+# Classes cut to HELD_BUDGET requests in flight for INTERACTION_HOLD seconds after each interaction
+HELD = (Priority.REFRESH, Priority.HOUSEKEEPING)
+HELD_BUDGET = 4
+INTERACTION_HOLD = 0.25
+
+# Pool connections (HTTP_POOL_SIZE) background requests leave free for interactions
+INTERACTION_RESERVE = 2
+
+# Classes whose budget adapts (up to REFRESH_MAX_CONCURRENCY) instead of staying fixed
+ADAPTIVE = (Priority.REFRESH,)
+# AIMD tuning: one more request in flight per limit's worth of clean responses;
+# times BACKOFF on a 429, a 5xx or a failed request, or when a response takes
+# over LATENCY_TOLERANCE x the no-load latency plus LATENCY_SLACK seconds
+BACKOFF = 0.7
+LATENCY_TOLERANCE = 2.0
+LATENCY_SLACK = 0.01
+# No-load latency: the fastest response of the previous BASELINE_WINDOW seconds
+# (or faster), so it follows the network instead of an old best case
+BASELINE_WINDOW = 30.0
+# Weight of each response in the smoothed latency that spaces out cuts
+LATENCY_SMOOTHING = 0.2
+# After a 429 the limit stays under what the rate the API allowed needs (successes
+# per second over the last RATE_WINDOW x latency) for CEILING_HOLD seconds. Rate
+# limits reset once per window while the limit grows every round trip, so a cut
+# alone would be outgrown long before the next 429.
+RATE_WINDOW = 1.0
+CEILING_HOLD = 30.0
+
+# Class of the slot the current task holds, for record_response
+current_priority: ContextVar[Optional[Priority]] = ContextVar("current_priority", default=None)
+
+
+class AdaptiveLimit:
+    """Additive-increase, multiplicative-decrease concurrency limit."""
+
+    def __init__(self, initial: int, maximum: int, minimum: int = 1):
+        self.minimum = minimum
+        self.maximum = max(minimum, maximum)
+        self.limit = float(min(max(initial, minimum), self.maximum))
+        self.baseline: Optional[float] = None
+        self.window_min = float("inf")
+        self.window_end = 0.0
+        self.smoothed = 0.0
+        # Loop times of the successes in the last RATE_WINDOW
+        self.recent: deque[float] = deque()
+        self.ceiling = self.maximum
+        self.ceiling_until = 0.0
+        self.cut_at = float("-inf")
+        # Loop time before which the class starts nothing (global 429)
+        self.paused_until = 0.0
+        self.throttled = 0
+        self.cuts = 0
+
+    def current(self) -> int:
+        return int(self.limit)
+
+    def completed(self, now: float, elapsed: float, in_flight: int) -> None:
+        """A response that was not an error; in_flight includes its request."""
+        if now >= self.window_end:
+            if self.window_min != float("inf"):
+                self.baseline = self.window_min
+            self.window_min = float("inf")
+            self.window_end = now + BASELINE_WINDOW
+        self.window_min = min(self.window_min, elapsed)
+        if self.baseline is None or elapsed < self.baseline:
+            self.baseline = elapsed
+        self.smoothed += (elapsed - self.smoothed) * LATENCY_SMOOTHING
+        self.recent.append(now)
+        while self.recent[0] < now - RATE_WINDOW:
+            self.recent.popleft()
+        if elapsed > self.baseline * LATENCY_TOLERANCE + LATENCY_SLACK:
+            # Queueing somewhere between here and Discord
+            self.cut(now)
+        elif in_flight >= self.current():
+            # Only a limit that is actually reached grows, or an idle class would
+            # start its next burst far above what the API takes
+            ceiling = self.ceiling if now < self.ceiling_until else self.maximum
+            self.limit = max(self.limit, min(ceiling, self.limit + 1 / self.limit))
+
+    def rate_limited(self, now: float, scope: str, retry_after: float) -> None:
+        if scope == "shared":
+            # A resource's limit shared with other apps; our rate did not cause it
+            return
+        self.throttled += 1
+        if scope == "global":
+            self.paused_until = max(self.paused_until, now + retry_after)
+        while self.recent and self.recent[0] < now - RATE_WINDOW:
+            self.recent.popleft()
+        if self.recent and self.smoothed:
+            # Little's law: requests in flight needed to send at the rate that got through
+            allowed = len(self.recent) / RATE_WINDOW * self.smoothed
+            self.ceiling = min(self.maximum, max(self.minimum, math.ceil(allowed)))
+            self.ceiling_until = now + CEILING_HOLD
+        self.cut(now)
+        if now < self.ceiling_until:
+            self.limit = min(self.limit, self.ceiling)
+
+    def cut(self, now: float) -> None:
+        # Requests already in flight report the same congestion: one cut per round trip
+        if now - self.cut_at < self.smoothed:
+            return
+        self.cut_at = now
+        self.cuts += 1
+        self.limit = max(self.minimum, self.limit * BACKOFF)
+
+
+class OutboundScheduler:
+    def __init__(
+        self, budgets: Optional[dict[Priority, int]] = None, hold: float = INTERACTION_HOLD, adaptive: bool = True
+    ):
+        self.budgets = dict(budgets or BUDGETS)
+        self.hold = hold
+        # Class -> its AdaptiveLimit, created on first use; None turns adaptation off
+        self.adaptive: Optional[dict[Priority, AdaptiveLimit]] = {} if adaptive else None
+        self.in_flight: Counter[Priority] = Counter()
+        self.waiters: dict[Priority, deque[asyncio.Future]] = {priority: deque() for priority in Priority}
+        self.hold_until = 0.0
+        self.wake_handle: Optional[asyncio.TimerHandle] = None
+
+    def total_limit(self) -> Optional[int]:
+        if not config.HTTP_POOL_SIZE:
+            return None
+        return max(1, config.HTTP_POOL_SIZE - INTERACTION_RESERVE)
+
+    def adaptive_limit(self, priority: Priority) -> Optional[AdaptiveLimit]:
+        """The limit replacing a class's fixed budget, if it adapts."""
+        if self.adaptive is None or priority not in ADAPTIVE or not config.REFRESH_MAX_CONCURRENCY:
+            return None
+        adaptive = self.adaptive.get(priority)
+        if adaptive is None:
+            adaptive = self.adaptive[priority] = AdaptiveLimit(self.budgets[priority], config.REFRESH_MAX_CONCURRENCY)
+        return adaptive
+
+    def can_start(self, priority: Priority, now: float) -> bool:
+        if any(self.waiters[higher] for higher in Priority if higher < priority):
+            return False
+        limit = self.budgets[priority]
+        adaptive = self.adaptive_limit(priority)
+        if adaptive is not None:
+            if now < adaptive.paused_until:
+                return False
+            limit = adaptive.current()
+        if priority in HELD and now < self.hold_until:
+            limit = min(limit, HELD_BUDGET)
+        if self.in_flight[priority] >= limit:
+            return False
+        total = self.total_limit()
+        return total is None or sum(self.in_flight.values()) < total
+
+    async def acquire(self, priority: Priority) -> None:
+        loop = asyncio.get_running_loop()
+        if not self.waiters[priority] and self.can_start(priority, loop.time()):
+            self.in_flight[priority] += 1
+            return
+        waiter = loop.create_future()
+        self.waiters[priority].append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if not waiter.cancelled():
+                # Granted just as it was cancelled; hand the slot on
+                self.release(priority)
+                raise
+            if waiter in self.waiters[priority]:
+                self.waiters[priority].remove(waiter)
+            # It may have been holding back lower classes
+            self.wake()
+            raise
+
+    def release(self, priority: Priority) -> None:
+        self.in_flight[priority] -= 1
+        self.wake()
+
+    def wake(self) -> None:
+        """Grant slots to waiters, highest class first."""
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        for priority in Priority:
+            queue = self.waiters[priority]
+            while queue and self.can_start(priority, now):
+                waiter = queue.popleft()
+                if waiter.done():
+                    # Cancelled while queued
+                    continue
+                self.in_flight[priority] += 1
+                waiter.set_result(None)
+        resume_at = self.resume_at(now)
+        if resume_at is not None:
+            # Lift the hold or pause on time even if nothing else finishes meanwhile
+            if self.wake_handle is None or self.wake_handle.when() != resume_at:
+                if self.wake_handle is not None:
+                    self.wake_handle.cancel()
+                self.wake_handle = loop.call_at(resume_at, self.resume)
+
+    def resume_at(self, now: float) -> Optional[float]:
+        """When the next waiting class held back by an interaction or a pause may start."""
+        times = []
+        if now < self.hold_until and any(self.waiters[priority] for priority in HELD):
+            times.append(self.hold_until)
+        for priority, adaptive in (self.adaptive or {}).items():
+            if now < adaptive.paused_until and self.waiters[priority]:
+                times.append(adaptive.paused_until)
+        return min(times, default=None)
+
+    def resume(self) -> None:
+        self.wake_handle = None
+        self.wake()
+
+    def interaction_received(self) -> None:
+        loop = asyncio.get_running_loop()
+        self.hold_until = max(self.hold_until, loop.time() + self.hold)
+        self.wake()
+
+    def observe(self, priority: Priority, elapsed: float, status: int, headers: Mapping[str, str]) -> None:
+        """Feed one response (status 0: the request failed) to the class's adaptive limit."""
+        adaptive = self.adaptive_limit(priority)
+        if adaptive is None:
+            return
+        now = asyncio.get_running_loop().time()
+        if status == 429:
+            scope = "global" if headers.get("X-RateLimit-Global") == "true" else headers.get("X-RateLimit-Scope", "user")
+            try:
+                retry_after = float(headers.get("Retry-After", 0))
+            except ValueError:
+                retry_after = 0.0
+            adaptive.rate_limited(now, scope, retry_after)
+        elif status >= 500 or status == 0:
+            adaptive.cut(now)
+        else:
+            adaptive.completed(now, elapsed, self.in_flight[priority])
+        self.wake()
+
+    @asynccontextmanager
+    async def slot(self, priority: Priority) -> AsyncIterator[None]:
+        await self.acquire(priority)
+        token = current_priority.set(priority)
+        try:
+            yield
+        finally:
+            current_priority.reset(token)
+            self.release(priority)
+
+
+scheduler = OutboundScheduler()
+
+
+def record_response(elapsed: float, status: int, headers: Mapping[str, str]) -> None:
+    """Called for every REST response (httpclient's trace hooks); only those sent
+    from inside a slot of an adaptive class count."""
+    priority = current_priority.get()
+    if priority is not None:
+        scheduler.observe(priority, elapsed, status, headers)
@@ -0,0 +1,114 @@
+"""Opt-in performance debugging: event loop lag monitoring and cProfile capture."""
+import asyncio
+import cProfile
+import os
+import pstats
+from datetime import datetime, timezone
+from typing import Optional
+
+import discord
+from discord import app_commands
+
+from . import config
+from .checks import require_allowed_guild, require_downtime_role
+from .httpclient import RestStats, collect_rest_stats
+from .rendering import HEART_EMOJI
+
+# Seconds between REST latency / connection reuse summaries
+REST_REPORT_INTERVAL = 300
+
+lag_monitor_task: Optional[asyncio.Task] = None
+rest_report_task: Optional[asyncio.Task] = None
+perf_profile_running = False
+
+
+async def monitor_loop_lag(interval: float = 0.5) -> None:
+    """Log whenever the event loop wakes up later than expected."""
+    loop = asyncio.get_running_loop()
+    threshold = config.PERF_LAG_THRESHOLD_MS / 1000
+    while True:
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        lag = loop.time() - expected
+        if lag >= threshold:
+            print(f"Event loop lag: {lag * 1000:.0f}ms (threshold {config.PERF_LAG_THRESHOLD_MS}ms)")
+
+
+async def report_rest_stats(interval: float = REST_REPORT_INTERVAL) -> None:
+    """Log REST latency percentiles and connection reuse for each interval with traffic."""
+    while True:
+        with collect_rest_stats() as stats:
+            await asyncio.sleep(interval)
+        if stats.requests:
+            print(stats.summary())
+
+
+def start_perf_monitoring() -> None:
+    """Start lag monitoring, slow callback logging and REST stats when DEBUG_PERF=1."""
+    global lag_monitor_task, rest_report_task
+    if not config.DEBUG_PERF or lag_monitor_task is not None:
+        return
+    loop = asyncio.get_running_loop()
+    # Debug mode makes asyncio log the callback (e.g. update_panels) that blocked the loop.
+    loop.set_debug(True)
+    loop.slow_callback_duration = config.PERF_LAG_THRESHOLD_MS / 1000
+    lag_monitor_task = loop.create_task(monitor_loop_lag())
+    rest_report_task = loop.create_task(report_rest_stats())
+    print(f"Performance monitoring enabled (lag threshold {config.PERF_LAG_THRESHOLD_MS}ms)")
+
+
+def write_profile_report(profiler: cProfile.Profile, seconds: int, rest: RestStats) -> str:
+    os.makedirs(config.PERF_REPORT_DIR, exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%d-%H%M%S")
+    path = os.path.join(config.PERF_REPORT_DIR, f"perf-{stamp}.txt")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f"Profile window: {seconds}s (captured {stamp} UTC)\n")
+        # The REST trace is only attached when DEBUG_PERF or REFRESH_MAX_CONCURRENCY is set at startup
+        traced = config.DEBUG_PERF or config.REFRESH_MAX_CONCURRENCY
+        f.write(f"{rest.summary() if traced else 'REST: not traced (DEBUG_PERF=0, REFRESH_MAX_CONCURRENCY=0)'}\n\n")
+        stats = pstats.Stats(profiler, stream=f)
+        stats.sort_stats("cumulative").print_stats(60)
+    return path
+
+
+async def capture_profile(seconds: int) -> str:
+    """Profile everything running on the event loop for a window and write a report."""
+    profiler = cProfile.Profile()
+    with collect_rest_stats() as rest:
+        profiler.enable()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            profiler.disable()
+    return await asyncio.to_thread(write_profile_report, profiler, seconds, rest)
+
+
+@app_commands.command(name="debugperf", description="[MOD] Profile the bot for a while and save a report")
+@app_commands.describe(seconds="How long to profile (5-300 seconds)")
+@app_commands.check(require_allowed_guild)
+@app_commands.check(require_downtime_role)
+async def debugperf(
+    interaction: discord.Interaction,
+    seconds: app_commands.Range[int, 5, 300] = 30
+):
+    """Capture a cProfile window of all bot activity and write it to disk."""
+    global perf_profile_running
+    if perf_profile_running:
+        await interaction.response.send_message(
+            f"{HEART_EMOJI} A profile is already running, try again when it finishes.",
+            ephemeral=True,
+        )
+        return
+
+    perf_profile_running = True
+    try:
+        await interaction.response.send_message(
+            f"{HEART_EMOJI} Profiling for **{seconds}s**...",
+            ephemeral=True,
+        )
+        path = await capture_profile(seconds)
+    finally:
+        perf_profile_running = False
+
+    await interaction.followup.send(f"{HEART_EMOJI} Profile saved to `{path}`", ephemeral=True)
+    print(f"✓ Profile captured by {interaction.user} in {interaction.guild}: {path}")
@@ -0,0 +1,106 @@
+"""Reminders extension: /remindme subscriptions to event starts and downtime."""
+from typing import Optional
+
+import discord
+from discord import app_commands
+
+from .catalog import EVENT_TYPE_CONFIG, EVENT_TYPE_ORDER
+from .checks import require_allowed_guild
+from .rendering import HEART_EMOJI
+from .reminders import (
+    DM,
+    MAX_MINUTES_BEFORE,
+    MAX_REMINDERS_PER_USER,
+    describe_target,
+    start_reminders,
+    subscribe,
+    unsubscribe,
+    user_subscriptions,
+)
+
+TARGET_CHOICES = [
+    app_commands.Choice(name=f"{EVENT_TYPE_CONFIG[t]['display_name']} starts", value=f"event:{t}")
+    for t in EVENT_TYPE_ORDER
+] + [
+    app_commands.Choice(name="Maintenance starts (this server)", value="start"),
+    app_commands.Choice(name="Maintenance ends (this server)", value="end"),
+]
+
+
+def describe_subscription(target: str, minutes: int, channel_id: int) -> str:
+    when = f"{minutes} min before" if minutes else "when it happens"
+    where = "by DM" if channel_id == DM else f"in <#{channel_id}>"
+    return f"{describe_target(target)}: {when}, {where}"
+
+
+@app_commands.command(name="remindme", description="Get pinged when events start or maintenance starts/ends")
+@app_commands.describe(
+    target="What to be reminded of (leave empty to list your reminders)",
+    minutes_before="How long before it to be reminded (0 = when it happens)",
+    here="Mention me in this channel instead of sending a DM",
+    remove="Remove this reminder instead of adding it",
+)
+@app_commands.choices(target=TARGET_CHOICES)
+@app_commands.check(require_allowed_guild)
+async def remindme(
+    interaction: discord.Interaction,
+    target: Optional[app_commands.Choice[str]] = None,
+    minutes_before: app_commands.Range[int, 0, MAX_MINUTES_BEFORE] = 0,
+    here: bool = False,
+    remove: bool = False,
+):
+    """Add or remove a reminder; run without a target to list yours."""
+    user_id = interaction.user.id
+    if target is None:
+        current = user_subscriptions(user_id)
+        if not current:
+            await interaction.response.send_message("You have no reminders. Pick a target to add one.", ephemeral=True)
+            return
+        lines = "\n".join(f"• {describe_subscription(*entry)}" for entry in current)
+        await interaction.response.send_message(f"{HEART_EMOJI} **Your reminders**\n\n{lines}", ephemeral=True)
+        return
+
+    key = target.value
+    if key in ("start", "end"):
+        if not interaction.guild_id:
+            await interaction.response.send_message("Maintenance reminders can only be set in a server.", ephemeral=True)
+            return
+        key = f"{key}:{interaction.guild_id}"
+    if here and not interaction.guild_id:
+        await interaction.response.send_message("Channel reminders can only be set in a server.", ephemeral=True)
+        return
+    channel_id = interaction.channel_id if here else DM
+    description = describe_subscription(key, minutes_before, channel_id)
+
+    if remove:
+        if unsubscribe(key, minutes_before, channel_id, user_id):
+            message = f"{HEART_EMOJI} **Reminder removed**\n\n{description}"
+        else:
+            message = f"You have no such reminder.\n\n{description}"
+        await interaction.response.send_message(message, ephemeral=True)
+        return
+
+    if len(user_subscriptions(user_id)) >= MAX_REMINDERS_PER_USER:
+        await interaction.response.send_message(
+            f"You already have {MAX_REMINDERS_PER_USER} reminders. Remove one first (`remove: True`).", ephemeral=True
+        )
+        return
+    if not subscribe(key, minutes_before, channel_id, user_id):
+        await interaction.response.send_message(f"You already have this reminder.\n\n{description}", ephemeral=True)
+        return
+    note = "" if here else "\n\nMake sure you allow DMs from this server's members, or the reminder can't reach you."
+    await interaction.response.send_message(f"{HEART_EMOJI} **Reminder set**\n\n{description}{note}", ephemeral=True)
+
+
+COMMANDS = [
+    remindme,
+]
+
+
+def setup(tree: app_commands.CommandTree) -> None:
+    for command in COMMANDS:
+        tree.add_command(command)
+
+
+async def startup() -> None:
+    start_reminders()
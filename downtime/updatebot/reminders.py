@@ -0,0 +1,460 @@
+"""Opt-in reminders for catalog events and downtime windows.
+
+A subscription is a user, a target, an offset and where to deliver:
+
+  event:<type>     an event of that type starts (e.g. every resonance banner)
+  start:<guild>    one of that guild's downtime windows starts
+  end:<guild>      one of that guild's downtime windows ends
+
+minutes_before the moment, by DM or as a mention in the channel the user
+subscribed from. Subscribers are stored per (target, offset), then per
+channel, as a sorted array of user IDs at 8 bytes each. A reminder with
+ten thousand subscribers costs one timer and one lookup, the same as one
+with a single subscriber.
+
+Firings are planned PLAN_HORIZON ahead into a timingwheel.TimingWheel,
+one timer per (target, offset, moment). The plan is rebuilt when
+subscriptions, a schedule or the catalog change. One loop advances the
+wheel. Deliveries go out in order, mentions and DMs from separate queues
+so a long DM fan-out never holds up a channel reminder:
+- Mentions go MENTIONS_PER_MESSAGE to a message.
+- DMs are sent by DM_WORKERS workers, paced to REMINDER_DM_RATE per second
+  so a large fan-out stays clear of Discord's global rate limit.
+- Every send waits for a REFRESH slot in outbound.scheduler, so
+  interactions go first.
+Nothing runs as a task per reminder or per subscriber.
+
+Reminders that came due while the bot was offline are not sent late.
+"""
+import asyncio
+import json
+import os
+from array import array
+from bisect import bisect_left
+from collections import deque
+from typing import Iterator, Optional
+
+import discord
+
+from . import catalog, clock, config, core, lease, storage
+from .catalog import EVENT_TYPE_CONFIG, RECURRENCE_PERIODS
+from .outbound import Priority, scheduler
+from .rendering import MAINT_EMOJI, ONLINE_EMOJI
+from .timingwheel import TimingWheel
+
+# Longest lead time a reminder can have, and how many one user may hold
+MAX_MINUTES_BEFORE = 7 * 24 * 60
+MAX_REMINDERS_PER_USER = 25
+
+# How far ahead firings are planned (seconds); the plan is renewed halfway through
+PLAN_HORIZON = 8 * 86400
+
+# Users mentioned per channel message (well under the 2000 character limit)
+MENTIONS_PER_MESSAGE = 50
+# DMs in flight at once
+DM_WORKERS = 4
+
+# Seconds between writes of REMINDERS_FILE while subscriptions change
+SAVE_INTERVAL = 30
+# Seconds the reminder loop waits after an unexpected error before planning again
+ERROR_RETRY = 60
+
+# Channel ID that stands for "by DM"
+DM = 0
+
+# (target, minutes before) -> channel ID (DM for DMs) -> sorted user IDs
+subscriptions: dict[tuple[str, int], dict[int, array]] = {}
+
+wheel: Optional[TimingWheel] = None
+# Time up to which reminders have been fired (the wheel's last tick); a new plan only adds later ones
+fired_through = 0.0
+replan_at = 0.0
+plan_stale = True
+# Set to wake the reminder loop early (subscriptions, schedules or the catalog changed)
+plan_changed: Optional[asyncio.Event] = None
+
+# Messages waiting to go out, oldest first: channel mentions, and DMs
+mention_deliveries: deque["Delivery"] = deque()
+dm_deliveries: deque["Delivery"] = deque()
+mention_ready: Optional[asyncio.Event] = None
+dm_ready: Optional[asyncio.Event] = None
+# Earliest clock time the next DM may be sent
+next_dm_at = 0.0
+
+dirty = False
+reminder_task: Optional[asyncio.Task] = None
+mention_task: Optional[asyncio.Task] = None
+dm_task: Optional[asyncio.Task] = None
+save_task: Optional[asyncio.Task] = None
+
+
+class Delivery:
+    """One reminder text for a list of users in one channel (or their DMs)."""
+
+    __slots__ = ("channel_id", "guild_id", "text", "user_ids")
+
+    def __init__(self, channel_id: int, guild_id: Optional[int], text: str, user_ids: array):
+        self.channel_id = channel_id
+        self.guild_id = guild_id
+        self.text = text
+        self.user_ids = user_ids
+
+
+def target_guild(target: str) -> Optional[int]:
+    kind, _, value = target.partition(":")
+    return int(value) if kind in ("start", "end") and value.isdigit() else None
+
+
+def describe_target(target: str) -> str:
+    kind, _, value = target.partition(":")
+    if kind == "event":
+        return f"{EVENT_TYPE_CONFIG.get(value, {}).get('display_name', value)} starts"
+    return "Maintenance starts" if kind == "start" else "Maintenance ends"
+
+
+def subscribe(target: str, minutes: int, channel_id: int, user_id: int) -> bool:
+    """Add a subscription; False if the user already had it."""
+    users = subscriptions.setdefault((target, minutes), {}).setdefault(channel_id, array("Q"))
+    index = bisect_left(users, user_id)
+    if index < len(users) and users[index] == user_id:
+        return False
+    users.insert(index, user_id)
+    changed()
+    return True
+
+
+def unsubscribe(target: str, minutes: int, channel_id: int, user_id: int) -> bool:
+    """Remove a subscription; False if there was none."""
+    channels = subscriptions.get((target, minutes))
+    users = channels.get(channel_id) if channels else None
+    if users is None:
+        return False
+    index = bisect_left(users, user_id)
+    if index == len(users) or users[index] != user_id:
+        return False
+    del users[index]
+    if not users:
+        del channels[channel_id]
+        if not channels:
+            del subscriptions[(target, minutes)]
+    changed()
+    return True
+
+
+def user_subscriptions(user_id: int) -> list[tuple[str, int, int]]:
+    """(target, minutes before, channel ID) of everything a user subscribed to."""
+    found = []
+    for (target, minutes), channels in subscriptions.items():
+        for channel_id, users in channels.items():
+            index = bisect_left(users, user_id)
+            if index < len(users) and users[index] == user_id:
+                found.append((target, minutes, channel_id))
+    return found
+
+
+def remove_user_dms(user_id: int) -> int:
+    """Drop a user's DM reminders (their DMs are closed to the bot)."""
+    return sum(unsubscribe(target, minutes, DM, user_id) for target, minutes, channel_id in user_subscriptions(user_id)
+               if channel_id == DM)
+
+
+def remove_channel(channel_id: int) -> int:
+    removed = 0
+    for key in list(subscriptions):
+        users = subscriptions[key].pop(channel_id, None)
+        if users is not None:
+            removed += len(users)
+            if not subscriptions[key]:
+                del subscriptions[key]
+    if removed:
+        changed()
+    return removed
+
+
+def subscription_count() -> int:
+    return sum(len(users) for channels in subscriptions.values() for users in channels.values())
+
+
+def changed() -> None:
+    global dirty
+    dirty = True
+    invalidate()
+
+
+def invalidate() -> None:
+    """Rebuild the plan before the next firing; call after schedules or the catalog change."""
+    global plan_stale
+    plan_stale = True
+    if plan_changed is not None:
+        plan_changed.set()
+
+
+def get_moments(target: str, after: int, until: int) -> Iterator[int]:
+    """Times in (after, until] at which target happens."""
+    kind, _, value = target.partition(":")
+    if kind == "event":
+        for event in catalog.get_compiled_events():
+            if event.type != value:
+                continue
+            if event.recurrence:
+                yield from catalog.iter_occurrences(event, after, until)
+            elif after < event.start <= until:
+                yield event.start
+        return
+    schedule = storage.downtime_schedules.get(target_guild(target) or 0)
+    if schedule is None:
+        return
+    for window in schedule.windows:
+        ts = window["start"] if kind == "start" else window["end"]
+        if after < ts <= until:
+            yield ts
+
+
+def plan(now: float) -> None:
+    """Refill the wheel with every firing after fired_through, up to PLAN_HORIZON ahead."""
+    global wheel, replan_at, plan_stale
+    plan_stale = False
+    wheel = TimingWheel(fired_through)
+    for target, minutes in subscriptions:
+        lead = minutes * 60
+        for moment in set(get_moments(target, int(fired_through) + lead, int(now) + PLAN_HORIZON + lead)):
+            wheel.add(moment - lead, (target, minutes, moment))
+    replan_at = now + PLAN_HORIZON / 2
+
+
+def event_text(event_type: str, minutes: int, moment: int) -> Optional[str]:
+    names = []
+    for event in catalog.get_compiled_events():
+        if event.type != event_type:
+            continue
+        if event.start == moment or (event.recurrence and event.start <= moment <= event.end
+                                     and (moment - catalog.get_recurrence_anchor(event))
+                                     % RECURRENCE_PERIODS[event.recurrence["freq"]] == 0):
+            names.append(event.name)
+    if not names:
+        # Gone from the catalog since it was planned
+        return None
+    emoji = EVENT_TYPE_CONFIG.get(event_type, {}).get("emoji", "📌")
+    when = "has started!" if len(names) == 1 else "have started!"
+    if minutes:
+        when = f"{'starts' if len(names) == 1 else 'start'} <t:{moment}:R> (<t:{moment}:F>)"
+    return f"{emoji} **{', '.join(names)}** {when}"
+
+
+def downtime_text(kind: str, guild_id: int, minutes: int, moment: int) -> Optional[str]:
+    schedule = storage.downtime_schedules.get(guild_id)
+    key = "start" if kind == "start" else "end"
+    window = next((w for w in schedule.windows if w[key] == moment), None) if schedule else None
+    if window is None:
+        return None
+    guild = core.client.get_guild(guild_id) if core.client else None
+    where = f" in **{guild.name}**" if guild is not None else ""
+    title = window["title"] or "Scheduled Maintenance"
+    if kind == "start":
+        when = "has started" if not minutes else f"starts <t:{moment}:R> (<t:{moment}:F>)"
+        return f"{MAINT_EMOJI} **{title}**{where} {when}. Expected to end <t:{window['end']}:R>."
+    when = "is over" if not minutes else f"ends <t:{moment}:R> (<t:{moment}:F>)"
+    return f"{ONLINE_EMOJI} **{title}**{where} {when}."
+
+
+def fire(target: str, minutes: int, moment: int) -> int:
+    """Queue the deliveries of one firing; returns how many users it reaches."""
+    channels = subscriptions.get((target, minutes))
+    if not channels:
+        return 0
+    kind, _, value = target.partition(":")
+    guild_id = target_guild(target)
+    if kind == "event":
+        text = event_text(value, minutes, moment)
+    else:
+        text = downtime_text(kind, guild_id, minutes, moment) if guild_id else None
+    if text is None:
+        return 0
+    reached = 0
+    for channel_id, users in channels.items():
+        # A copy, so (un)subscribing while it goes out is safe
+        queue, ready = (dm_deliveries, dm_ready) if channel_id == DM else (mention_deliveries, mention_ready)
+        queue.append(Delivery(channel_id, guild_id, text, array("Q", users)))
+        if ready is not None:
+            ready.set()
+        reached += len(users)
+    return reached
+
+
+def fire_due(now: float) -> None:
+    """Replan if needed, then fire everything due by now."""
+    global fired_through
+    if plan_stale or now >= replan_at:
+        plan(now)
+    for target, minutes, moment in wheel.advance(now):
+        try:
+            fire(target, minutes, moment)
+        except Exception as exc:
+            # The firings after it in this batch still go out
+            print(f"Reminder {target} ({minutes} min before {moment}) failed: {exc!r}")
+    # Not now: timers between the last whole tick and now are still in the wheel
+    fired_through = wheel.current * wheel.resolution
+
+
+async def reminder_loop() -> None:
+    global plan_stale
+    while True:
+        now = clock.now()
+        try:
+            fire_due(now)
+            timeout = max(0.0, min(wheel.next_due(), replan_at) - now)
+        except Exception as exc:
+            print(f"Reminder loop error: {exc!r}")
+            plan_stale = True
+            timeout = ERROR_RETRY
+        plan_changed.clear()
+        await clock.wait(plan_changed, timeout)
+
+
+async def send_mentions(delivery: Delivery) -> None:
+    client = core.client
+    channel = client.get_channel(delivery.channel_id) or client.get_partial_messageable(
+        delivery.channel_id, guild_id=delivery.guild_id
+    )
+    allowed = discord.AllowedMentions(everyone=False, roles=False, users=True)
+    users = delivery.user_ids
+    for start in range(0, len(users), MENTIONS_PER_MESSAGE):
+        mentions = " ".join(f"<@{user_id}>" for user_id in users[start:start + MENTIONS_PER_MESSAGE])
+        try:
+            async with scheduler.slot(Priority.REFRESH):
+                await channel.send(f"{delivery.text}\n{mentions}", allowed_mentions=allowed)
+        except (discord.NotFound, discord.Forbidden):
+            print(f"Dropping reminders for channel {delivery.channel_id}: it is gone or closed to the bot")
+            remove_channel(delivery.channel_id)
+            return
+        except Exception as exc:
+            # HTTP errors, and network errors discord.py lets through
+            print(f"Reminder to channel {delivery.channel_id} failed: {exc!r}")
+
+
+async def pace_dm() -> None:
+    global next_dm_at
+    now = clock.now()
+    wait = next_dm_at - now
+    next_dm_at = max(now, next_dm_at) + 1 / config.REMINDER_DM_RATE
+    if wait > 0:
+        await clock.sleep(wait)
+
+
+async def send_dms(delivery: Delivery) -> None:
+    pending = iter(delivery.user_ids)
+
+    async def worker() -> None:
+        for user_id in pending:
+            await pace_dm()
+            try:
+                async with scheduler.slot(Priority.REFRESH):
+                    channel = await core.client.create_dm(discord.Object(id=user_id))
+                    await channel.send(delivery.text)
+            except discord.Forbidden:
+                remove_user_dms(user_id)
+            except Exception as exc:
+                print(f"Reminder DM to {user_id} failed: {exc!r}")
+
+    await asyncio.gather(*(worker() for _ in range(min(DM_WORKERS, len(delivery.user_ids)))))
+
+
+async def dispatch_loop(queue: deque[Delivery], ready: asyncio.Event) -> None:
+    """Send one queue's deliveries in order; mentions and DMs each have a loop."""
+    while True:
+        while not queue:
+            ready.clear()
+            await ready.wait()
+        delivery = queue.popleft()
+        if not lease.holds():
+            # Only the lease holder sends reminders
+            continue
+        try:
+            if delivery.channel_id == DM:
+                await send_dms(delivery)
+            else:
+                await send_mentions(delivery)
+        except Exception as exc:
+            print(f"Reminder delivery to {delivery.channel_id or 'DMs'} failed: {exc!r}")
+
+
+def build_snapshot() -> dict:
+    return {
+        "subscriptions": [
+            [target, minutes, channel_id, users.tolist()]
+            for (target, minutes), channels in subscriptions.items()
+            for channel_id, users in channels.items()
+        ]
+    }
+
+
+def write_snapshot(path: str, data: dict) -> None:
+    if not lease.holds():
+        return
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+    except OSError as exc:
+        print(f"Failed to save {path}: {exc!r}")
+
+
+def load_subscriptions() -> None:
+    path = config.REMINDERS_FILE
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return
+    except (OSError, ValueError) as exc:
+        print(f"Ignoring unreadable reminders file {path}: {exc!r}")
+        return
+    subscriptions.clear()
+    entries = data.get("subscriptions") if isinstance(data, dict) else None
+    for entry in entries if isinstance(entries, list) else []:
+        if not (isinstance(entry, list) and len(entry) == 4):
+            continue
+        target, minutes, channel_id, users = entry
+        if not (isinstance(target, str) and isinstance(minutes, int) and isinstance(channel_id, int)
+                and isinstance(users, list)):
+            continue
+        user_ids = sorted({user_id for user_id in users if isinstance(user_id, int) and user_id > 0})
+        if user_ids:
+            subscriptions.setdefault((target, minutes), {})[channel_id] = array("Q", user_ids)
+    print(f"Loaded {subscription_count()} reminder subscription(s)")
+
+
+async def save_loop() -> None:
+    global dirty
+    while True:
+        await asyncio.sleep(SAVE_INTERVAL)
+        if dirty:
+            dirty = False
+            await asyncio.to_thread(write_snapshot, config.REMINDERS_FILE, build_snapshot())
+
+
+def start_reminders() -> None:
+    """Load subscriptions and start firing them; only the first call does anything."""
+    global reminder_task, mention_task, dm_task, save_task, plan_changed, mention_ready, dm_ready, fired_through
+    if reminder_task is not None:
+        return
+    load_subscriptions()
+    plan_changed = asyncio.Event()
+    mention_ready = asyncio.Event()
+    dm_ready = asyncio.Event()
+    fired_through = clock.now()
+    invalidate()
+    loop = asyncio.get_running_loop()
+    reminder_task = loop.create_task(reminder_loop())
+    mention_task = loop.create_task(dispatch_loop(mention_deliveries, mention_ready))
+    dm_task = loop.create_task(dispatch_loop(dm_deliveries, dm_ready))
+    save_task = loop.create_task(save_loop())
+
+
+def save_on_shutdown() -> None:
+    if save_task is not None:
+        for task in (reminder_task, mention_task, dm_task, save_task):
+            task.cancel()
+        if dirty:
+            write_snapshot(config.REMINDERS_FILE, build_snapshot())
@@ -0,0 +1,365 @@
+"""Embed rendering for status and event panels."""
+from typing import Optional
+
+import discord
+
+from . import clock
+from .catalog import (
+    ENDING_SOON,
+    EVENT_TYPE_CONFIG,
+    OVERVIEW_GROUPS,
+    RECURRENCE_PERIODS,
+    STARTING_SOON,
+    EventRecord,
+    get_active_events,
+    get_events_by_type,
+    next_event_transition,
+)
+from .locales import ENGLISH, get_strings
+from .storage import downtime_schedules, get_guild_settings
+from .timeutil import format_remaining
+
+# Theme (Infinity Nikki)
+ONLINE_COLOR = discord.Color.from_rgb(255, 173, 216)  # #ffadd8
+MAINT_COLOR = discord.Color.from_rgb(255, 122, 184)   # deeper pink
+HEART_EMOJI = "\U0001F497"  # sparkling heart
+ONLINE_EMOJI = "\U0001F495"  # two hearts
+MAINT_EMOJI = "\U0001F49D"   # heart with ribbon
+TIME_EMOJI = "\U0001F49E"    # revolving hearts
+# Queued windows listed after the current/next one in the detailed status view
+UPCOMING_WINDOWS_SHOWN = 3
+
+# (guild_id, full) -> (valid until, embed). An entry lasts until its text would
+# change: the next window start/end, the next countdown minute (full view),
+# or invalidate_status_cache() after a schedule or settings change.
+_status_cache: dict[tuple[int, bool], tuple[float, discord.Embed]] = {}
+
+# Discord rejects an embed past these (characters)
+EMBED_DESCRIPTION_LIMIT = 4096
+EMBED_TOTAL_LIMIT = 6000
+# Room kept in the footer for " • Page N/M"
+PAGE_FOOTER_RESERVE = 24
+EVENT_SEPARATOR = "\n\n──────────────────────\n\n"
+# Page set key of the all events embed (the others are keyed by event type)
+ALL_EVENTS = "all"
+
+# Page set key -> (active events it was built from, valid until, pages). An
+# entry lasts until the next event transition, when the statuses it shows
+# change, or until the active list is rebuilt (an event ended or the
+# catalog was reloaded). Paging through a panel is then a list lookup.
+_event_pages: dict[str, tuple[list[EventRecord], int, list[discord.Embed]]] = {}
+
+# Built on first use: event type -> discord.Color
+_type_colors: Optional[dict[str, discord.Color]] = None
+
+
+def get_type_color(event_type: str) -> discord.Color:
+    global _type_colors
+    if _type_colors is None:
+        _type_colors = {
+            key: discord.Color.from_rgb(*config["color"]) for key, config in EVENT_TYPE_CONFIG.items()
+        }
+    return _type_colors.get(event_type) or discord.Color.blurple()
+
+
+def invalidate_status_cache(guild_id: Optional[int] = None) -> None:
+    if guild_id is None:
+        _status_cache.clear()
+        return
+    _status_cache.pop((guild_id, False), None)
+    _status_cache.pop((guild_id, True), None)
+
+
+def get_window_title(window: dict, strings: dict[str, str]) -> str:
+    # Windows saved with the default English title show the localized one
+    title = window["title"]
+    if not title or title == ENGLISH["default_title"]:
+        return strings["default_title"]
+    return title
+
+
+def get_status_embed(guild_id: Optional[int], full: bool = False) -> discord.Embed:
+    """Build status embed. full=True for detailed view, False for panel.
+
+    Embeds are shared from the cache; callers must not modify them.
+    """
+    now = clock.now()
+    key = (guild_id, full)
+    cached = _status_cache.get(key)
+    if cached and now < cached[0]:
+        return cached[1]
+    embed, valid_until = build_status_embed(guild_id, full, now)
+    if guild_id:
+        _status_cache[key] = (valid_until, embed)
+    return embed
+
+
+def build_status_embed(guild_id: Optional[int], full: bool, now: float) -> tuple[discord.Embed, float]:
+    """The status embed in the guild's locale and theme, and until when it stays accurate."""
+    settings = get_guild_settings(guild_id)
+    strings = get_strings(settings.locale)
+    online_emoji = settings.online_emoji or ONLINE_EMOJI
+    maint_emoji = settings.maint_emoji or MAINT_EMOJI
+    online_color = discord.Color.from_rgb(*settings.online_color) if settings.online_color else ONLINE_COLOR
+    maint_color = discord.Color.from_rgb(*settings.maint_color) if settings.maint_color else MAINT_COLOR
+
+    schedule = downtime_schedules.get(guild_id) if guild_id else None
+    # Current or next window; otherwise the most recent one that already ended
+    downtime = None
+    if schedule:
+        downtime = schedule.find(now) or schedule.last_ended(now)
+
+    if not downtime:
+        embed = discord.Embed(
+            title=f"{online_emoji} {strings['status_title']}",
+            description=strings["no_maintenance"],
+            color=online_color
+        )
+        return embed, float("inf")
+
+    start_ts = downtime["start"]
+    end_ts = downtime["end"]
+    title = get_window_title(downtime, strings)
+    units = (strings["hour"], strings["hours"], strings["minute"], strings["minutes"])
+    valid_until = schedule.next_transition(now) or float("inf")
+
+    if full and now < end_ts:
+        # The countdown text changes once a minute
+        seconds_left = int(end_ts - now)
+        valid_until = min(valid_until, end_ts - (seconds_left // 60) * 60 + 1)
+
+    if now < start_ts:
+        status = f"{online_emoji} {strings['online']}"
+        color = online_color
+        remaining = format_remaining(int(end_ts - now), units)
+        details = "\n".join([
+            strings["upcoming_heading"].format(title=title) + "\n",
+            f"{TIME_EMOJI} " + strings["back_online_in"].format(remaining=remaining),
+            f"{TIME_EMOJI} " + strings["downtime_begins"].format(when=f"<t:{start_ts}:R>"),
+            f"{TIME_EMOJI} " + strings["start"].format(when=f"<t:{start_ts}:f>"),
+            f"{TIME_EMOJI} " + strings["end"].format(when=f"<t:{end_ts}:f>"),
+        ]) if full else strings["panel_scheduled"].format(when=f"<t:{start_ts}:R>")
+    elif now < end_ts:
+        status = f"{maint_emoji} {strings['maintenance']}"
+        color = maint_color
+        remaining = format_remaining(int(end_ts - now), units)
+        details = "\n".join([
+            f"**{title}**\n",
+            f"{TIME_EMOJI} " + strings["back_online_in"].format(remaining=remaining),
+            f"{TIME_EMOJI} " + strings["maintenance_ends"].format(when=f"<t:{end_ts}:f>"),
+        ]) if full else strings["panel_back_online"].format(when=f"<t:{end_ts}:R>")
+    else:
+        status = f"{online_emoji} {strings['online']}"
+        color = online_color
+        details = strings["complete"] if full else strings["operational"]
+
+    if full:
+        later = schedule.upcoming(now, UPCOMING_WINDOWS_SHOWN)
+        if later:
+            lines = [f"• {get_window_title(w, strings)}: <t:{w['start']}:f> - <t:{w['end']}:t>" for w in later]
+            details += f"\n\n{strings['also_scheduled']}\n" + "\n".join(lines)
+
+    embed = discord.Embed(
+        title=f"{status}",
+        description=details,
+        color=color
+    )
+
+    if not full:
+        embed.set_footer(text=strings["panel_footer"])
+    else:
+        embed.set_footer(text=strings["local_times_footer"])
+
+    return embed, valid_until
+
+
+def get_event_status(start_ts: int, end_ts: int, now_ts: int) -> str:
+    """Determine event status indicator based on timestamps."""
+    if now_ts < start_ts:
+        time_until = start_ts - now_ts
+        if time_until <= STARTING_SOON:
+            return "🟡 Starting Soon"
+        return "🔵 Upcoming"
+    elif now_ts < end_ts:
+        time_remaining = end_ts - now_ts
+        if time_remaining <= ENDING_SOON:
+            return "🟠 Ending Soon"
+        return "🟢 Active"
+    else:
+        return "⚫ Ended"
+
+
+def format_event_entry(event: EventRecord, now_ts: int) -> str:
+    """Format a single event entry for embed description."""
+    status = get_event_status(event.start, event.end, now_ts)
+    start_ts = event.start
+    end_ts = event.end
+
+    # Show appropriate timestamp based on status
+    if event.recurrence:
+        # Expanded occurrence of a recurring reset - only the reset time matters
+        when = f"Next reset: <t:{start_ts}:R> • <t:{start_ts}:F>"
+    elif now_ts < start_ts:
+        # Upcoming - show when it starts
+        when = f"Starts: <t:{start_ts}:R> • <t:{start_ts}:F>\nEnds: <t:{end_ts}:F>"
+    else:
+        # Active - show when it ends
+        when = f"Ends: <t:{end_ts}:R> • <t:{end_ts}:F>"
+
+    return f"**{status}: {event.name}**\n{when}\n{event.details}"
+
+
+def paginate(chunks: list[str], separator: str, limit: int) -> list[str]:
+    """Join chunks in order into as few texts of at most limit characters as
+    possible. A chunk too long on its own is cut short."""
+    pages: list[str] = []
+    current: list[str] = []
+    length = 0
+    for chunk in chunks:
+        if len(chunk) > limit:
+            chunk = chunk[:limit - 1] + "…"
+        if current and length + len(separator) + len(chunk) > limit:
+            pages.append(separator.join(current))
+            current, length = [], 0
+        length += len(chunk) + (len(separator) if current else 0)
+        current.append(chunk)
+    if current:
+        pages.append(separator.join(current))
+    return pages
+
+
+def get_description_limit(title: str, footer: str) -> int:
+    return min(EMBED_DESCRIPTION_LIMIT, EMBED_TOTAL_LIMIT - len(title) - len(footer) - PAGE_FOOTER_RESERVE)
+
+
+def build_pages(title: str, footer: str, color: discord.Color, descriptions: list[str]) -> list[discord.Embed]:
+    pages = []
+    for number, description in enumerate(descriptions, 1):
+        embed = discord.Embed(title=title, description=description, color=color)
+        page_footer = footer if len(descriptions) == 1 else f"{footer} • Page {number}/{len(descriptions)}"
+        embed.set_footer(text=page_footer)
+        pages.append(embed)
+    return pages
+
+
+def build_event_pages(event_type: str, now_ts: int) -> list[discord.Embed]:
+    """Pages of one event type's active/upcoming events."""
+    config = EVENT_TYPE_CONFIG.get(event_type)
+    if not config:
+        # Fallback if unknown type
+        config = {"emoji": "📌", "display_name": "Event"}
+
+    events = get_events_by_type(event_type, now_ts)
+    display_name = config["display_name"]
+    title = f"{config['emoji']} {display_name}s"
+    footer = "Infinity Nikki - Event Calendar"
+
+    if not events:
+        descriptions = [f"No active or upcoming {display_name.lower()}s at this time.\n\nCheck back later for new events!"]
+    else:
+        entries = [format_event_entry(event, now_ts) for event in events]
+        descriptions = paginate(entries, EVENT_SEPARATOR, get_description_limit(title, footer))
+    return build_pages(title, footer, get_type_color(event_type), descriptions)
+
+
+def build_all_events_pages(now_ts: int) -> list[discord.Embed]:
+    """Pages of every active/upcoming event, in a section per type."""
+    title = "📅 All Events"
+    all_events = get_active_events(now_ts)
+
+    if not all_events:
+        footer = "Infinity Nikki - Event Calendar"
+        description = "No active or upcoming events at this time.\n\nCheck back later!"
+        return build_pages(title, footer, discord.Color.blurple(), [description])
+
+    footer = "Infinity Nikki - Event Calendar • Use /eventpanel to post detailed panels"
+    limit = get_description_limit(title, footer)
+
+    # Group by type (all_events is sorted by start, so each group is too)
+    by_type: dict[str, list[EventRecord]] = {}
+    for event in all_events:
+        by_type.setdefault(event.type, []).append(event)
+
+    # Sections per type; a section too long for one page continues under its heading on the next
+    sections = []
+    for event_type, events in sorted(by_type.items()):
+        config = EVENT_TYPE_CONFIG.get(event_type, {"emoji": "📌", "display_name": "Event"})
+        heading = f"**{config['emoji']} {config['display_name']}s**"
+
+        section_lines = []
+        for event in events:
+            status = get_event_status(event.start, event.end, now_ts)
+            if event.recurrence:
+                section_lines.append(f"{status}: {event.name} • Next <t:{event.start}:R>")
+            else:
+                section_lines.append(f"{status}: {event.name} • Ends <t:{event.end}:R>")
+
+        for part in paginate(section_lines, "\n", limit - len(heading) - 1):
+            sections.append(f"{heading}\n{part}")
+
+    descriptions = paginate(sections, "\n\n", limit)
+    return build_pages(title, footer, discord.Color.from_rgb(255, 200, 220), descriptions)
+
+
+def get_event_pages(key: str) -> list[discord.Embed]:
+    """Every page of an event type's embed, or of the all events embed for
+    ALL_EVENTS. Callers must not modify them."""
+    now_ts = clock.now_ts()
+    events = get_active_events(now_ts)
+    cached = _event_pages.get(key)
+    if cached and cached[0] is events and now_ts < cached[1]:
+        return cached[2]
+    pages = build_all_events_pages(now_ts) if key == ALL_EVENTS else build_event_pages(key, now_ts)
+    # With no transition ahead, recheck daily like the active list does
+    valid_until = next_event_transition(now_ts) or now_ts + RECURRENCE_PERIODS["daily"]
+    _event_pages[key] = (events, valid_until, pages)
+    return pages
+
+
+def get_event_embed(event_type: str, guild_id: Optional[int] = None, page: int = 0) -> discord.Embed:
+    """Build embed for a specific event type showing all active/upcoming events."""
+    pages = get_event_pages(event_type)
+    return pages[min(page, len(pages) - 1)]
+
+
+def get_all_events_embed(event_type_filter: Optional[str] = None, page: int = 0) -> discord.Embed:
+    """Build embed showing all active/upcoming events, optionally filtered by type."""
+    pages = get_event_pages(event_type_filter or ALL_EVENTS)
+    return pages[min(page, len(pages) - 1)]
+
+
+def get_overview_embed() -> discord.Embed:
+    """Build compact overview embed showing all events grouped by category."""
+    now_ts = clock.now_ts()
+    all_events = get_active_events(now_ts)
+
+    if not all_events:
+        embed = discord.Embed(
+            title="📅 Event Overview",
+            description="No active or upcoming events at this time.\n\nCheck back later!",
+            color=discord.Color.blurple()
+        )
+        embed.set_footer(text="Infinity Nikki - Event Calendar")
+        return embed
+
+    # Compact lines are prebuilt per event; only the grouping happens here
+    groups: list[list[str]] = [[] for _ in OVERVIEW_GROUPS]
+    for event in all_events:
+        if event.overview_group >= 0:
+            groups[event.overview_group].append(event.compact_line)
+
+    sections = []
+    for (heading, _), lines in zip(OVERVIEW_GROUPS, groups):
+        if lines:
+            sections.append(f"**{heading} ({len(lines)})**\n" + "\n".join(lines))
+
+    description = "\n\n".join(sections)
+
+    embed = discord.Embed(
+        title="📅 Event Overview",
+        description=description,
+        color=discord.Color.from_rgb(255, 200, 220)
+    )
+    embed.set_footer(text="Infinity Nikki - Event Calendar • Use /events for detailed info")
+
+    return embed
@@ -0,0 +1,540 @@
+"""Posting panels, refreshing them after state changes and at schedule transitions."""
+import asyncio
+from typing import Awaitable, Callable, Iterable, Optional
+
+import discord
+
+from . import catalog, checks, clock, config, core, lease, reminders, storage, warmstart
+from .datafile import file_stat
+from .outbound import Priority, scheduler
+from .rendering import get_event_pages, get_status_embed, invalidate_status_cache
+from .storage import (
+    add_event_panel,
+    add_panel,
+    downtime_schedules,
+    event_panel_messages,
+    get_guild_settings,
+    panel_messages,
+    panels_by_message,
+    remove_channel_panels,
+    merge_state,
+    read_state,
+    remove_panels,
+    save_data,
+)
+from .views import StatusPanel, get_event_page_view
+
+# Longest the refresh loop sleeps before re-checking schedules (seconds)
+REFRESH_MAX_SLEEP = 3600
+# Seconds the refresh loop waits after an unexpected error before trying again
+REFRESH_ERROR_RETRY = 30
+
+# Stale panel sweep: first run after startup, then every SWEEP_INTERVAL, with
+# SWEEP_REQUEST_GAP between its API calls so it never competes with refreshes
+SWEEP_STARTUP_DELAY = 300
+SWEEP_INTERVAL = 6 * 3600
+SWEEP_REQUEST_GAP = 2.0
+
+# Rate limit buckets whose panels are edited at once. Message edits are rate
+# limited per channel (per webhook for webhook messages), so each bucket's
+# panels go one at a time and only different buckets run in parallel;
+# discord.py waits out any 429s. With an adaptive class (REFRESH_MAX_CONCURRENCY)
+# up to that many buckets are worked on, and outbound.scheduler decides how
+# many edits are in flight.
+REFRESH_CONCURRENCY = 8
+
+# How often the bot checks DATA_FILE and CATALOG_FILE for edits made by admin.py (seconds)
+WATCH_INTERVAL = 5.0
+
+refresh_task: Optional[asyncio.Task] = None
+watch_task: Optional[asyncio.Task] = None
+sweep_task: Optional[asyncio.Task] = None
+# Set when a schedule changes so the refresh loop recomputes its next wake-up
+schedule_changed: Optional[asyncio.Event] = None
+
+
+# Name of the webhooks created for PANEL_DELIVERY=webhook
+WEBHOOK_NAME = "Status Panels"
+
+# Discord error code for a webhook that no longer exists
+UNKNOWN_WEBHOOK = 10015
+
+# Webhook objects by ID; rebuilt from the registry's token after a restart
+webhook_clients: dict[int, discord.Webhook] = {}
+
+
+def get_webhook(webhook_id: int) -> Optional[discord.Webhook]:
+    webhook = webhook_clients.get(webhook_id)
+    if webhook is None:
+        entry = storage.panel_webhooks.get(webhook_id)
+        if entry is None:
+            return None
+        # Attaching the client's state lets webhook messages carry the persistent view
+        webhook = discord.Webhook.partial(webhook_id, entry["token"], client=core.client)
+        webhook_clients[webhook_id] = webhook
+    return webhook
+
+
+async def get_channel_webhook(channel: discord.abc.Messageable, guild_id: int) -> Optional[discord.Webhook]:
+    """The channel's panel webhook, created on first use; None to post as the bot."""
+    if config.PANEL_DELIVERY != "webhook":
+        return None
+    webhook_id = storage.webhooks_by_channel.get(channel.id)
+    if webhook_id is not None:
+        return get_webhook(webhook_id)
+    if not hasattr(channel, "create_webhook"):
+        # Threads and DMs have no webhooks of their own
+        return None
+    try:
+        webhook = await channel.create_webhook(name=WEBHOOK_NAME, reason="Status panel delivery")
+    except discord.HTTPException as exc:
+        # Usually a missing Manage Webhooks permission
+        print(f"Could not create a panel webhook in channel {channel.id}: {exc}")
+        return None
+    storage.add_webhook({"webhook_id": webhook.id, "channel_id": channel.id, "guild_id": guild_id, "token": webhook.token})
+    webhook_clients[webhook.id] = webhook
+    return webhook
+
+
+async def send_panel(channel: discord.abc.Messageable, guild_id: int, **kwargs) -> dict:
+    """Post a panel message; returns the panel entry to store."""
+    webhook = await get_channel_webhook(channel, guild_id)
+    if webhook is None:
+        message = await channel.send(**kwargs)
+        item = {"channel_id": message.channel.id, "message_id": message.id, "guild_id": guild_id}
+    else:
+        user = core.client.user
+        message = await webhook.send(wait=True, username=user.name, avatar_url=user.display_avatar.url, **kwargs)
+        item = {"channel_id": channel.id, "message_id": message.id, "guild_id": guild_id, "webhook_id": webhook.id}
+    warmstart.remember_content(message.id, warmstart.content_hash(kwargs))
+    return item
+
+
+async def post_panel_message(channel: discord.abc.Messageable, guild_id: int) -> None:
+    embed = get_status_embed(guild_id, full=False)
+    add_panel(await send_panel(channel, guild_id, embed=embed, view=StatusPanel(get_guild_settings(guild_id).locale)))
+    save_data()
+
+
+class RefreshProgress:
+    """Counters a refresh updates as it goes, for progress reports."""
+
+    def __init__(self, total: int = 0):
+        self.total = total
+        self.done = 0
+        self.removed = 0
+        # Edits that failed for a reason other than the panel being gone; those panels are kept
+        self.failed = 0
+        self.last_error: Optional[Exception] = None
+
+
+def render_event_panel(event_type: str) -> dict:
+    """An event panel shows the first page, with buttons to the others when there are more.
+
+    With one page the view is None, which also clears the buttons of a panel
+    whose events fit on one page again.
+    """
+    pages = get_event_pages(event_type)
+    return {"embed": pages[0], "view": get_event_page_view(event_type, 0, len(pages))}
+
+
+def render_panel(item: dict, panel_views: dict[str, StatusPanel]) -> dict:
+    """Keyword arguments that edit a panel to its current content."""
+    if "event_type" in item:
+        return render_event_panel(str(item["event_type"]))
+    locale = get_guild_settings(item["guild_id"]).locale
+    if locale not in panel_views:
+        # One view per locale, reused across panels
+        panel_views[locale] = StatusPanel(locale)
+    return {"embed": get_status_embed(item["guild_id"], full=False), "view": panel_views[locale]}
+
+
+async def edit_panels(
+    edit: Callable[..., Awaitable[None]],
+    items: list[dict],
+    panel_views: dict[str, StatusPanel],
+    stale: list[dict],
+    progress: RefreshProgress,
+    priority: Priority,
+) -> None:
+    """Edit panels that share one rate limit bucket, one after another.
+
+    Panels already showing the rendered content (per warmstart's hashes) are
+    skipped. Only NotFound marks a panel stale; other failures keep it for the
+    next refresh.
+    """
+    for item in items:
+        if not lease.holds():
+            # The standby owns the panels now
+            return
+        message_id = item["message_id"]
+        try:
+            content = render_panel(item, panel_views)
+            digest = warmstart.content_hash(content)
+            if not warmstart.content_unchanged(message_id, digest):
+                warmstart.begin_edit(message_id)
+                async with scheduler.slot(priority):
+                    await edit(message_id, **content)
+                warmstart.remember_content(message_id, digest)
+        except discord.NotFound:
+            stale.append(item)
+        except Exception as exc:
+            progress.failed += 1
+            progress.last_error = exc
+        progress.done += 1
+
+
+async def refresh_channel_panels(
+    channel_id: int,
+    items: list[dict],
+    panel_views: dict[str, StatusPanel],
+    stale: list[dict],
+    progress: RefreshProgress,
+    priority: Priority,
+) -> None:
+    """Edit the bot's own panels in one channel."""
+    try:
+        channel = core.client.get_channel(channel_id)
+        if channel is None:
+            channel = warmstart.get_partial_channel(core.client, channel_id, items[0]["guild_id"])
+        if channel is None:
+            async with scheduler.slot(priority):
+                channel = await core.client.fetch_channel(channel_id)
+            warmstart.remember_channel(channel)
+    except discord.NotFound:
+        channel = None
+    except Exception as exc:
+        # Outage or missing access: the channel's panels wait for the next refresh
+        progress.failed += len(items)
+        progress.last_error = exc
+        progress.done += len(items)
+        return
+    if not hasattr(channel, "get_partial_message"):
+        stale.extend(items)
+        progress.done += len(items)
+        return
+
+    async def edit(message_id: int, **kwargs) -> None:
+        # Edit by ID without fetching first; a deleted message fails the edit instead
+        await channel.get_partial_message(message_id).edit(**kwargs)
+
+    await edit_panels(edit, items, panel_views, stale, progress, priority)
+
+
+async def refresh_webhook_panels(
+    webhook_id: int,
+    items: list[dict],
+    panel_views: dict[str, StatusPanel],
+    stale: list[dict],
+    progress: RefreshProgress,
+    priority: Priority,
+) -> None:
+    """Edit panels posted through one webhook; no channel lookup needed."""
+    webhook = get_webhook(webhook_id)
+    if webhook is None:
+        stale.extend(items)
+        progress.done += len(items)
+        return
+
+    async def edit(message_id: int, **kwargs) -> None:
+        try:
+            await webhook.edit_message(message_id, **kwargs)
+        except discord.NotFound as exc:
+            if exc.code == UNKNOWN_WEBHOOK and storage.remove_webhooks([webhook_id]):
+                webhook_clients.pop(webhook_id, None)
+            raise
+
+    await edit_panels(edit, items, panel_views, stale, progress, priority)
+
+
+async def refresh_panels(
+    items: list[dict],
+    progress: Optional[RefreshProgress] = None,
+    priority: Priority = Priority.REFRESH,
+) -> int:
+    """Edit the given status and event panels, REFRESH_CONCURRENCY buckets at a time
+    (or up to REFRESH_MAX_CONCURRENCY when the class adapts).
+
+    Panels are grouped by the rate limit bucket their edits share: the
+    channel for the bot's own messages, the webhook for webhook messages.
+    Each edit waits for a slot of the given class in outbound.scheduler, so
+    edits a command triggers go ahead of scheduled refreshes.
+    Returns how many were dropped as stale: only panels whose message, channel
+    or webhook is gone (NotFound), as in sweep_panels.
+    """
+    if progress is None:
+        progress = RefreshProgress()
+    progress.total = len(items)
+    stale: list[dict] = []
+    by_bucket: dict[tuple[str, int], list[dict]] = {}
+    for item in items:
+        if not item.get("channel_id") or not item.get("message_id") or not item.get("guild_id"):
+            stale.append(item)
+            progress.done += 1
+            continue
+        if item.get("webhook_id"):
+            by_bucket.setdefault(("webhook", item["webhook_id"]), []).append(item)
+        else:
+            by_bucket.setdefault(("channel", item["channel_id"]), []).append(item)
+
+    panel_views: dict[str, StatusPanel] = {}
+    pending = list(by_bucket.items())
+
+    async def worker() -> None:
+        while pending:
+            (kind, bucket_id), bucket_items = pending.pop()
+            refresh = refresh_webhook_panels if kind == "webhook" else refresh_channel_panels
+            await refresh(bucket_id, bucket_items, panel_views, stale, progress, priority)
+
+    # One instant for the whole pass, so no two panels disagree about what is active
+    workers = REFRESH_CONCURRENCY
+    if scheduler.adaptive_limit(priority) is not None:
+        # Enough buckets under way for the adaptive limit to reach its maximum
+        workers = max(workers, config.REFRESH_MAX_CONCURRENCY)
+    with clock.pinned():
+        await asyncio.gather(*(worker() for _ in range(min(workers, len(pending)))))
+    if progress.failed:
+        print(f"Failed to refresh {progress.failed} panel(s), kept for the next refresh: {progress.last_error!r}")
+    if stale and lease.holds():
+        progress.removed = remove_panels(item.get("message_id") for item in stale)
+        save_data()
+    return progress.removed
+
+
+async def update_panels(
+    target_guild_id: Optional[int] = None,
+    progress: Optional[RefreshProgress] = None,
+    priority: Priority = Priority.REFRESH,
+) -> None:
+    if not panel_messages:
+        return
+    items = [item for item in panel_messages if not target_guild_id or item.get("guild_id") == target_guild_id]
+    await refresh_panels(items, progress, priority)
+
+
+async def update_guilds_panels(
+    guild_ids: Iterable[int],
+    progress: Optional[RefreshProgress] = None,
+    priority: Priority = Priority.REFRESH,
+) -> None:
+    """Refresh the status panels of several guilds in one pass."""
+    guild_ids = set(guild_ids)
+    items = [item for item in panel_messages if item.get("guild_id") in guild_ids]
+    await refresh_panels(items, progress, priority)
+
+
+async def post_event_panel_message(channel: discord.abc.Messageable, guild_id: int, event_type: str) -> None:
+    """Post an event panel for a specific event type."""
+    content = render_event_panel(event_type)
+    if content["view"] is None:
+        del content["view"]
+    item = await send_panel(channel, guild_id, **content)
+    item["event_type"] = event_type
+    add_event_panel(item)
+    save_data()
+
+
+async def update_event_panels(
+    target_guild_id: Optional[int] = None, priority: Priority = Priority.REFRESH
+) -> None:
+    """Update all event panels with current event data."""
+    if not event_panel_messages:
+        return
+    items = [item for item in event_panel_messages if not target_guild_id or item.get("guild_id") == target_guild_id]
+    await refresh_panels(items, priority=priority)
+
+
+def notify_schedule_changed(guild_id: int) -> None:
+    """Call after editing a guild's schedule or settings, before refreshing its panels."""
+    invalidate_status_cache(guild_id)
+    reminders.invalidate()
+    if schedule_changed is not None:
+        schedule_changed.set()
+
+
+def get_next_transition(now: float) -> tuple[Optional[int], list[int]]:
+    """Earliest upcoming window start/end across guilds, and the guilds it affects."""
+    next_ts: Optional[int] = None
+    guild_ids: list[int] = []
+    for guild_id, schedule in downtime_schedules.items():
+        ts = schedule.next_transition(now)
+        if ts is None:
+            continue
+        if next_ts is None or ts < next_ts:
+            next_ts, guild_ids = ts, [guild_id]
+        elif ts == next_ts:
+            guild_ids.append(guild_id)
+    return next_ts, guild_ids
+
+
+def compact_schedules(now: float) -> list[int]:
+    """Drop old windows from every schedule; returns guilds that changed."""
+    changed = [guild_id for guild_id, schedule in downtime_schedules.items() if schedule.compact(now)]
+    for guild_id in changed:
+        if not downtime_schedules[guild_id]:
+            del downtime_schedules[guild_id]
+    return changed
+
+
+async def refresh_loop() -> None:
+    """Refresh panels whose text changes with time alone.
+
+    A guild's status panels when one of its downtime windows starts or ends;
+    event panels when an event starts, ends, or becomes starting or ending soon.
+    After an unexpected error the loop logs it, waits REFRESH_ERROR_RETRY and
+    refreshes every panel once, since a transition may have been missed
+    (warmstart's hashes skip the ones already up to date).
+    """
+    recovering = False
+    while True:
+        try:
+            if recovering:
+                await update_panels()
+                await update_event_panels()
+                recovering = False
+
+            now = clock.now()
+            compacted = compact_schedules(now)
+            if compacted:
+                save_data()
+                for guild_id in compacted:
+                    invalidate_status_cache(guild_id)
+                await update_guilds_panels(compacted)
+
+            next_ts, guild_ids = get_next_transition(now)
+            event_ts = catalog.next_event_transition(int(now))
+            wake_ts = min((ts for ts in (next_ts, event_ts) if ts is not None), default=None)
+            timeout = REFRESH_MAX_SLEEP if wake_ts is None else min(max(0.0, wake_ts - now), REFRESH_MAX_SLEEP)
+            schedule_changed.clear()
+            if await clock.wait(schedule_changed, timeout):
+                continue
+
+            now = clock.now()
+            if next_ts is not None and now >= next_ts:
+                await update_guilds_panels(guild_ids)
+            if event_ts is not None and now >= event_ts:
+                await update_event_panels()
+        except Exception as exc:
+            print(f"Refresh loop error: {exc!r}")
+            recovering = True
+            await clock.sleep(REFRESH_ERROR_RETRY)
+
+
+def start_refresh_loop() -> None:
+    global refresh_task, schedule_changed
+    if refresh_task is not None:
+        return
+    schedule_changed = asyncio.Event()
+    refresh_task = asyncio.get_running_loop().create_task(refresh_loop())
+
+
+async def sweep_panels() -> int:
+    """Evict panels whose guild, channel or message is gone. Returns how many.
+
+    Gateway delete events normally evict panels as they happen; this catches
+    deletions made while the bot was offline. Guild checks use the cache, and
+    only NotFound evicts, so outages and missing permissions keep panels.
+    Only the lease holder sweeps.
+    """
+    removed = 0
+    for item in list(panel_messages) + list(event_panel_messages):
+        if not lease.holds():
+            # The standby owns the panels now
+            break
+        message_id = item["message_id"]
+        channel_id = item["channel_id"]
+        if message_id not in panels_by_message:
+            # Already evicted with its channel earlier in this sweep
+            continue
+        if core.client.get_guild(item["guild_id"]) is None:
+            removed += remove_panels([message_id])
+            continue
+        try:
+            channel = core.client.get_channel(channel_id)
+            if channel is None:
+                async with scheduler.slot(Priority.HOUSEKEEPING):
+                    channel = await core.client.fetch_channel(channel_id)
+        except discord.NotFound:
+            removed += remove_channel_panels(channel_id)
+            continue
+        except Exception:
+            # Outages, timeouts and missing access keep the channel's panels
+            continue
+        try:
+            async with scheduler.slot(Priority.HOUSEKEEPING):
+                await channel.fetch_message(message_id)
+        except discord.NotFound:
+            removed += remove_panels([message_id])
+        except Exception:
+            pass
+        await asyncio.sleep(SWEEP_REQUEST_GAP)
+    if removed and lease.holds():
+        save_data()
+    return removed
+
+
+async def sweep_loop() -> None:
+    await asyncio.sleep(SWEEP_STARTUP_DELAY)
+    while True:
+        try:
+            removed = await sweep_panels()
+            if removed:
+                print(f"Panel sweep removed {removed} stale panel(s)")
+        except Exception as exc:
+            print(f"Panel sweep error: {exc!r}")
+        await asyncio.sleep(SWEEP_INTERVAL)
+
+
+def start_sweep_loop() -> None:
+    global sweep_task
+    if sweep_task is None:
+        sweep_task = asyncio.get_running_loop().create_task(sweep_loop())
+
+
+async def reload_changed_files() -> None:
+    """Apply edits other processes made to DATA_FILE or CATALOG_FILE.
+
+    The file is parsed on a worker thread; only guilds whose schedule or
+    settings changed get their panels refreshed. If the bot saves first, the
+    writer merges the edits into its save (storage.merge_outside_edits) and
+    the merged file is read here on a later pass.
+    """
+    if catalog.load_catalog():
+        print(f"Reloaded catalog from {config.CATALOG_FILE}")
+        reminders.invalidate()
+        await update_event_panels()
+
+    if not storage.data_file_changed():
+        return
+    stat = file_stat(config.DATA_FILE)
+    seen = storage.data_file_stat
+    try:
+        state = await asyncio.to_thread(read_state, config.DATA_FILE)
+    except Exception as exc:
+        print(f"Failed to reload {config.DATA_FILE}: {exc!r}")
+        storage.data_file_stat = stat
+        return
+    if storage.data_file_stat != seen or storage.write_queue.unfinished_tasks:
+        return
+    changed = merge_state(state)
+    storage.data_file_stat = stat
+    checks.invalidate_role_cache()
+    for guild_id in changed:
+        notify_schedule_changed(guild_id)
+    print(f"Reloaded {config.DATA_FILE}: {len(changed)} guild(s) changed")
+    await update_guilds_panels(changed)
+
+
+async def watch_loop() -> None:
+    while True:
+        await asyncio.sleep(WATCH_INTERVAL)
+        try:
+            await reload_changed_files()
+        except Exception as exc:
+            print(f"File watch error: {exc!r}")
+
+
+def start_watch_loop() -> None:
+    global watch_task
+    if watch_task is None:
+        watch_task = asyncio.get_running_loop().create_task(watch_loop())
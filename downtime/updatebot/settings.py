@@ -0,0 +1,72 @@
+"""Per-guild preferences: default timezone, locale and status panel theme."""
+import re
+from typing import NamedTuple, Optional
+
+from .locales import LOCALE_NAMES
+
+RGB = tuple[int, int, int]
+
+
+class GuildSettings(NamedTuple):
+    """Immutable; changing a setting replaces the guild's entry."""
+    # Used by /downtime and /extenddowntime when tz is left empty
+    timezone: str = "UTC"
+    locale: str = "en"
+    # None keeps the built-in theme
+    online_color: Optional[RGB] = None
+    maint_color: Optional[RGB] = None
+    online_emoji: Optional[str] = None
+    maint_emoji: Optional[str] = None
+
+
+DEFAULT_SETTINGS = GuildSettings()
+
+
+def parse_hex_color(text: str) -> Optional[RGB]:
+    match = re.fullmatch(r"#?([0-9a-fA-F]{6})", (text or "").strip())
+    if not match:
+        return None
+    value = int(match.group(1), 16)
+    return (value >> 16) & 0xFF, (value >> 8) & 0xFF, value & 0xFF
+
+
+def format_hex_color(color: RGB) -> str:
+    return "#{:02x}{:02x}{:02x}".format(*color)
+
+
+def parse_rgb(value: object) -> Optional[RGB]:
+    if (
+        isinstance(value, (list, tuple))
+        and len(value) == 3
+        and all(isinstance(x, int) and 0 <= x <= 255 for x in value)
+    ):
+        return tuple(value)
+    return None
+
+
+def parse_settings(value: object) -> Optional[GuildSettings]:
+    """Settings from the data file; invalid fields fall back to their defaults."""
+    if not isinstance(value, dict):
+        return None
+    fields = {}
+    if isinstance(value.get("timezone"), str):
+        fields["timezone"] = value["timezone"]
+    if value.get("locale") in LOCALE_NAMES:
+        fields["locale"] = value["locale"]
+    for key in ("online_color", "maint_color"):
+        color = parse_rgb(value.get(key))
+        if color:
+            fields[key] = color
+    for key in ("online_emoji", "maint_emoji"):
+        if isinstance(value.get(key), str) and value[key]:
+            fields[key] = value[key]
+    return GuildSettings(**fields)
+
+
+def settings_to_dict(settings: GuildSettings) -> dict:
+    """Only the fields that differ from the defaults."""
+    return {
+        key: list(value) if isinstance(value, tuple) else value
+        for key, value in settings._asdict().items()
+        if value != getattr(DEFAULT_SETTINGS, key)
+    }
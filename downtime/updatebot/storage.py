@@ -0,0 +1,546 @@
+"""In-memory bot state and its persistence to config.DATA_FILE.
+
+save_data only snapshots the state and queues it; a writer thread coalesces
+queued snapshots and writes the newest one to a temp file, fsyncs it and
+renames it over DATA_FILE, keeping DATA_BACKUPS older copies as
+DATA_FILE.1 (newest) .. DATA_FILE.N. load_data falls back to those copies
+when DATA_FILE is missing or unreadable.
+
+Other processes (admin.py) may rewrite DATA_FILE while the bot runs.
+data_file_changed notices that from the file's stat, read_state parses the
+new file without touching the live state, and merge_state swaps it in. If
+the bot saves before it has noticed, the writer folds the other process's
+edits into that save (merge_snapshots) instead of overwriting them, and the
+result is reloaded the same way.
+"""
+import atexit
+import os
+import queue
+import threading
+from typing import Iterable, Optional, Union
+
+from . import config, datafile, lease
+from .settings import DEFAULT_SETTINGS, GuildSettings, parse_settings, settings_to_dict
+from .timeline import Timeline
+
+# Store the downtime schedule (many windows) per guild
+downtime_schedules: dict[int, Timeline] = {}
+
+panel_messages: list[dict[str, int]] = []
+
+# Store event panel messages (separate from downtime panels)
+event_panel_messages: list[dict[str, Union[int, str]]] = []
+
+# Message ID -> entry in panel_messages or event_panel_messages, so gateway
+# delete events can be matched without scanning the lists
+panels_by_message: dict[int, dict] = {}
+# Channel ID -> message IDs of the panels posted there
+panels_by_channel: dict[int, set[int]] = {}
+
+# Bot-owned webhooks that post and edit panels when PANEL_DELIVERY=webhook:
+# webhook ID -> {"webhook_id", "channel_id", "guild_id", "token"}
+panel_webhooks: dict[int, dict] = {}
+# Channel ID -> ID of the webhook new panels there are posted with
+webhooks_by_channel: dict[int, int] = {}
+
+# Extra role IDs per guild that may use mod commands (besides the @downtime role)
+downtime_roles: dict[int, list[int]] = {}
+
+# Guilds that changed any /serversettings value; others use DEFAULT_SETTINGS
+guild_settings: dict[int, GuildSettings] = {}
+
+# datafile.file_stat of DATA_FILE as this process last loaded or wrote it
+data_file_stat: Optional[tuple[int, int]] = None
+# DATA_FILE's contents as of data_file_stat, as a snapshot(): the base that tells
+# edits made by another process apart from the bot's own when merging them
+saved_snapshot: Optional[dict] = None
+# Set when a save merged in another process's edits the live state doesn't have yet
+outside_edits_merged = False
+
+# (path, format, snapshot) for the writer thread; None stops it
+write_queue: "queue.Queue[Optional[tuple[str, str, dict]]]" = queue.Queue()
+writer_thread: Optional[threading.Thread] = None
+writer_lock = threading.Lock()
+
+
+def get_schedule(guild_id: int) -> Timeline:
+    if guild_id not in downtime_schedules:
+        downtime_schedules[guild_id] = Timeline()
+    return downtime_schedules[guild_id]
+
+
+def parse_window(value: object) -> Optional[dict]:
+    if not isinstance(value, dict):
+        return None
+    start = value.get("start")
+    end = value.get("end")
+    if not isinstance(start, int) or not isinstance(end, int) or end <= start:
+        return None
+    title = value.get("title")
+    return {"start": start, "end": end, "title": title if isinstance(title, str) else None}
+
+
+def get_guild_settings(guild_id: Optional[int]) -> GuildSettings:
+    return guild_settings.get(guild_id, DEFAULT_SETTINGS)
+
+
+def get_configured_role_ids(guild_id: int) -> list[int]:
+    return downtime_roles.get(guild_id, [])
+
+
+def get_guild_panels(guild_id: int) -> list[dict[str, int]]:
+    return [p for p in panel_messages if p.get("guild_id") == guild_id]
+
+
+def index_panel(item: dict) -> None:
+    panels_by_message[item["message_id"]] = item
+    panels_by_channel.setdefault(item["channel_id"], set()).add(item["message_id"])
+
+
+def rebuild_panel_index() -> None:
+    panels_by_message.clear()
+    panels_by_channel.clear()
+    for item in panel_messages:
+        index_panel(item)
+    for item in event_panel_messages:
+        index_panel(item)
+    webhooks_by_channel.clear()
+    for entry in panel_webhooks.values():
+        webhooks_by_channel[entry["channel_id"]] = entry["webhook_id"]
+
+
+def add_panel(item: dict[str, int]) -> None:
+    panel_messages.append(item)
+    index_panel(item)
+
+
+def add_event_panel(item: dict[str, Union[int, str]]) -> None:
+    event_panel_messages.append(item)
+    index_panel(item)
+
+
+def remove_panels(message_ids: Iterable[int]) -> int:
+    """Forget the status/event panels with these message IDs. Returns how many."""
+    removed: set[int] = set()
+    for message_id in message_ids:
+        item = panels_by_message.pop(message_id, None)
+        if item is None:
+            continue
+        removed.add(message_id)
+        channel_panels = panels_by_channel.get(item["channel_id"])
+        if channel_panels is not None:
+            channel_panels.discard(message_id)
+            if not channel_panels:
+                del panels_by_channel[item["channel_id"]]
+    if removed:
+        panel_messages[:] = [p for p in panel_messages if p["message_id"] not in removed]
+        event_panel_messages[:] = [p for p in event_panel_messages if p["message_id"] not in removed]
+    return len(removed)
+
+
+def remove_channel_panels(channel_id: int) -> int:
+    return remove_panels(list(panels_by_channel.get(channel_id, ())))
+
+
+def remove_guild_panels(guild_id: int) -> int:
+    return remove_panels([p["message_id"] for p in panels_by_message.values() if p["guild_id"] == guild_id])
+
+
+def add_webhook(entry: dict) -> None:
+    panel_webhooks[entry["webhook_id"]] = entry
+    webhooks_by_channel[entry["channel_id"]] = entry["webhook_id"]
+
+
+def remove_webhooks(webhook_ids: Iterable[int]) -> int:
+    """Forget these webhooks. Their panels stay until an edit fails."""
+    removed = 0
+    for webhook_id in webhook_ids:
+        entry = panel_webhooks.pop(webhook_id, None)
+        if entry is None:
+            continue
+        removed += 1
+        if webhooks_by_channel.get(entry["channel_id"]) == webhook_id:
+            del webhooks_by_channel[entry["channel_id"]]
+    return removed
+
+
+def remove_channel_webhooks(channel_id: int) -> int:
+    return remove_webhooks([w["webhook_id"] for w in panel_webhooks.values() if w["channel_id"] == channel_id])
+
+
+def remove_guild_webhooks(guild_id: int) -> int:
+    return remove_webhooks([w["webhook_id"] for w in panel_webhooks.values() if w["guild_id"] == guild_id])
+
+
+def parse_panel(kind: str, value: object) -> Optional[dict]:
+    """A status ("panel") or event panel entry, or None if it is malformed."""
+    if not isinstance(value, dict):
+        return None
+    channel_id = value.get("channel_id")
+    message_id = value.get("message_id")
+    guild_id = value.get("guild_id")
+    if not isinstance(channel_id, int) or not isinstance(message_id, int):
+        return None
+    if kind == "event_panel":
+        event_type = value.get("event_type")
+        if not isinstance(guild_id, int) or not isinstance(event_type, str):
+            return None
+        item = {"channel_id": channel_id, "message_id": message_id, "guild_id": guild_id, "event_type": event_type}
+    else:
+        if not isinstance(guild_id, int):
+            # Legacy panel without guild_id; attach if only one known guild
+            guild_id = config.get_legacy_guild_target()
+        if not guild_id:
+            return None
+        item = {"channel_id": channel_id, "message_id": message_id, "guild_id": guild_id}
+    # Posted through a webhook, so it must be edited through the same one
+    if isinstance(value.get("webhook_id"), int):
+        item["webhook_id"] = value["webhook_id"]
+    return item
+
+
+def parse_webhook(value: object) -> Optional[dict]:
+    if not isinstance(value, dict):
+        return None
+    entry = {key: value.get(key) for key in ("webhook_id", "channel_id", "guild_id", "token")}
+    if not all(isinstance(entry[key], int) for key in ("webhook_id", "channel_id", "guild_id")):
+        return None
+    if not isinstance(entry["token"], str) or not entry["token"]:
+        return None
+    return entry
+
+
+def live_state() -> dict:
+    """The module state as the containers add_record fills."""
+    return {
+        "downtime": downtime_schedules,
+        "panels": panel_messages,
+        "event_panels": event_panel_messages,
+        "downtime_roles": downtime_roles,
+        "guild_settings": guild_settings,
+        "webhooks": panel_webhooks,
+        "legacy": {},
+    }
+
+
+def new_state() -> dict:
+    """Empty containers shaped like live_state, for reading a file aside."""
+    return {
+        "downtime": {}, "panels": [], "event_panels": [], "downtime_roles": {}, "guild_settings": {},
+        "webhooks": {}, "legacy": {},
+    }
+
+
+def add_record(kind: str, guild_id: Optional[int], value: object, state: Optional[dict] = None) -> None:
+    """Validate one record from the data file and insert it into state (default: the live state)."""
+    if state is None:
+        state = live_state()
+    if kind == "downtime":
+        window = parse_window(value)
+        if isinstance(guild_id, int) and window:
+            schedules = state["downtime"]
+            if guild_id not in schedules:
+                schedules[guild_id] = Timeline()
+            schedules[guild_id].add(window["start"], window["end"], window["title"])
+    elif kind == "downtime_roles":
+        if isinstance(guild_id, int) and isinstance(value, list):
+            role_ids = [x for x in value if isinstance(x, int)]
+            if role_ids:
+                state["downtime_roles"][guild_id] = role_ids
+    elif kind == "guild_settings":
+        settings = parse_settings(value)
+        if isinstance(guild_id, int) and settings and settings != DEFAULT_SETTINGS:
+            state["guild_settings"][guild_id] = settings
+    elif kind in ("panel", "event_panel"):
+        item = parse_panel(kind, value)
+        if item:
+            state["panels" if kind == "panel" else "event_panels"].append(item)
+    elif kind == "webhook":
+        entry = parse_webhook(value)
+        if entry:
+            state["webhooks"][entry["webhook_id"]] = entry
+    elif kind == "legacy":
+        state["legacy"][guild_id] = value
+
+
+def clear_state() -> None:
+    downtime_schedules.clear()
+    panel_messages.clear()
+    event_panel_messages.clear()
+    downtime_roles.clear()
+    guild_settings.clear()
+    panel_webhooks.clear()
+    rebuild_panel_index()
+
+
+def get_backup_paths(path: str) -> list[str]:
+    return [f"{path}.{i}" for i in range(1, config.DATA_BACKUPS + 1)]
+
+
+def read_records(path: str, state: dict) -> None:
+    with open(path, "r", encoding="utf-8") as f:
+        for kind, guild_id, value in datafile.iter_records(f):
+            add_record(kind, guild_id, value, state)
+
+
+def load_file(path: str) -> None:
+    clear_state()
+    state = live_state()
+    read_records(path, state)
+    rebuild_panel_index()
+    apply_legacy(state["legacy"])
+
+
+def apply_legacy(legacy: dict) -> None:
+    """Top-level start/end/title of the previous single-guild format."""
+    if not downtime_schedules and (legacy.get("start") or legacy.get("end") or legacy.get("title")):
+        target_id = config.get_legacy_guild_target()
+        window = parse_window(legacy)
+        if not target_id:
+            print("Legacy downtime data ignored: no single guild target found.")
+        elif window:
+            downtime_schedules[target_id] = Timeline([window])
+
+
+def read_saved_state() -> tuple[Optional[tuple[int, int]], Optional[str], dict]:
+    """Parse DATA_FILE, or the newest readable backup, aside; safe to run off the event loop.
+
+    Returns DATA_FILE's stat, the path read (None if there was nothing
+    readable) and the state, for install_state.
+    """
+    # Don't read the file underneath a pending write
+    flush_data()
+    stat = datafile.file_stat(config.DATA_FILE)
+    for path in [config.DATA_FILE] + get_backup_paths(config.DATA_FILE):
+        if not os.path.exists(path):
+            continue
+        try:
+            return stat, path, read_state(path)
+        except Exception as exc:
+            print(f"Failed to load {path}: {exc!r}")
+    return stat, None, new_state()
+
+
+def install_state(stat: Optional[tuple[int, int]], path: Optional[str], state: dict) -> None:
+    """Make a state from read_saved_state the live one."""
+    global data_file_stat
+    data_file_stat = stat
+    merge_state(state)
+    apply_legacy(state["legacy"])
+    if path is not None and path != config.DATA_FILE:
+        print(f"Loaded state from backup {path}")
+
+
+def load_data() -> None:
+    install_state(*read_saved_state())
+
+
+def data_file_changed() -> bool:
+    """Whether DATA_FILE has edits from someone else the live state doesn't have."""
+    if write_queue.unfinished_tasks:
+        # Our own write may be landing right now
+        return False
+    if outside_edits_merged:
+        return True
+    stat = datafile.file_stat(config.DATA_FILE)
+    return stat is not None and stat != data_file_stat
+
+
+def read_state(path: str) -> dict:
+    """Parse a data file into new_state() containers; safe to run off the event loop."""
+    state = new_state()
+    read_records(path, state)
+    return state
+
+
+def merge_state(state: dict) -> set[int]:
+    """Replace the live state with one from read_state.
+
+    Returns the guilds whose schedule or settings differ, whose panels need
+    refreshing; everything else is swapped in without further work.
+    """
+    global saved_snapshot, outside_edits_merged
+    changed = set()
+    schedules = state["downtime"]
+    for guild_id in downtime_schedules.keys() | schedules.keys():
+        old = downtime_schedules.get(guild_id)
+        new = schedules.get(guild_id)
+        if (old.windows if old else []) != (new.windows if new else []):
+            changed.add(guild_id)
+    for guild_id in guild_settings.keys() | state["guild_settings"].keys():
+        if guild_settings.get(guild_id) != state["guild_settings"].get(guild_id):
+            changed.add(guild_id)
+
+    downtime_schedules.clear()
+    downtime_schedules.update(schedules)
+    panel_messages[:] = state["panels"]
+    event_panel_messages[:] = state["event_panels"]
+    downtime_roles.clear()
+    downtime_roles.update(state["downtime_roles"])
+    guild_settings.clear()
+    guild_settings.update(state["guild_settings"])
+    panel_webhooks.clear()
+    panel_webhooks.update(state["webhooks"])
+    rebuild_panel_index()
+    saved_snapshot = snapshot()
+    outside_edits_merged = False
+    return changed
+
+
+# Snapshot sections that are lists, and the field their entries are merged by;
+# the others are dicts keyed by guild
+MERGE_KEYS = {"panels": "message_id", "event_panels": "message_id", "webhooks": "webhook_id"}
+
+
+def snapshot(state: Optional[dict] = None) -> dict:
+    """Copy of the state (default: the live state) the writer thread can serialize
+    while the bot keeps running."""
+    if state is None:
+        state = live_state()
+    return {
+        # Windows are copied: Timeline.set_end edits them in place
+        "downtime": {
+            str(gid): [dict(window) for window in schedule.windows]
+            for gid, schedule in state["downtime"].items() if schedule
+        },
+        # Panel dicts and role lists are replaced, never edited, so sharing them is safe
+        "panels": list(state["panels"]),
+        "event_panels": list(state["event_panels"]),
+        "downtime_roles": {str(gid): ids for gid, ids in state["downtime_roles"].items()},
+        "guild_settings": {str(gid): settings_to_dict(settings) for gid, settings in state["guild_settings"].items()},
+        "webhooks": list(state["webhooks"].values()),
+    }
+
+
+def merge_snapshots(base: dict, ours: dict, theirs: dict) -> dict:
+    """Three-way merge of snapshots: an entry theirs changed since base comes from
+    theirs (added, edited or removed), every other entry from ours.
+
+    Entries are a guild's windows, roles or settings, and single panels and
+    webhooks by ID, so an admin's edit to one guild and the bot's to another
+    both survive. When both changed the same entry, theirs wins.
+    """
+    merged = {}
+    for section, ours_entries in ours.items():
+        key = MERGE_KEYS.get(section)
+        entries = [base.get(section, {}), ours_entries, theirs.get(section, {})]
+        if key is not None:
+            entries = [{item[key]: item for item in items} for items in entries]
+        base_entries, ours_entries, theirs_entries = entries
+        result = {}
+        for entry_id in [*ours_entries, *(entry_id for entry_id in theirs_entries if entry_id not in ours_entries)]:
+            side = theirs_entries if theirs_entries.get(entry_id) != base_entries.get(entry_id) else ours_entries
+            if entry_id in side:
+                result[entry_id] = side[entry_id]
+        merged[section] = result if key is None else list(result.values())
+    return merged
+
+
+def save_data() -> None:
+    """Queue the current state to be written; never waits on disk."""
+    start_writer()
+    write_queue.put((config.DATA_FILE, config.DATA_FORMAT, snapshot()))
+
+
+def rotate_backups(path: str) -> None:
+    backups = get_backup_paths(path)
+    if not backups:
+        return
+    for older, newer in zip(reversed(backups), reversed([path] + backups[:-1])):
+        if os.path.exists(newer):
+            os.replace(newer, older)
+
+
+def merge_outside_edits(path: str, data: dict) -> dict:
+    """data with the edits another process saved to path since saved_snapshot folded in."""
+    global outside_edits_merged
+    if saved_snapshot is None:
+        print(f"{path} was changed on disk since it was loaded; overwriting it "
+              f"(the other copy is kept as {path}.1 when DATA_BACKUPS > 0)")
+        return data
+    try:
+        theirs = snapshot(read_state(path))
+    except Exception as exc:
+        print(f"{path} was changed on disk but can't be read ({exc!r}); overwriting it")
+        return data
+    print(f"{path} was changed on disk since it was loaded; merging those edits into this save")
+    # The live state picks them up from the merged file (see data_file_changed)
+    outside_edits_merged = True
+    return merge_snapshots(saved_snapshot, data, theirs)
+
+
+def write_file(path: str, fmt: str, data: dict) -> None:
+    global data_file_stat, saved_snapshot
+    is_data_file = path == config.DATA_FILE
+    if is_data_file and not lease.holds():
+        print(f"Not saving {path}: this instance no longer holds the HA lease")
+        return
+    tmp_path = f"{path}.tmp"
+    try:
+        while True:
+            seen = datafile.file_stat(path) if is_data_file else None
+            if seen not in (None, data_file_stat):
+                data = merge_outside_edits(path, data)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                datafile.WRITERS[fmt](f, data)
+                f.flush()
+                os.fsync(f.fileno())
+            # Saved again by someone else while this was being written: merge that too
+            if not is_data_file or datafile.file_stat(path) == seen:
+                break
+        rotate_backups(path)
+        os.replace(tmp_path, path)
+        if is_data_file:
+            data_file_stat = datafile.file_stat(path)
+            saved_snapshot = data
+        if os.name == "posix":
+            # Make the rename itself durable
+            dir_fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+    except Exception as exc:
+        print(f"Failed to save {path}: {exc!r}")
+
+
+def writer_loop() -> None:
+    while True:
+        items = [write_queue.get()]
+        # Coalesce: only the newest snapshot per file needs writing
+        while True:
+            try:
+                items.append(write_queue.get_nowait())
+            except queue.Empty:
+                break
+        latest = {item[0]: item for item in items if item is not None}
+        for path, fmt, data in latest.values():
+            write_file(path, fmt, data)
+        for _ in items:
+            write_queue.task_done()
+        if None in items:
+            return
+
+
+def start_writer() -> None:
+    global writer_thread
+    with writer_lock:
+        if writer_thread is None or not writer_thread.is_alive():
+            writer_thread = threading.Thread(target=writer_loop, name="storage-writer", daemon=True)
+            writer_thread.start()
+
+
+def flush_data() -> None:
+    """Block until every queued snapshot is on disk."""
+    if writer_thread is not None and writer_thread.is_alive():
+        write_queue.join()
+
+
+@atexit.register
+def stop_writer() -> None:
+    global writer_thread
+    with writer_lock:
+        if writer_thread is not None and writer_thread.is_alive():
+            write_queue.put(None)
+            writer_thread.join()
+        writer_thread = None
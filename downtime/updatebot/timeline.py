@@ -0,0 +1,100 @@
+"""Per-guild downtime schedule: sorted, non-overlapping maintenance windows."""
+from bisect import bisect_left, bisect_right
+from typing import Iterable, Optional
+
+# Ended windows are kept this long (for "Maintenance complete!") before compaction
+PAST_WINDOW_RETENTION = 24 * 3600
+# Upper bound on queued windows per guild
+MAX_WINDOWS = 50
+
+
+class Timeline:
+    """Windows are dicts {"start", "end", "title"} sorted by start.
+
+    Windows never overlap, so their end times are sorted too and the
+    current-or-next window at t is a binary search over _ends.
+    """
+
+    __slots__ = ("windows", "_starts", "_ends")
+
+    def __init__(self, windows: Iterable[dict] = ()):
+        self.windows: list[dict] = []
+        self._starts: list[int] = []
+        self._ends: list[int] = []
+        for window in windows:
+            self.add(window["start"], window["end"], window.get("title"))
+
+    def __len__(self) -> int:
+        return len(self.windows)
+
+    def add(self, start: int, end: int, title: Optional[str]) -> list[dict]:
+        """Insert a window, replacing any it overlaps. Returns the replaced windows."""
+        lo = bisect_right(self._ends, start)
+        hi = max(lo, bisect_left(self._starts, end))
+        replaced = self.windows[lo:hi]
+        window = {"start": start, "end": end, "title": title}
+        self.windows[lo:hi] = [window]
+        self._starts[lo:hi] = [start]
+        self._ends[lo:hi] = [end]
+        return replaced
+
+    def find(self, ts: float) -> Optional[dict]:
+        """The window active at ts, or else the next one to start."""
+        index = bisect_right(self._ends, ts)
+        return self.windows[index] if index < len(self.windows) else None
+
+    def upcoming(self, ts: float, limit: int) -> list[dict]:
+        """Windows after the current-or-next one, up to limit."""
+        index = bisect_right(self._ends, ts) + 1
+        return self.windows[index:index + limit]
+
+    def last_ended(self, ts: float) -> Optional[dict]:
+        index = bisect_right(self._ends, ts)
+        return self.windows[index - 1] if index > 0 else None
+
+    def following(self, window: dict) -> Optional[dict]:
+        index = bisect_left(self._ends, window["end"]) + 1
+        return self.windows[index] if index < len(self.windows) else None
+
+    def set_end(self, window: dict, end: int) -> None:
+        """Move a window's end; the caller ensures it stays before the following window."""
+        index = bisect_left(self._ends, window["end"])
+        window["end"] = end
+        self._ends[index] = end
+
+    def remove(self, window: dict) -> None:
+        index = bisect_left(self._ends, window["end"])
+        del self.windows[index]
+        del self._starts[index]
+        del self._ends[index]
+
+    def clear(self) -> None:
+        self.windows.clear()
+        self._starts.clear()
+        self._ends.clear()
+
+    def next_transition(self, ts: float) -> Optional[int]:
+        """Next time after ts at which a window starts or ends."""
+        window = self.find(ts)
+        if window is None:
+            return None
+        return window["start"] if ts < window["start"] else window["end"]
+
+    def compact(self, ts: float) -> int:
+        """Drop windows that ended before the retention horizon and cap the queue."""
+        cut = bisect_right(self._ends, ts - PAST_WINDOW_RETENTION)
+        overflow = max(0, len(self.windows) - cut - MAX_WINDOWS)
+        removed = cut
+        if cut:
+            del self.windows[:cut]
+            del self._starts[:cut]
+            del self._ends[:cut]
+        if overflow:
+            # Keep the soonest windows; the furthest-out ones are dropped first
+            del self.windows[-overflow:]
+            del self._starts[-overflow:]
+            del self._ends[-overflow:]
+        return removed + overflow
+
+    def to_list(self) -> list[dict]:
+        return list(self.windows)
@@ -0,0 +1,234 @@
+"""Timezone resolution and parsing of user-entered times and durations."""
+import os
+import re
+from datetime import datetime, timezone, timedelta
+from typing import Optional, Union
+from zoneinfo import ZoneInfo
+
+from . import clock
+
+COMMON_TIMEZONES = [
+    ("UTC", "UTC"),
+    ("Eastern (America/New_York)", "America/New_York"),
+    ("Central (America/Chicago)", "America/Chicago"),
+    ("Mountain (America/Denver)", "America/Denver"),
+    ("Pacific (America/Los_Angeles)", "America/Los_Angeles"),
+    ("UK (Europe/London)", "Europe/London"),
+    ("Central Europe (Europe/Paris)", "Europe/Paris"),
+    ("Tokyo (Asia/Tokyo)", "Asia/Tokyo"),
+    ("Sydney (Australia/Sydney)", "Australia/Sydney"),
+    ("Auckland (Pacific/Auckland)", "Pacific/Auckland"),
+    ("Sao Paulo (America/Sao_Paulo)", "America/Sao_Paulo"),
+    ("Mexico City (America/Mexico_City)", "America/Mexico_City"),
+    ("Phoenix (America/Phoenix)", "America/Phoenix"),
+    ("Anchorage (America/Anchorage)", "America/Anchorage"),
+    ("Honolulu (Pacific/Honolulu)", "Pacific/Honolulu"),
+    ("Mumbai (Asia/Kolkata)", "Asia/Kolkata"),
+    ("Seoul (Asia/Seoul)", "Asia/Seoul"),
+    ("Singapore (Asia/Singapore)", "Asia/Singapore"),
+    ("Dubai (Asia/Dubai)", "Asia/Dubai"),
+    ("Johannesburg (Africa/Johannesburg)", "Africa/Johannesburg"),
+    ("EST (fixed)", "EST"),
+    ("CST (fixed)", "CST"),
+    ("MST (fixed)", "MST"),
+    ("PST (fixed)", "PST"),
+]
+
+# Built on first use: (name, value, lowercase search text) for autocomplete
+_tz_index: Optional[list[tuple[str, str, str]]] = None
+
+
+def get_tz_index() -> list[tuple[str, str, str]]:
+    global _tz_index
+    if _tz_index is None:
+        _tz_index = [(name, value, f"{name}\n{value}".lower()) for name, value in COMMON_TIMEZONES]
+    return _tz_index
+
+
+def search_timezones(current: str, limit: int = 25) -> list[tuple[str, str]]:
+    current_lower = (current or "").lower()
+    matches: list[tuple[str, str]] = []
+    for name, value, haystack in get_tz_index():
+        if not current_lower or current_lower in haystack:
+            matches.append((name, value))
+        if len(matches) >= limit:
+            break
+    return matches
+
+# Common timezone shortcuts
+TZ_SHORTCUTS = {
+    "EST": "America/New_York",
+    "EDT": "America/New_York",
+    "CST": "America/Chicago",
+    "CDT": "America/Chicago",
+    "MST": "America/Denver",
+    "MDT": "America/Denver",
+    "PST": "America/Los_Angeles",
+    "PDT": "America/Los_Angeles",
+    "GMT": "Europe/London",
+    "BST": "Europe/London",
+    "CET": "Europe/Paris",
+    "UTC": "UTC",
+}
+
+# Fallback offsets when IANA tzdata is unavailable (hours from UTC)
+TZ_ABBR_OFFSETS = {
+    "EST": -5,
+    "EDT": -4,
+    "CST": -6,
+    "CDT": -5,
+    "MST": -7,
+    "MDT": -6,
+    "PST": -8,
+    "PDT": -7,
+    "GMT": 0,
+    "BST": 1,
+    "CET": 1,
+    "UTC": 0,
+}
+
+
+def resolve_timezone(tz_input: str) -> str:
+    """Convert shortcut to full timezone name, or return as-is."""
+    if not tz_input:
+        return "UTC"
+    tz_clean = tz_input.strip()
+    return TZ_SHORTCUTS.get(tz_clean.upper(), tz_clean)
+
+
+def get_tzinfo(
+    tz_name: str, tz_fallback: Optional[str] = None
+) -> Optional[Union[timezone, ZoneInfo]]:
+    """Resolve a timezone name to tzinfo, with fallback to fixed offsets for abbreviations."""
+    # Accept GMT/UTC offsets like "GMT-05:00" or "UTC +05:30"
+    for raw in (tz_name, tz_fallback or ""):
+        raw = (raw or "").strip().upper()
+        match = re.fullmatch(r"(GMT|UTC)\s*([+-])\s*(\d{1,2})(?::?(\d{2}))?$", raw)
+        if match:
+            sign = -1 if match.group(2) == "-" else 1
+            hours = int(match.group(3))
+            minutes = int(match.group(4) or 0)
+            if 0 <= hours <= 23 and 0 <= minutes <= 59:
+                offset = timedelta(hours=hours, minutes=minutes) * sign
+                return timezone(offset)
+    try:
+        return ZoneInfo(tz_name)
+    except Exception:
+        abbr = (tz_fallback or tz_name or "").strip().upper()
+        offset_hours = TZ_ABBR_OFFSETS.get(abbr)
+        if offset_hours is None:
+            return None
+        return timezone(timedelta(hours=offset_hours))
+
+
+def normalize_time_input(time_str: str) -> str:
+    """Normalize whitespace and AM/PM spacing."""
+    cleaned = time_str.strip()
+    # Normalize common unicode spaces to regular space
+    cleaned = cleaned.replace("\u00A0", " ").replace("\u202F", " ").replace("\u2009", " ")
+    # Normalize common unicode punctuation
+    cleaned = cleaned.translate(
+        {
+            ord("／"): "/",
+            ord("∕"): "/",
+            ord("⁄"): "/",
+            ord("："): ":",
+        }
+    )
+    cleaned = cleaned.replace(",", "")
+    cleaned = re.sub(r"\s+", " ", cleaned)
+    # Replace dot time separators (e.g., 2.15 PM -> 2:15 PM)
+    cleaned = cleaned.replace(".", ":")
+    # If date and time are separated by a colon or dash, normalize to space (e.g., 2/12:2:15 PM)
+    cleaned = re.sub(r"^(\d{1,2}[/-]\d{1,2})\s*[:\-]\s*", r"\1 ", cleaned)
+    # Ensure space before AM/PM if missing (e.g., 9:48PM -> 9:48 PM)
+    cleaned = re.sub(r"(?i)(\d)(am|pm)$", r"\1 \2", cleaned)
+    if cleaned.upper().endswith(("AM", "PM")) and " " not in cleaned[-3:]:
+        cleaned = cleaned[:-2] + " " + cleaned[-2:]
+    return cleaned
+
+
+def parse_time_info(
+    time_str: str, tzinfo: Union[timezone, ZoneInfo]
+) -> tuple[Optional[datetime], Optional[datetime], bool]:
+    """Parse time string. Returns (local_dt, utc_dt, is_time_only)."""
+    formats = [
+        # Full formats with 4-digit year
+        "%Y-%m-%d %H:%M",
+        "%Y-%m-%d %I:%M %p",
+        "%Y-%m-%d %I %p",
+        "%m/%d/%Y %H:%M",
+        "%m/%d/%Y %I:%M %p",
+        "%m/%d/%Y %I %p",
+        # 2-digit year formats (e.g., 2/1/26 2:30 PM)
+        "%m/%d/%y %H:%M",
+        "%m/%d/%y %I:%M %p",
+        "%m/%d/%y %I %p",
+        "%m/%d/%y %I%p",  # No space before AM/PM (2/1/26 4pm)
+        # Month/day without year
+        "%m/%d %H:%M",
+        "%m/%d %I:%M %p",
+        "%m/%d %I %p",
+        "%m/%d %I%p",  # No space before AM/PM (2/1 4pm)
+        # Time-only formats
+        "%H:%M",
+        "%I:%M %p",
+        "%I %p",
+        "%I%p",  # No space before AM/PM (4pm)
+    ]
+    
+    now_local = clock.now_datetime(tzinfo)
+    normalized = normalize_time_input(time_str)
+
+    for fmt in formats:
+        try:
+            parsed = datetime.strptime(normalized, fmt)
+            # Determine if this is a time-only format (no date component)
+            time_only = fmt in ("%H:%M", "%I:%M %p", "%I %p", "%I%p")
+
+            if time_only:
+                # For time-only, fill in today's date
+                parsed = parsed.replace(year=now_local.year, month=now_local.month, day=now_local.day)
+            elif fmt in ("%m/%d %H:%M", "%m/%d %I:%M %p", "%m/%d %I %p", "%m/%d %I%p"):
+                # For month/day without year, fill in current year
+                parsed = parsed.replace(year=now_local.year)
+
+            parsed = parsed.replace(tzinfo=tzinfo)
+            return parsed, parsed.astimezone(timezone.utc), time_only
+        except ValueError:
+            continue
+    # Helpful debug in logs when parsing fails
+    if os.getenv("DEBUG_TIME_PARSE", "").strip() == "1":
+        print(f"Time parse failed: raw={time_str!r} normalized={normalized!r}")
+    return None, None, False
+
+
+def format_remaining(seconds: int, units: tuple[str, str, str, str] = ("hour", "hours", "minute", "minutes")) -> str:
+    """Whole hours and minutes; units are (hour, hours, minute, minutes) for other languages."""
+    hour, hours_word, minute, minutes_word = units
+    if seconds <= 0:
+        return f"0 {minutes_word}"
+    minutes_total = seconds // 60
+    hours = minutes_total // 60
+    minutes = minutes_total % 60
+    parts = []
+    if hours:
+        parts.append(f"{hours} {hour if hours == 1 else hours_word}")
+    if minutes or not parts:
+        parts.append(f"{minutes} {minute if minutes == 1 else minutes_word}")
+    return " ".join(parts)
+
+
+def parse_duration_minutes(raw: str) -> Optional[int]:
+    text = (raw or "").strip().lower().replace(" ", "")
+    if not text:
+        return None
+    match = re.fullmatch(r"(?:(\d+)h)?(?:(\d+)m)?", text)
+    if not match:
+        return None
+    hours = int(match.group(1) or 0)
+    minutes = int(match.group(2) or 0)
+    total = hours * 60 + minutes
+    if total <= 0:
+        return None
+    return total
@@ -0,0 +1,105 @@
+"""Hierarchical timing wheel: many timers, one clock, no task per timer.
+
+Time is counted in ticks of `resolution` seconds. Level 0 has one slot per
+tick for the next sizes[0] ticks; each level above has slots as wide as
+the whole level below it. A timer goes into the finest level whose span
+covers it, and when the wheel reaches the start of an outer slot, that
+slot's timers are redistributed inwards. Each timer therefore moves at
+most once per level, and advancing by one tick only touches the slots
+that start at that tick: adding and firing are O(1) amortized, however
+many timers are pending. Timers beyond the outermost level wait in a heap
+until they come into range.
+
+Timers cannot be cancelled; callers check whether a fired item still
+applies, or replace the wheel.
+"""
+import heapq
+import itertools
+from typing import Any, Sequence
+
+# Default levels: 60 one-minute slots, 24 one-hour slots, 64 one-day slots
+DEFAULT_SIZES = (60, 24, 64)
+
+
+class TimingWheel:
+    def __init__(self, now: float, resolution: int = 60, sizes: Sequence[int] = DEFAULT_SIZES):
+        self.resolution = resolution
+        self.sizes = tuple(sizes)
+        # spans[level]: ticks covered by one slot of that level; spans[-1]: the whole wheel
+        self.spans = [1]
+        for size in self.sizes:
+            self.spans.append(self.spans[-1] * size)
+        self.slots: list[list[list[tuple[int, Any]]]] = [[[] for _ in range(size)] for size in self.sizes]
+        # Last tick fired; timers at or before it are due at the next advance()
+        self.current = int(now // resolution)
+        self.ready: list[Any] = []
+        self.overflow: list[tuple[int, int, Any]] = []
+        self.sequence = itertools.count()
+        self.pending = 0
+
+    def __len__(self) -> int:
+        return self.pending
+
+    def add(self, ts: float, item: Any) -> None:
+        """Fire item at the first advance() to ts or later."""
+        self.pending += 1
+        # Round up: never fire before ts
+        self._place(-int(-ts // self.resolution), item)
+
+    def _place(self, tick: int, item: Any) -> None:
+        delta = tick - self.current
+        if delta <= 0:
+            self.ready.append(item)
+            return
+        for level, size in enumerate(self.sizes):
+            span = self.spans[level]
+            if delta < span * size:
+                self.slots[level][(tick // span) % size].append((tick, item))
+                return
+        heapq.heappush(self.overflow, (tick, next(self.sequence), item))
+
+    def _cascade(self) -> None:
+        total = self.spans[-1]
+        if self.current % total == 0:
+            while self.overflow and self.overflow[0][0] - self.current < total:
+                tick, _, item = heapq.heappop(self.overflow)
+                self._place(tick, item)
+        for level in range(len(self.sizes) - 1, 0, -1):
+            span = self.spans[level]
+            if self.current % span == 0:
+                slot = self.slots[level][(self.current // span) % self.sizes[level]]
+                if slot:
+                    moved = slot[:]
+                    slot.clear()
+                    for tick, item in moved:
+                        self._place(tick, item)
+
+    def advance(self, now: float) -> list[Any]:
+        """Move the wheel to now and return every item that came due, in order."""
+        due = self.ready
+        self.ready = []
+        target = int(now // self.resolution)
+        while self.current < target:
+            self.current += 1
+            self._cascade()
+            slot = self.slots[0][self.current % self.sizes[0]]
+            if slot:
+                due.extend(item for _, item in slot)
+                slot.clear()
+            if self.ready:
+                due.extend(self.ready)
+                self.ready = []
+        self.pending -= len(due)
+        return due
+
+    def next_due(self) -> float:
+        """Earliest time worth advancing to: the next occupied level 0 slot or
+        cascade boundary, or the time of a timer already due."""
+        if self.ready:
+            return self.current * self.resolution
+        size = self.sizes[0]
+        for step in range(1, size + 1):
+            tick = self.current + step
+            if self.slots[0][tick % size] or tick % size == 0:
+                return tick * self.resolution
+        return (self.current + size) * self.resolution
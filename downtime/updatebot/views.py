@@ -0,0 +1,84 @@
+"""Persistent message views (buttons) attached to panels."""
+from typing import Any, Optional
+
+import discord
+from discord import ui
+
+from . import config
+from .locales import ENGLISH, get_strings
+from .rendering import HEART_EMOJI, get_event_pages, get_status_embed
+
+# Page button views are shared by every message showing the same page; they only
+# hold dynamic items, so discord.py keeps no per-message state for them
+PAGE_VIEWS_CACHED = 512
+_page_views: dict[tuple[str, int, int], ui.View] = {}
+
+
+class StatusPanel(ui.View):
+    def __init__(self, locale: str = "en"):
+        super().__init__(timeout=None)
+        # Only the label varies; the custom_id keeps every panel's button routed here
+        self.check_status.label = get_strings(locale)["button_label"]
+
+    @ui.button(label=ENGLISH["button_label"], style=discord.ButtonStyle.primary, emoji=HEART_EMOJI, custom_id="check_status")
+    async def check_status(self, interaction: discord.Interaction, button: ui.Button):
+        if config.ALLOWED_GUILD_IDS and interaction.guild_id not in config.ALLOWED_GUILD_IDS:
+            await interaction.response.send_message(
+                "This bot is restricted to approved servers.",
+                ephemeral=True,
+            )
+            return
+        embed = get_status_embed(interaction.guild_id, full=True)
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+
+class EventPageButton(ui.DynamicItem[ui.Button], template=r"eventpage:(?P<key>[a-z_]+):(?P<page>\d+)"):
+    """Previous/next button of a paged event embed.
+
+    The page set and target page live in the custom_id, so the buttons keep
+    working after a restart without remembering anything per message.
+    """
+
+    def __init__(self, key: str, page: int, label: str, disabled: bool = False):
+        super().__init__(ui.Button(
+            label=label, style=discord.ButtonStyle.secondary, custom_id=f"eventpage:{key}:{page}", disabled=disabled
+        ))
+        self.key = key
+        self.page = page
+
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: ui.Button, match: Any) -> "EventPageButton":
+        return cls(match["key"], int(match["page"]), item.label or "")
+
+    async def callback(self, interaction: discord.Interaction) -> None:
+        if config.ALLOWED_GUILD_IDS and interaction.guild_id not in config.ALLOWED_GUILD_IDS:
+            await interaction.response.send_message(
+                "This bot is restricted to approved servers.",
+                ephemeral=True,
+            )
+            return
+        pages = get_event_pages(self.key)
+        page = min(self.page, len(pages) - 1)
+        view = get_event_page_view(self.key, page, len(pages))
+        if interaction.message is not None and interaction.message.flags.ephemeral:
+            await interaction.response.edit_message(embed=pages[page], view=view)
+        elif view is None:
+            await interaction.response.send_message(embed=pages[page], ephemeral=True)
+        else:
+            # A panel stays on its first page for everyone; the reader pages through their own copy
+            await interaction.response.send_message(embed=pages[page], view=view, ephemeral=True)
+
+
+def get_event_page_view(key: str, page: int, count: int) -> Optional[ui.View]:
+    """Previous/next buttons for a page of a page set; None when it fits on one page."""
+    if count <= 1:
+        return None
+    view = _page_views.get((key, page, count))
+    if view is None:
+        if len(_page_views) >= PAGE_VIEWS_CACHED:
+            _page_views.clear()
+        view = _page_views[(key, page, count)] = ui.View(timeout=None)
+        # The two custom_ids differ even at either end, as Discord requires
+        view.add_item(EventPageButton(key, max(page - 1, 0), "◀ Previous", disabled=page == 0))
+        view.add_item(EventPageButton(key, min(page + 1, count), "Next ▶", disabled=page >= count - 1))
+    return view
@@ -0,0 +1,174 @@
+"""Warm-start snapshot: what the bot knew about its panels when it last ran.
+
+WARM_START_FILE keeps a hash of the content each panel was last edited to
+and the type of every panel channel that had to be fetched over REST. With
+it, a restart skips panels whose content did not change while the bot was
+down and edits the rest through partial channels instead of fetching them
+first. Webhook panels need nothing extra: their handles are rebuilt from
+the tokens in DATA_FILE.
+
+Hashes are only trusted from a snapshot written at a clean shutdown. After
+a crash the last periodic snapshot may be missing edits, and a panel whose
+content changed and changed back would be skipped while still showing the
+middle state, so every panel is edited once as before.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import time
+from typing import Optional
+
+import discord
+
+from . import config, lease, storage
+
+# Seconds between snapshots while running (only written when something changed)
+SNAPSHOT_INTERVAL = 300
+
+# Message ID -> hash of the content the panel was last edited to
+panel_hashes: dict[int, str] = {}
+# Channel ID -> discord.ChannelType value, for channels get_channel misses
+channel_types: dict[int, int] = {}
+
+snapshot_dirty = False
+snapshot_task: Optional[asyncio.Task] = None
+
+
+def content_hash(content: dict) -> str:
+    """Hash of the embed and view a panel is sent or edited with."""
+    parts = {}
+    if content.get("embed") is not None:
+        parts["embed"] = content["embed"].to_dict()
+    if content.get("view") is not None:
+        parts["view"] = content["view"].to_components()
+    encoded = json.dumps(parts, sort_keys=True, separators=(",", ":")).encode()
+    return hashlib.blake2b(encoded, digest_size=16).hexdigest()
+
+
+def content_unchanged(message_id: int, digest: str) -> bool:
+    return panel_hashes.get(message_id) == digest
+
+
+def begin_edit(message_id: int) -> None:
+    """Forget a panel's hash while it is being edited, so an edit cut short is redone."""
+    global snapshot_dirty
+    if panel_hashes.pop(message_id, None) is not None:
+        snapshot_dirty = True
+
+
+def remember_content(message_id: int, digest: str) -> None:
+    global snapshot_dirty
+    panel_hashes[message_id] = digest
+    snapshot_dirty = True
+
+
+def remember_channel(channel: discord.abc.Messageable) -> None:
+    global snapshot_dirty
+    channel_type = getattr(channel, "type", None)
+    if isinstance(channel_type, discord.ChannelType) and channel_types.get(channel.id) != channel_type.value:
+        channel_types[channel.id] = channel_type.value
+        snapshot_dirty = True
+
+
+def get_partial_channel(client: discord.Client, channel_id: int, guild_id: int) -> Optional[discord.PartialMessageable]:
+    """A channel resolved on an earlier run, without a REST call."""
+    channel_type = channel_types.get(channel_id)
+    if channel_type is None:
+        return None
+    return client.get_partial_messageable(channel_id, guild_id=guild_id, type=discord.ChannelType(channel_type))
+
+
+def build_snapshot(clean: bool) -> dict:
+    # Only panels and channels that still exist
+    return {
+        "saved_at": int(time.time()),
+        "clean": clean,
+        "panel_hashes": {
+            str(message_id): digest
+            for message_id, digest in panel_hashes.items()
+            if message_id in storage.panels_by_message
+        },
+        "channel_types": {
+            str(channel_id): channel_type
+            for channel_id, channel_type in channel_types.items()
+            if channel_id in storage.panels_by_channel
+        },
+    }
+
+
+def write_snapshot(path: str, data: dict) -> None:
+    if not lease.holds():
+        # The snapshot belongs to whichever instance holds the lease now
+        return
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+    except OSError as exc:
+        print(f"Failed to save {path}: {exc!r}")
+
+
+def save_snapshot(clean: bool = False) -> None:
+    """Write the snapshot now; clean=True only from a finished shutdown."""
+    global snapshot_dirty
+    snapshot_dirty = False
+    write_snapshot(config.WARM_START_FILE, build_snapshot(clean))
+
+
+def parse_id_map(value: object, kind: type) -> dict[int, object]:
+    parsed = {}
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if isinstance(item, kind) and str(key).isdigit():
+                parsed[int(key)] = item
+    return parsed
+
+
+def load_snapshot() -> None:
+    path = config.WARM_START_FILE
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return
+    except (OSError, ValueError) as exc:
+        print(f"Ignoring unreadable warm-start snapshot {path}: {exc!r}")
+        return
+    if not isinstance(data, dict):
+        return
+    channel_types.update(parse_id_map(data.get("channel_types"), int))
+    clean = data.get("clean") is True
+    if clean:
+        panel_hashes.update(parse_id_map(data.get("panel_hashes"), str))
+    saved_at = data.get("saved_at")
+    age = f" from {int(time.time()) - saved_at}s ago" if isinstance(saved_at, int) else ""
+    note = "" if clean else " (not from a clean shutdown; every panel will be edited)"
+    print(f"Loaded warm-start snapshot{age}: {len(panel_hashes)} panel hashes, {len(channel_types)} channels{note}")
+    # From here on the file must not claim a clean shutdown: a crash would leave it behind
+    save_snapshot()
+
+
+async def snapshot_loop() -> None:
+    global snapshot_dirty
+    while True:
+        await asyncio.sleep(SNAPSHOT_INTERVAL)
+        if snapshot_dirty:
+            snapshot_dirty = False
+            await asyncio.to_thread(write_snapshot, config.WARM_START_FILE, build_snapshot(False))
+
+
+def start_snapshot_loop() -> None:
+    """Load the last snapshot and keep saving new ones; only the first call does anything."""
+    global snapshot_task
+    if snapshot_task is None:
+        load_snapshot()
+        snapshot_task = asyncio.get_running_loop().create_task(snapshot_loop())
+
+
+def save_on_shutdown() -> None:
+    """The clean snapshot the next start trusts; nothing if the bot never got ready."""
+    if snapshot_task is not None:
+        snapshot_task.cancel()
+        save_snapshot(clean=True)
@@ -1,24 +1,13 @@
 import os
-from dotenv import load_dotenv
-import discord
-from discord import app_commands
+import sys
 
-load_dotenv()
-BOT_TOKEN = os.getenv("DISCORD_BOT_TOKEN")
+# The event timers run on the shared client core in downtime/updatebot. Prefer
+# running downtime/bot.py with BOT_EXTENSIONS=downtime,events so both share one
+# connection; this launcher starts the core with only the events extension.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "downtime"))
 
-intents = discord.Intents.default()
-client = discord.Client(intents=intents)
-tree = app_commands.CommandTree(client)
+from updatebot.core import main  # noqa: E402
 
 
-@client.event
-async def on_ready():
-    synced = await tree.sync()
-    print(f"Event Timers Bot is online as {client.user}")
-    print(f"Synced {len(synced)} commands")
-
-
-if not BOT_TOKEN:
-    raise RuntimeError("DISCORD_BOT_TOKEN environment variable is not set.")
-
-client.run(BOT_TOKEN)
+if __name__ == "__main__":
+    main(default_extensions=("events",))